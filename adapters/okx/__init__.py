@@ -1,3 +1,5 @@
 from adapters.okx.adapter import OkxAdapter
+from adapters.okx.ingest_proxy import OkxIngestProxyAdapter
+from adapters.okx.replay import OkxReplayAdapter
 
-__all__ = ["OkxAdapter"]
+__all__ = ["OkxAdapter", "OkxIngestProxyAdapter", "OkxReplayAdapter"]
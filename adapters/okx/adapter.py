@@ -1,3 +1,6 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
 from adapters.okx.auth import OkxAuthMixin
 from adapters.okx.http import OkxHttpMixin
 from adapters.okx.inst_id_cache import OkxInstIdCodeMixin
@@ -22,9 +25,19 @@ class OkxAdapter(
     OkxWsMarketSubscriptionsMixin,
     OkxWsPortfolioSubscriptionsMixin,
 ):
+    def warmup_stages(self) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        # независимые этапы прогрева; шлюз запускает их параллельно в фоне (api.warmup)
+        stages: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "http_pool": self._prewarm_http,
+            "inst_id_codes": self._ensure_inst_id_code_cache,
+        }
+        # без ключей сокет заявок не залогинится: шлюз работает только с market data
+        if self._api_key and self._api_secret and self._api_passphrase:
+            stages["order_ws"] = self._ensure_order_ws
+        return stages
+
     async def warmup(self) -> None:
-        await self._ensure_order_ws()
-        await self._ensure_inst_id_code_cache()
+        await asyncio.gather(*(stage() for stage in self.warmup_stages().values()))
 
     def tf_to_okx_ws_channel(self, tf: str) -> str:
         return self._tf_to_okx_ws_channel(tf)
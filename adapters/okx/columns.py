@@ -0,0 +1,127 @@
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # необязательная зависимость
+    np = None
+
+# Колоночный разбор больших REST-ответов (тикеры по всему рынку, история свечей,
+# инструменты). Числовая колонка переводится одним вызовом на всю колонку
+# (numpy.array или map(float, ...)); построчный разбор с try/except остается только
+# для колонок, где встретилось пустое или нечисловое значение.
+
+BACKEND = "python"
+
+
+def configure(requested: str | None = None) -> str:
+    # вызывается из api.core после load_dotenv, чтобы COLUMNS_BACKEND из .env учитывался
+    global BACKEND
+    name = (requested or "auto").strip().lower()
+    BACKEND = "numpy" if (np is not None and name in ("auto", "numpy")) else "python"
+    return BACKEND
+
+
+configure(os.getenv("COLUMNS_BACKEND"))
+
+
+def _float_or(v: Any, default: Optional[float]) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return default
+
+
+def _int_or(v: Any, default: int) -> int:
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return default
+
+
+def floats(values: Sequence[Any], default: float = 0.0):
+    if BACKEND == "numpy":
+        try:
+            arr = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return np.array([_float_or(v, default) for v in values], dtype=np.float64)
+        # None numpy превращает в nan, а не в ошибку
+        mask = np.isnan(arr)
+        if mask.any():
+            arr[mask] = default
+        return arr
+    try:
+        return list(map(float, values))
+    except (TypeError, ValueError):
+        return [_float_or(v, default) for v in values]
+
+
+def opt_floats(values: Sequence[Any]) -> List[Optional[float]]:
+    # колонки, где пустое значение значимо (ctVal у SPOT и т.п.): всегда список с None
+    try:
+        return list(map(float, values))
+    except (TypeError, ValueError):
+        return [_float_or(v, None) for v in values]
+
+
+def ints(values: Sequence[Any], default: int = 0):
+    if BACKEND == "numpy":
+        try:
+            arr = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return np.array([_int_or(v, default) for v in values], dtype=np.int64)
+        mask = np.isnan(arr)
+        if mask.any():
+            arr[mask] = default
+        return arr.astype(np.int64)
+    try:
+        return list(map(int, values))
+    except (TypeError, ValueError):
+        return [_int_or(v, default) for v in values]
+
+
+def to_list(col: Any) -> list:
+    # numpy-скаляры не сериализуются orjson и медленнее в арифметике с float
+    if isinstance(col, list):
+        return col
+    return col.tolist()
+
+
+class Columns:
+    # Колоночное представление: имя -> колонка (list или numpy.ndarray одной длины).
+    # rows() собирает записи row_type позиционно в порядке fields.
+    def __init__(self, fields: Sequence[str], columns: Dict[str, Any], row_type: Optional[Callable] = None):
+        self.fields = tuple(fields)
+        self.columns = columns
+        self.row_type = row_type
+        self._n = len(columns[self.fields[0]]) if self.fields else 0
+
+    @classmethod
+    def from_rows(cls, fields: Sequence[str], rows: Sequence[Any], row_type: Optional[Callable] = None) -> "Columns":
+        return cls(fields, {f: [r[f] for r in rows] for f in fields}, row_type)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, name: str) -> Any:
+        return self.columns[name]
+
+    def column(self, name: str) -> list:
+        return to_list(self.columns[name])
+
+    def rows(self) -> list:
+        if not self._n:
+            return []
+        cols = [to_list(self.columns[f]) for f in self.fields]
+        if self.row_type is None:
+            return [dict(zip(self.fields, r)) for r in zip(*cols)]
+        return list(map(self.row_type, *cols))
+
+    def row(self, i: int) -> Any:
+        vals = []
+        for f in self.fields:
+            v = self.columns[f][i]
+            vals.append(v.item() if hasattr(v, "item") else v)
+        if self.row_type is None:
+            return dict(zip(self.fields, vals))
+        return self.row_type(*vals)
@@ -1,19 +1,88 @@
-import json
-from typing import Any, Dict, Optional
+import asyncio
+import importlib.util
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 from urllib.parse import urlencode
 
 import httpx
 
+from adapters.okx.telemetry import REST_LATENCY
+from common import codec
+from common.ttl_store import TtlStore
+
+
+def _response_copy(resp: Dict[str, Any]) -> Dict[str, Any]:
+    # один ответ делят склеенные запросы и попадания в микрокэш: каждый получает свой
+    # словарь, список data и строки; вложенные в строки значения общие — только чтение
+    data = resp.get("data")
+    if not isinstance(data, list):
+        return dict(resp)
+    rows = [dict(r) if isinstance(r, dict) else list(r) if isinstance(r, list) else r for r in data]
+    return {**resp, "data": rows}
+
 
 class OkxHttpMixin:
     async def _get_http_client(self) -> httpx.AsyncClient:
         if self._http_client is None:
+            # HTTP/2 требует пакет h2; без него остаемся на HTTP/1.1
+            http2 = self._http2 and importlib.util.find_spec("h2") is not None
             self._http_client = httpx.AsyncClient(
                 base_url=self._rest_base,
-                timeout=httpx.Timeout(10.0, connect=5.0),
+                timeout=httpx.Timeout(10.0, connect=5.0, pool=5.0),
+                limits=self._http_limits,
+                http2=http2,
             )
         return self._http_client
 
+    async def _prewarm_http(self) -> None:
+        # DNS + TCP + TLS заранее, чтобы первые запросы не платили за установку соединения
+        n = self._http_prewarm_connections
+        if n <= 0:
+            return
+        client = await self._get_http_client()
+        if self._http2 and importlib.util.find_spec("h2") is not None:
+            n = 1
+        n = min(n, self._http_limits.max_keepalive_connections or 1)
+        await asyncio.gather(
+            *(client.get("/api/v5/public/time", headers=self._base_headers()) for _ in range(n)),
+            return_exceptions=True,
+        )
+
+    def http_pool_stats(self) -> Dict[str, Any]:
+        limits = self._http_limits
+        stats: Dict[str, Any] = {
+            "http2": bool(self._http2 and importlib.util.find_spec("h2") is not None),
+            "max_connections": limits.max_connections,
+            "max_keepalive_connections": limits.max_keepalive_connections,
+            "keepalive_expiry": limits.keepalive_expiry,
+            "in_flight": self._http_in_flight,
+            "in_flight_peak": self._http_in_flight_peak,
+            "saturated_total": self._http_saturated_total,
+            "connections": None,
+            "idle_connections": None,
+        }
+        # httpx не публикует пул; смотрим в httpcore, если он доступен
+        pool = getattr(getattr(self._http_client, "_transport", None), "_pool", None)
+        conns = getattr(pool, "connections", None)
+        if conns is not None:
+            stats["connections"] = len(conns)
+            stats["idle_connections"] = sum(1 for c in conns if c.is_idle())
+        return stats
+
+    def _http_acquire(self) -> None:
+        self._http_in_flight += 1
+        if self._http_in_flight > self._http_in_flight_peak:
+            self._http_in_flight_peak = self._http_in_flight
+        if self._http_in_flight > (self._http_limits.max_connections or 0) and not self._http2:
+            self._http_saturated_total += 1
+
+    def _http_release(self) -> None:
+        self._http_in_flight -= 1
+
+    def _observe_rest(self, method: str, path: str, resp: Optional[httpx.Response], t0: float) -> None:
+        status = str(resp.status_code) if resp is not None else "error"
+        REST_LATENCY.labels(method.upper(), path, status).observe(time.perf_counter() - t0)
+
     def _normalize_path(self, path: str) -> str:
         if not path.startswith("/"):
             path = "/" + path
@@ -36,18 +105,81 @@ class OkxHttpMixin:
             items.append((k, str(v)))
         return urlencode(items)
 
+    def _flight_key(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        api_key: Optional[str],
+    ) -> Tuple[str, str, Tuple[Tuple[str, str], ...], str]:
+        items = tuple(
+            (str(k), str(v)) for k, v in sorted((params or {}).items()) if v is not None
+        )
+        return method.upper(), path, items, api_key or ""
+
+    def _rest_cache_for(self, path: str) -> Optional[TtlStore]:
+        for prefix, store in self._rest_cache.items():
+            if path.startswith(prefix):
+                return store
+        return None
+
+    def _on_flight_done(self, key: Tuple, fut: asyncio.Future, store: Optional[TtlStore]) -> None:
+        if self._rest_inflight.get(key) is fut:
+            self._rest_inflight.pop(key, None)
+        if fut.cancelled():
+            return
+        # забираем исключение, даже если все ожидающие уже отменены
+        if fut.exception() is not None:
+            return
+        if store is not None:
+            store.put(key, fut.result())
+
+    async def _single_flight(
+        self,
+        key: Tuple,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        store = self._rest_cache_for(key[1])
+        if store is not None:
+            hit = store.get(key)
+            if hit is not None:
+                return _response_copy(hit)
+
+        fut = self._rest_inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fetch())
+            self._rest_inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key, s=store: self._on_flight_done(k, f, s))
+        # shield: отмена одного из ожидающих не должна отменять общий запрос
+        return _response_copy(await asyncio.shield(fut))
+
     async def _request_public(
         self,
         path: str,
         params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        client = await self._get_http_client()
         path = self._normalize_path(path)
+        key = self._flight_key("GET", path, params, None)
+        return await self._single_flight(key, lambda: self._request_public_once(path, params))
+
+    async def _request_public_once(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        client = await self._get_http_client()
 
-        resp = await client.get(path, params=params, headers=self._base_headers())
+        resp = None
+        t0 = time.perf_counter()
+        self._http_acquire()
+        try:
+            resp = await client.get(path, params=params, headers=self._base_headers())
+        finally:
+            self._http_release()
+            self._observe_rest("GET", path, resp, t0)
         resp.raise_for_status()
 
-        data = resp.json()
+        data = codec.loads(resp.content)
         if data.get("code") not in ("0", 0, None):
             raise RuntimeError(f"OKX error {data.get('code')}: {data.get('msg')}")
         return data
@@ -62,11 +194,26 @@ class OkxHttpMixin:
         if not self._api_key or not self._api_secret or not self._api_passphrase:
             raise RuntimeError("OKX API ключи не заданы")
 
-        client = await self._get_http_client()
         path = self._normalize_path(path)
+        if method.upper() == "GET" and not body:
+            key = self._flight_key("GET", path, params, self._api_key)
+            return await self._single_flight(
+                key,
+                lambda: self._request_private_once(method, path, params, body),
+            )
+        return await self._request_private_once(method, path, params, body)
+
+    async def _request_private_once(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        client = await self._get_http_client()
 
         timestamp = self._rest_timestamp()
-        body_str = json.dumps(body) if body else ""
+        body_str = codec.dumps(body) if body else ""
 
         #важно: для OKX подпись должна включать query string, если она есть
         request_path_for_sign = path
@@ -95,16 +242,23 @@ class OkxHttpMixin:
         }
 
         #params не передаем отдельно, чтобы кодирование query совпало с тем, что подписали
-        resp = await client.request(
-            method.upper(),
-            request_url,
-            params=None,
-            content=body_str if body else None,
-            headers=headers,
-        )
+        resp = None
+        t0 = time.perf_counter()
+        self._http_acquire()
+        try:
+            resp = await client.request(
+                method.upper(),
+                request_url,
+                params=None,
+                content=body_str if body else None,
+                headers=headers,
+            )
+        finally:
+            self._http_release()
+            self._observe_rest(method, path, resp, t0)
         resp.raise_for_status()
 
-        data = resp.json()
+        data = codec.loads(resp.content)
         if data.get("code") not in ("0", 0, None):
             raise RuntimeError(f"OKX error {data.get('code')}: {data.get('msg')}")
         return data
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from adapters.okx.adapter import OkxAdapter
+from adapters.okx.records import Candle, Ticker
+from ingest.client import IngestClient
+
+# Адаптер воркера шлюза при запуске за процессом приема (python -m ingest): стаканы,
+# котировки и свечи приходят уже разобранными из общего процесса, остальное (REST,
+# заявки, приватные каналы) — как у OkxAdapter.
+
+_STOP = {"ev": "stop"}
+
+
+class OkxIngestProxyAdapter(OkxAdapter):
+    def __init__(self, ingest_socket: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._ingest = IngestClient(ingest_socket)
+
+    async def _ingest_subscribe(
+        self,
+        kind: str,
+        args: Dict[str, Any],
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]],
+        on_error: Optional[Callable[[Dict[str, Any]], Any]],
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]],
+        record: Optional[type] = None,
+        on_symbol_error: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ) -> None:
+        subscribed_sent = False
+        # отклоненные символы списка: после переподключения к процессу приема
+        # он повторяет их, клиенту каждый сообщаем один раз
+        failed: set[str] = set()
+        backoff = self._reconnect.backoff("ingest")
+        gap_since: Optional[int] = None
+        while not stop_event.is_set():
+            key = None
+            q = None
+            watcher = None
+            try:
+                key, q = await self._ingest.subscribe(kind, args)
+                # stop будит ожидание очереди сразу, без таймаута на каждое сообщение
+                watcher = asyncio.create_task(self._ingest_stop_on(stop_event, q))
+                while True:
+                    msg = await q.get()
+                    ev = msg.get("ev")
+                    if ev == "data":
+                        d = msg.get("d")
+                        # тикеры и свечи приходят как dict: восстанавливаем ту же запись,
+                        # что отдал бы OkxAdapter
+                        res = on_data(record.from_mapping(d) if record is not None else d)
+                        if asyncio.iscoroutine(res):
+                            await res
+                    elif ev == "subscribed":
+                        if (not subscribed_sent) and on_subscribed is not None:
+                            res = on_subscribed({"event": "subscribe"})
+                            if asyncio.iscoroutine(res):
+                                await res
+                        subscribed_sent = True
+                        backoff.reset()
+                        if gap_since is not None:
+                            # переподключились к процессу приема: пропуск на нашей стороне
+                            await self._ws_notify_gap(on_gap, kind, [args], gap_since)
+                            gap_since = None
+                    elif ev == "symbol_error":
+                        d = msg.get("d") or {}
+                        inst_id = str(d.get("instId") or "")
+                        if inst_id not in failed:
+                            failed.add(inst_id)
+                            if on_symbol_error is not None:
+                                res = on_symbol_error(inst_id, d)
+                                if asyncio.iscoroutine(res):
+                                    await res
+                    elif ev == "gap":
+                        # процесс приема сам переподключился к OKX
+                        if on_gap is not None:
+                            res = on_gap(msg.get("d") or {"event": "gap"})
+                            if asyncio.iscoroutine(res):
+                                await res
+                    elif ev == "error":
+                        if on_error is not None:
+                            res = on_error(msg.get("d") or {"event": "error"})
+                            if asyncio.iscoroutine(res):
+                                await res
+                        return
+                    elif ev == "stop":
+                        return
+                    else:
+                        raise ConnectionError("ingest connection closed")
+
+            except Exception:
+                if subscribed_sent and gap_since is None:
+                    gap_since = int(time.time() * 1000)
+                await backoff.sleep()
+                continue
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
+                if key is not None:
+                    await self._ingest.unsubscribe(key, q)
+
+    @staticmethod
+    async def _ingest_stop_on(stop_event: asyncio.Event, q: asyncio.Queue) -> None:
+        await stop_event.wait()
+        q.put_nowait(_STOP)
+
+    async def subscribe_order_book(
+        self,
+        symbol: str,
+        depth: int,
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> None:
+        await self._ingest_subscribe("book", {"symbol": symbol}, on_data, stop_event, on_subscribed, on_error, on_gap)
+
+    async def subscribe_quotes(
+        self,
+        symbol: str,
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> None:
+        await self._ingest_subscribe(
+            "quotes", {"symbol": symbol}, on_data, stop_event, on_subscribed, on_error, on_gap, Ticker
+        )
+
+    async def subscribe_quotes_multi(
+        self,
+        symbols: List[str],
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_symbol_error: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ) -> None:
+        # список сортируем: одинаковые наборы в разных воркерах дают один апстрим
+        await self._ingest_subscribe(
+            "quotes",
+            {"symbols": sorted(set(symbols))},
+            on_data,
+            stop_event,
+            on_subscribed,
+            on_error,
+            on_gap,
+            Ticker,
+            on_symbol_error,
+        )
+
+    async def subscribe_bars(
+        self,
+        symbol: str,
+        tf: str,
+        from_ts: int,
+        skip_history: bool,
+        split_adjust: bool,
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        unsub_args: Optional[List[Dict[str, Any]]] = None,
+        inst_type: Optional[str] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> None:
+        await self._ingest_subscribe(
+            "bars",
+            {"symbol": symbol, "tf": tf, "inst_type": inst_type},
+            on_data,
+            stop_event,
+            on_subscribed,
+            on_error,
+            on_gap,
+            Candle,
+        )
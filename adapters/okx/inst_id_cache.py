@@ -1,5 +1,7 @@
 import time
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from adapters.okx.ticks import TickScale
 
 
 class OkxInstIdCodeMixin:
@@ -23,6 +25,7 @@ class OkxInstIdCodeMixin:
 
     async def _refresh_inst_id_code_cache(self) -> None:
         new_cache: Dict[str, str] = {}
+        new_scales: Dict[str, TickScale] = {}
         for one_type in ("SPOT", "FUTURES", "SWAP"):
             raw = await self._request_public(
                 path="/public/instruments",
@@ -33,11 +36,15 @@ class OkxInstIdCodeMixin:
                 inst_id_code = (it or {}).get("instIdCode")
                 if not inst_id:
                     continue
+                scale = TickScale.from_steps(it.get("tickSz"), it.get("lotSz"))
+                if scale is not None:
+                    new_scales[inst_id] = scale
                 if inst_id_code is None or str(inst_id_code).strip() == "":
                     continue
                 new_cache[f"{one_type}:{inst_id}"] = str(inst_id_code)
 
         self._inst_id_code_cache = new_cache
+        self._tick_scales = new_scales
         self._inst_id_code_cache_ts = time.time()
 
     async def _ensure_inst_id_code_cache(self) -> None:
@@ -49,3 +56,29 @@ class OkxInstIdCodeMixin:
                 return
             await self._refresh_inst_id_code_cache()
 
+
+    async def refresh_instrument_meta(self) -> None:
+        await self._refresh_inst_id_code_cache()
+
+    def export_instrument_meta(self) -> Dict[str, Any]:
+        return {
+            "codes": dict(self._inst_id_code_cache),
+            "scales": {k: [s.px_dec, s.sz_dec] for k, s in self._tick_scales.items()},
+        }
+
+    def import_instrument_meta(self, meta: Dict[str, Any]) -> None:
+        # снимок с диска при старте; уже загруженные с биржи данные не перетираем
+        if self._inst_id_code_cache:
+            return
+        codes = meta.get("codes") or {}
+        if not isinstance(codes, dict) or not codes:
+            return
+        self._inst_id_code_cache = {str(k): str(v) for k, v in codes.items()}
+        self._inst_id_code_cache_ts = 0.0
+        scales: Dict[str, TickScale] = {}
+        for k, v in (meta.get("scales") or {}).items():
+            try:
+                scales[str(k)] = TickScale(int(v[0]), int(v[1]))
+            except (TypeError, ValueError, IndexError):
+                continue
+        self._tick_scales = scales
@@ -0,0 +1,90 @@
+import asyncio
+import random
+import time
+from typing import Dict
+
+from adapters.okx.telemetry import WS_CONNECT_WAIT, WS_RECONNECTS
+
+# Общая политика переподключения WS к OKX. Вместо фиксированной секунды на каждую
+# подписку — экспоненциальная задержка с полным джиттером (сокеты, оборванные разом,
+# не переподключаются синхронной волной), а каждое новое подключение берет жетон из
+# бюджета своего типа сокета: OKX ограничивает число подключений в секунду с одного IP,
+# поэтому после обрыва подписки поднимаются ровным потоком в порядке очереди.
+
+
+class Backoff:
+    __slots__ = ("_base", "_cap", "_delay", "_kind", "attempts")
+
+    def __init__(self, base_sec: float, cap_sec: float, kind: str):
+        self._base = base_sec
+        self._cap = cap_sec
+        self._delay = base_sec
+        self._kind = kind
+        self.attempts = 0
+
+    def reset(self) -> None:
+        # подписка снова живая: следующий обрыв начинается с базовой задержки
+        self._delay = self._base
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        d = random.uniform(0.0, self._delay)
+        self._delay = min(self._delay * 2.0, self._cap)
+        self.attempts += 1
+        return d
+
+    async def sleep(self) -> None:
+        WS_RECONNECTS.labels(self._kind).inc()
+        await asyncio.sleep(self.next_delay())
+
+
+class _Bucket:
+    __slots__ = ("rate", "burst", "tokens", "ts", "lock")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = float(max(1, burst))
+        self.tokens = self.burst
+        self.ts = time.monotonic()
+        # asyncio.Lock отдает захват в порядке очереди: ожидающие подключения идут FIFO
+        self.lock = asyncio.Lock()
+
+    async def take(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            if self.tokens < 1.0:
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.ts = time.monotonic()
+            self.tokens -= 1.0
+
+
+class ReconnectManager:
+    def __init__(
+        self,
+        connect_rate: float = 3.0,
+        connect_burst: int = 3,
+        backoff_base_sec: float = 0.5,
+        backoff_max_sec: float = 30.0,
+    ) -> None:
+        # connect_rate <= 0 — без ограничения частоты подключений
+        self._rate = float(connect_rate)
+        self._burst = int(connect_burst)
+        self._base = max(0.01, float(backoff_base_sec))
+        self._cap = max(self._base, float(backoff_max_sec))
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def backoff(self, kind: str) -> Backoff:
+        return Backoff(self._base, self._cap, kind)
+
+    async def acquire(self, kind: str) -> None:
+        if self._rate <= 0:
+            return
+        bucket = self._buckets.get(kind)
+        if bucket is None:
+            bucket = self._buckets[kind] = _Bucket(self._rate, self._burst)
+        t0 = time.perf_counter()
+        await bucket.take()
+        WS_CONNECT_WAIT.labels(kind).observe(time.perf_counter() - t0)
@@ -0,0 +1,286 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Компактные записи для разобранных объектов OKX (тикеры, свечи, заявки, сделки,
+# позиции). Поля лежат в __slots__ без __dict__ на экземпляр; чтение — атрибутом.
+# Для старого кода записи ведут себя как dict только для чтения (get, [], keys,
+# items, **r), а в JSON уходят через to_dict (см. common.codec).
+# Уровни стакана остаются кортежами (price, size).
+
+
+class Record:
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _keyset: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._keyset = frozenset(cls.__slots__)
+
+    @classmethod
+    def from_mapping(cls, m: Dict[str, Any]):
+        r = cls.__new__(cls)
+        for f in cls.__slots__:
+            setattr(r, f, m.get(f))
+        return r
+
+    @classmethod
+    def of(cls, obj: Any):
+        # записи из процесса приема и прочие dict приводятся к записи один раз
+        if isinstance(obj, cls):
+            return obj
+        return cls.from_mapping(obj or {})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._keyset:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._keyset:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keyset
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self._fields]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f: getattr(self, f) for f in self._fields}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Ticker(Record):
+    __slots__ = (
+        "symbol",
+        "ts",
+        "last",
+        "bid",
+        "ask",
+        "bid_sz",
+        "ask_sz",
+        "high24h",
+        "low24h",
+        "open24h",
+        "vol24h",
+        "_trace",
+    )
+    _fields = __slots__[:-1]
+
+    def __init__(
+        self,
+        symbol: str,
+        ts: int,
+        last: float,
+        bid: float,
+        ask: float,
+        bid_sz: float,
+        ask_sz: float,
+        high24h: float,
+        low24h: float,
+        open24h: float,
+        vol24h: float,
+    ) -> None:
+        self.symbol = symbol
+        self.ts = ts
+        self.last = last
+        self.bid = bid
+        self.ask = ask
+        self.bid_sz = bid_sz
+        self.ask_sz = ask_sz
+        self.high24h = high24h
+        self.low24h = low24h
+        self.open24h = open24h
+        self.vol24h = vol24h
+        self._trace: Optional[dict] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = super().to_dict()
+        if self._trace is not None:
+            d["_trace"] = self._trace
+        return d
+
+
+class Candle(Record):
+    __slots__ = ("symbol", "ts", "open", "high", "low", "close", "volume", "confirm")
+    _fields = __slots__
+
+    def __init__(
+        self,
+        symbol: str,
+        ts: int,
+        open: Optional[float],
+        high: Optional[float],
+        low: Optional[float],
+        close: Optional[float],
+        volume: float,
+        confirm: int,
+    ) -> None:
+        self.symbol = symbol
+        self.ts = ts
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.confirm = confirm
+
+
+class Order(Record):
+    __slots__ = (
+        "id",
+        "clOrdId",
+        "symbol",
+        "type",
+        "side",
+        "status",
+        "price",
+        "qty",
+        "filled",
+        "ts_create",
+        "ts_update",
+        "tif",
+    )
+    _fields = __slots__
+
+    def __init__(
+        self,
+        id: str,
+        clOrdId: str,
+        symbol: str,
+        type: str,
+        side: str,
+        status: str,
+        price: float,
+        qty: float,
+        filled: float,
+        ts_create: int,
+        ts_update: int,
+        tif: str,
+    ) -> None:
+        self.id = id
+        self.clOrdId = clOrdId
+        self.symbol = symbol
+        self.type = type
+        self.side = side
+        self.status = status
+        self.price = price
+        self.qty = qty
+        self.filled = filled
+        self.ts_create = ts_create
+        self.ts_update = ts_update
+        self.tif = tif
+
+
+class Fill(Record):
+    __slots__ = (
+        "id",
+        "orderno",
+        "comment",
+        "symbol",
+        "exchange",
+        "instType",
+        "date",
+        "side",
+        "price",
+        "qtyUnits",
+        "qty",
+        "ts",
+        "commission",
+        "feeCcy",
+        "volume",
+        "value",
+        "is_history",
+    )
+    _fields = __slots__
+
+    def __init__(
+        self,
+        id: str,
+        orderno: str,
+        symbol: str,
+        instType: Optional[str],
+        date: Optional[str],
+        side: str,
+        price: float,
+        qty: float,
+        ts: int,
+        commission: float,
+        feeCcy: str,
+        value: float,
+        is_history: bool,
+    ) -> None:
+        self.id = id
+        self.orderno = orderno
+        self.comment = None
+        self.symbol = symbol
+        self.exchange = "OKX"
+        self.instType = instType
+        self.date = date
+        self.side = side
+        self.price = price
+        self.qtyUnits = qty
+        self.qty = qty
+        self.ts = ts
+        self.commission = commission
+        self.feeCcy = feeCcy
+        self.volume = value
+        self.value = value
+        self.is_history = is_history
+
+
+class Position(Record):
+    # и позиции по инструментам, и валютные остатки (isCurrency=True)
+    __slots__ = (
+        "symbol",
+        "qtyUnits",
+        "avgPrice",
+        "currentPrice",
+        "volume",
+        "currentVolume",
+        "lotSize",
+        "shortName",
+        "isCurrency",
+    )
+    _fields = __slots__
+
+    def __init__(
+        self,
+        symbol: str,
+        qtyUnits: float,
+        avgPrice: Optional[float],
+        currentPrice: Optional[float],
+        volume: Optional[float],
+        currentVolume: Optional[float],
+        isCurrency: bool,
+    ) -> None:
+        self.symbol = symbol
+        self.qtyUnits = qtyUnits
+        self.avgPrice = avgPrice
+        self.currentPrice = currentPrice
+        self.volume = volume
+        self.currentVolume = currentVolume
+        self.lotSize = 0.0
+        self.shortName = symbol
+        self.isCurrency = isCurrency
@@ -0,0 +1,187 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from adapters.okx.adapter import OkxAdapter
+from common import codec
+from common.frame_log import read_frames
+
+# Воспроизведение записанных фреймов OKX через настоящие subscribe_*: вместо сокета
+# отдается заглушка, которая на subscribe отвечает событием подписки и затем выдает
+# записанные data-фреймы с тем же arg в исходном порядке. speed: 1 — реальное время,
+# N — в N раз быстрее, 0 — без пауз.
+
+
+class ReplayFeed:
+    def __init__(self, path: str, speed: float = 1.0):
+        self.speed = max(0.0, float(speed))
+        self._frames: Dict[str, List[Tuple[float, Dict[str, Any], str]]] = {}
+        self._t_first: Optional[float] = None
+        self._wall_start: Optional[float] = None
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.total = 0
+        for rec in read_frames(path):
+            if rec.get("d") != "in":
+                continue
+            raw = rec.get("f") or ""
+            try:
+                msg = codec.loads(raw)
+            except Exception:
+                continue
+            arg = msg.get("arg") if isinstance(msg, dict) else None
+            if not isinstance(arg, dict) or "data" not in msg:
+                continue
+            t = float(rec.get("t") or 0.0)
+            if self._t_first is None or t < self._t_first:
+                self._t_first = t
+            self._frames.setdefault(str(arg.get("channel") or ""), []).append((t, arg, raw))
+            self.total += 1
+        for frames in self._frames.values():
+            frames.sort(key=lambda x: x[0])
+
+    def channels(self) -> Dict[str, int]:
+        return {ch: len(v) for ch, v in self._frames.items()}
+
+    def args(self) -> List[Dict[str, Any]]:
+        seen: Dict[str, Dict[str, Any]] = {}
+        for frames in self._frames.values():
+            for _, arg, _ in frames:
+                key = codec.dumps(sorted((k, v) for k, v in arg.items() if k != "uid"))
+                seen.setdefault(key, {k: v for k, v in arg.items() if k != "uid"})
+        return list(seen.values())
+
+    def matching(self, sub_arg: Dict[str, Any]):
+        for t, arg, raw in self._frames.get(str(sub_arg.get("channel") or ""), []):
+            if all(arg.get(k) == v for k, v in sub_arg.items()):
+                yield t, raw
+
+    async def wait_until(self, t: float) -> None:
+        if self.speed <= 0 or self._t_first is None:
+            return
+        if self._wall_start is None:
+            # общие часы для всех подписок: взаимный порядок каналов сохраняется
+            self._wall_start = time.monotonic()
+        delay = self._wall_start + (t - self._t_first) / self.speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pump_started(self) -> None:
+        self._active += 1
+        self._idle.clear()
+
+    def _pump_done(self) -> None:
+        self._active -= 1
+        if self._active <= 0:
+            self._idle.set()
+
+    async def wait_drained(self) -> None:
+        await self._idle.wait()
+
+
+_CLOSED = object()
+
+
+class ReplaySocket:
+    def __init__(self, feed: ReplayFeed, max_pending: int = 1024):
+        self._feed = feed
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._pumps: Dict[str, asyncio.Task] = {}
+
+    async def send(self, message) -> None:
+        msg = codec.loads(message)
+        op = msg.get("op")
+        if op == "login":
+            await self._inbox.put(codec.dumps({"event": "login", "code": "0", "msg": "", "connId": "replay"}))
+            return
+        for arg in msg.get("args") or []:
+            key = codec.dumps(sorted(arg.items()))
+            if op == "subscribe":
+                await self._inbox.put(codec.dumps({"event": "subscribe", "arg": arg, "connId": "replay"}))
+                if key not in self._pumps:
+                    self._feed._pump_started()
+                    self._pumps[key] = asyncio.create_task(self._pump(arg))
+            elif op == "unsubscribe":
+                task = self._pumps.pop(key, None)
+                if task is not None:
+                    task.cancel()
+                await self._inbox.put(codec.dumps({"event": "unsubscribe", "arg": arg, "connId": "replay"}))
+
+    async def _pump(self, arg: Dict[str, Any]) -> None:
+        try:
+            n = 0
+            for t, raw in self._feed.matching(arg):
+                await self._feed.wait_until(t)
+                await self._inbox.put(raw)
+                n += 1
+                if self._feed.speed <= 0 and n % 256 == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._feed._pump_done()
+
+    async def recv(self):
+        raw = await self._inbox.get()
+        if raw is _CLOSED:
+            # как у настоящего сокета: recv после close завершается ошибкой
+            raise ConnectionError("replay socket closed")
+        return raw
+
+    def pending(self) -> int:
+        return self._inbox.qsize()
+
+    async def ping(self):
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(0.0)
+        return fut
+
+    async def close(self) -> None:
+        for task in self._pumps.values():
+            task.cancel()
+        self._pumps.clear()
+        try:
+            self._inbox.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass
+
+
+class OkxReplayAdapter(OkxAdapter):
+    def __init__(self, replay_path: str, replay_speed: float = 1.0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.replay_feed = ReplayFeed(replay_path, replay_speed)
+        self._replay_sockets: List[ReplaySocket] = []
+
+    @contextlib.asynccontextmanager
+    async def _ws_session(self, url: str) -> AsyncIterator[Any]:
+        ws = ReplaySocket(self.replay_feed)
+        self._replay_sockets.append(ws)
+        try:
+            yield ws
+        finally:
+            self._replay_sockets.remove(ws)
+            await ws.close()
+
+    def replay_pending(self) -> int:
+        return sum(ws.pending() for ws in self._replay_sockets)
+
+    def _ws_login_payload(self) -> Dict[str, Any]:
+        return {"op": "login", "args": []}
+
+    async def _ensure_order_ws(self):
+        raise RuntimeError("Режим воспроизведения: выставление заявок недоступно")
+
+    def warmup_stages(self) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        # REST (инструменты, история) идет на rest_base как обычно; сокета заявок нет
+        return {
+            "http_pool": self._prewarm_http,
+            "inst_id_codes": self._ensure_inst_id_code_cache,
+        }
+
+    async def warmup(self) -> None:
+        # без сети — пропускаем
+        try:
+            await self._prewarm_http()
+            await self._ensure_inst_id_code_cache()
+        except Exception:
+            pass
@@ -1,9 +1,11 @@
 from typing import Any, Dict, List
 
+from adapters.okx.records import Position
+
 
 class OkxRestAccountParsersMixin:
-    def _parse_okx_account_balance_any(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
+    def _parse_okx_account_balance_any(self, item: Dict[str, Any]) -> List[Position]:
+        out: List[Position] = []
         details = item.get("details") or []
         for d in details:
             ccy = (d.get("ccy") or "").strip()
@@ -14,22 +16,10 @@ class OkxRestAccountParsersMixin:
             eq = d.get("eq")
             qty = self._to_float(cash_bal if cash_bal is not None else eq)
 
-            out.append(
-                {
-                    "symbol": ccy,
-                    "qtyUnits": qty,
-                    "avgPrice": None,
-                    "currentPrice": None,
-                    "volume": None,
-                    "currentVolume": None,
-                    "lotSize": 0.0,
-                    "shortName": ccy,
-                    "isCurrency": True,
-                }
-            )
+            out.append(Position(ccy, qty, None, None, None, None, True))
         return out
 
-    def _parse_okx_position_any(self, d: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_okx_position_any(self, d: Dict[str, Any]) -> Position:
         inst_id = (d.get("instId") or "").strip()
         pos = self._to_float(d.get("pos"))
         avg_px = self._to_float(d.get("avgPx"))
@@ -42,17 +32,7 @@ class OkxRestAccountParsersMixin:
         vol = (avg_px * pos) if avg_px > 0 else None
         cur_vol = (cur_px * pos) if cur_px > 0 else None
 
-        return {
-            "symbol": inst_id,
-            "qtyUnits": pos,
-            "avgPrice": avg_px,
-            "currentPrice": cur_px,
-            "volume": vol,
-            "currentVolume": cur_vol,
-            "lotSize": 0.0,
-            "shortName": inst_id,
-            "isCurrency": False,
-        }
+        return Position(inst_id, pos, avg_px, cur_px, vol, cur_vol, False)
 
     def _parse_okx_account_summary_any(self, acc: Dict[str, Any]) -> Dict[str, Any]:
         total_eq = self._to_float(acc.get("totalEq"))
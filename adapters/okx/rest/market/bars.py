@@ -1,5 +1,8 @@
 from typing import Any, Dict, List, Optional
 
+from adapters.okx.columns import Columns
+from adapters.okx.records import Candle
+
 
 class OkxRestMarketBarsMixin:
     async def get_bars_history(
@@ -32,9 +35,8 @@ class OkxRestMarketBarsMixin:
                 break
 
             oldest_ts_ms: Optional[int] = None
-            for arr in rows:
-                b = self._parse_okx_candle_any(symbol, arr, inst_type=inst_type)
-                ts_ms = int(b.get("ts", 0))
+            for b in self._parse_okx_candles_bulk(symbol, rows, inst_type=inst_type).rows():
+                ts_ms = b.ts
                 if ts_ms <= 0:
                     continue
                 if ts_ms in seen_ts:
@@ -51,5 +53,9 @@ class OkxRestMarketBarsMixin:
                 break
             after = oldest_ts_ms
 
-        collected.sort(key=lambda x: int(x.get("ts", 0)))
+        collected.sort(key=lambda x: x.ts)
         return collected
+
+    async def get_bars_history_columns(self, symbol: str, tf: str, from_ts: int, **kwargs) -> Columns:
+        bars = await self.get_bars_history(symbol=symbol, tf=tf, from_ts=from_ts, **kwargs)
+        return Columns.from_rows(Candle._fields, bars, Candle)
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
-from typing import Any, List, Optional
+from typing import List
+
+from adapters.okx import columns
 
 
 class OkxRestMarketInstrumentsMixin:
@@ -9,17 +11,15 @@ class OkxRestMarketInstrumentsMixin:
             params={"instType": inst_type},
         )
 
-        def to_opt_float(v: Any) -> Optional[float]:
-            try:
-                return float(v)
-            except (TypeError, ValueError):
-                return None
+        items = raw.get("data", []) or []
+        ct_vals = columns.opt_floats([item.get("ctVal") for item in items])
+        lot_szs = columns.opt_floats([item.get("lotSz") for item in items])
+        tick_szs = columns.opt_floats([item.get("tickSz") for item in items])
+        exp_mss = columns.to_list(columns.ints([item.get("expTime") for item in items]))
 
         out: List[dict] = []
-        for item in raw.get("data", []):
+        for item, ct_val, lot_sz, tick_sz, exp_ms in zip(items, ct_vals, lot_szs, tick_szs, exp_mss):
             inst_type_item = item.get("instType") or inst_type
-            ct_val = to_opt_float(item.get("ctVal"))
-            exp_ms = self._to_int(item.get("expTime"))
             cancellation = (
                 datetime.fromtimestamp(exp_ms / 1000.0, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
                 if exp_ms > 0 else None
@@ -38,8 +38,8 @@ class OkxRestMarketInstrumentsMixin:
                     "ctValCcy": item.get("ctValCcy"),
                     "facevalue": ct_val if str(inst_type_item).upper() in ("FUTURES", "SWAP") else None,
                     "cancellation": cancellation,
-                    "lotSz": to_opt_float(item.get("lotSz")),
-                    "tickSz": to_opt_float(item.get("tickSz")),
+                    "lotSz": lot_sz,
+                    "tickSz": tick_sz,
                 }
             )
         return out
@@ -1,4 +1,9 @@
-from typing import Any, Dict, Optional
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+
+from adapters.okx import columns
+from adapters.okx.columns import Columns
+from adapters.okx.records import Candle, Ticker
 
 
 class OkxRestMarketParsersMixin:
@@ -42,7 +47,7 @@ class OkxRestMarketParsersMixin:
     def _tf_to_okx_ws_channel(self, tf: str) -> str:
         return "candle" + self._tf_to_okx_bar(tf)
 
-    def _parse_okx_candle_any(self, symbol: str, arr: list, inst_type: Optional[str] = None) -> dict:
+    def _parse_okx_candle_any(self, symbol: str, arr: list, inst_type: Optional[str] = None) -> Candle:
         def _get(a, i, default=None):
             return a[i] if (a is not None and i < len(a)) else default
 
@@ -64,16 +69,33 @@ class OkxRestMarketParsersMixin:
             vol = self._to_float(vol_raw) if vol_raw is not None else 0.0
         confirm_raw = _get(arr, 8, _get(arr, 7, 0))
         confirm = self._to_int(confirm_raw)
-        return {
-            "symbol": symbol,
-            "ts": ts_ms,
-            "open": o,
-            "high": h,
-            "low": l,
-            "close": c,
-            "volume": vol,
-            "confirm": confirm,
-        }
+        return Candle(symbol, ts_ms, o, h, l, c, vol, confirm)
+
+    def _parse_okx_candles_bulk(self, symbol: str, rows: List[list], inst_type: Optional[str] = None) -> Columns:
+        # строки history-candles: [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]
+        # пустые OHLC остаются None, как в _parse_okx_candle_any: такие свечи отбрасываются дальше
+        if any(len(arr) < 9 for arr in rows):
+            parsed = [self._parse_okx_candle_any(symbol, arr, inst_type=inst_type) for arr in rows]
+            return Columns.from_rows(Candle._fields, parsed, Candle)
+        cols = list(zip(*rows)) if rows else [()] * 9
+        if str(inst_type).upper().strip() in ("FUTURES", "SWAP"):
+            vol_raw = [c if c is not None else v for v, c in zip(cols[5], cols[6])]
+        else:
+            vol_raw = cols[5]
+        return Columns(
+            Candle._fields,
+            {
+                "symbol": [symbol] * len(rows),
+                "ts": columns.ints(cols[0]),
+                "open": columns.opt_floats(cols[1]),
+                "high": columns.opt_floats(cols[2]),
+                "low": columns.opt_floats(cols[3]),
+                "close": columns.opt_floats(cols[4]),
+                "volume": columns.floats(vol_raw),
+                "confirm": columns.ints(cols[8]),
+            },
+            Candle,
+        )
 
     def _parse_okx_order_book_any(self, symbol: str, item: Dict[str, Any], existing: bool) -> dict:
         ts_ms = self._to_int(item.get("ts"))
@@ -101,7 +123,7 @@ class OkxRestMarketParsersMixin:
             "existing": bool(existing),
         }
 
-    def _parse_okx_ticker_any(self, symbol: str, item: Dict[str, Any]) -> dict:
+    def _parse_okx_ticker_any(self, symbol: str, item: Dict[str, Any]) -> Ticker:
         ts_ms = self._to_int(item.get("ts"))
         last = self._to_float(item.get("last"))
         bid_px = self._to_float(item.get("bidPx"))
@@ -112,16 +134,31 @@ class OkxRestMarketParsersMixin:
         low_24h = self._to_float(item.get("low24h"))
         vol_24h_base = self._to_float(item.get("vol24h"))
         open_24h = self._to_float(item.get("open24h"))
-        return {
-            "symbol": symbol,
-            "ts": ts_ms,
-            "last": last,
-            "bid": bid_px,
-            "ask": ask_px,
-            "bid_sz": bid_sz,
-            "ask_sz": ask_sz,
-            "high24h": high_24h,
-            "low24h": low_24h,
-            "open24h": open_24h,
-            "vol24h": vol_24h_base,
+        return Ticker(
+            symbol,
+            ts_ms,
+            last,
+            bid_px,
+            ask_px,
+            bid_sz,
+            ask_sz,
+            high_24h,
+            low_24h,
+            open_24h,
+            vol_24h_base,
+        )
+
+    def _parse_okx_tickers_bulk(self, items: List[Dict[str, Any]]) -> Columns:
+        keys = ("instId", "ts", "last", "bidPx", "askPx", "bidSz", "askSz", "high24h", "low24h", "open24h", "vol24h")
+        try:
+            cols = list(zip(*map(itemgetter(*keys), items))) if items else [()] * len(keys)
+        except KeyError:
+            cols = [[it.get(k) for it in items] for k in keys]
+        inst_ids, ts, *prices = cols
+        out = {
+            "symbol": [s or "0" for s in inst_ids],
+            "ts": columns.ints(ts),
         }
+        for f, col in zip(Ticker._fields[2:], prices):
+            out[f] = columns.floats(col)
+        return Columns(Ticker._fields, out, Ticker)
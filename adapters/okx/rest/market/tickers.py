@@ -1,5 +1,7 @@
 from typing import Any, Dict, List
 
+from adapters.okx.columns import Columns
+
 
 class OkxRestMarketTickersMixin:
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
@@ -24,13 +26,12 @@ class OkxRestMarketTickersMixin:
             }
         return self._parse_okx_ticker_any(symbol, items[0])
 
-    async def list_tickers(self, inst_type: str = "SPOT") -> List[Dict[str, Any]]:
+    async def list_tickers_columns(self, inst_type: str = "SPOT") -> Columns:
         raw = await self._request_public(
             path="/market/tickers",
             params={"instType": inst_type},
         )
-        out: List[Dict[str, Any]] = []
-        for item in raw.get("data", []) or []:
-            sym = item.get("instId") or "0"
-            out.append(self._parse_okx_ticker_any(sym, item))
-        return out
+        return self._parse_okx_tickers_bulk(raw.get("data", []) or [])
+
+    async def list_tickers(self, inst_type: str = "SPOT") -> List[Dict[str, Any]]:
+        return (await self.list_tickers_columns(inst_type=inst_type)).rows()
@@ -1,10 +1,13 @@
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from adapters.okx.records import Fill, Order
+
 
 class OkxRestOrderParsersMixin:
-    def _parse_okx_order_any(self, d: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_okx_order_any(self, d: Dict[str, Any]) -> Order:
         ord_id = d.get("ordId") or "0"
+        cl_ord_id = d.get("clOrdId") or ""
         inst_id = d.get("instId") or "0"
         ord_type = d.get("ordType") or "0"
         side = d.get("side") or "0"
@@ -17,26 +20,27 @@ class OkxRestOrderParsersMixin:
         c_time = self._to_int(d.get("cTime"))
         u_time = self._to_int(d.get("uTime"))
         tif = d.get("tif") or "0"
-        return {
-            "id": ord_id,
-            "symbol": inst_id,
-            "type": ord_type,
-            "side": side,
-            "status": state,
-            "price": px,
-            "qty": sz,
-            "filled": fill_sz,
-            "ts_create": c_time,
-            "ts_update": u_time,
-            "tif": tif,
-        }
+        return Order(
+            ord_id,
+            cl_ord_id,
+            inst_id,
+            ord_type,
+            side,
+            state,
+            px,
+            sz,
+            fill_sz,
+            c_time,
+            u_time,
+            tif,
+        )
 
     def _parse_okx_trade_any(
         self,
         d: Dict[str, Any],
         is_history: bool,
         inst_type: Optional[str] = None,
-    ) -> Dict[str, Any]:
+    ) -> Fill:
         trade_id = d.get("tradeId") or d.get("billId") or "0"
         ord_id = d.get("ordId") or "0"
         inst_id = d.get("instId") or "0"
@@ -52,7 +56,6 @@ class OkxRestOrderParsersMixin:
         commission = abs(self._to_float(fee)) if fee is not None else 0.0
         fee_ccy = d.get("feeCcy") or "0"
         value = fill_px * fill_sz
-        volume = value
         inst_type_s = str(inst_type or d.get("instType") or "").upper() or None
         date_iso = None
         if ts_ms and ts_ms > 0:
@@ -61,22 +64,18 @@ class OkxRestOrderParsersMixin:
                 date_iso = dt.strftime("%Y-%m-%dT%H:%M:%S.%f") + "0Z"
             except Exception:
                 date_iso = None
-        return {
-            "id": str(trade_id),
-            "orderno": str(ord_id),
-            "comment": None,
-            "symbol": inst_id,
-            "exchange": "OKX",
-            "instType": inst_type_s,
-            "date": date_iso,
-            "side": side,
-            "price": fill_px,
-            "qtyUnits": fill_sz,
-            "qty": fill_sz,
-            "ts": ts_ms,
-            "commission": commission,
-            "feeCcy": fee_ccy,
-            "volume": volume,
-            "value": value,
-            "is_history": bool(is_history),
-        }
+        return Fill(
+            str(trade_id),
+            str(ord_id),
+            inst_id,
+            inst_type_s,
+            date_iso,
+            side,
+            fill_px,
+            fill_sz,
+            ts_ms,
+            commission,
+            fee_ccy,
+            value,
+            bool(is_history),
+        )
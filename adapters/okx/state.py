@@ -1,20 +1,35 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+from adapters.okx.reconnect import ReconnectManager
+from adapters.okx.ticks import TickScale
+from common.frame_log import FrameRecorder
+from common.ttl_store import TtlStore
+
+REST_CACHE_MAX_ENTRIES = 1024
+
 
 class OkxStateMixin:
     def _apply_okx_book_delta(
         self,
-        side_state: Dict[float, float],
+        side_state: Dict[int, int],
         levels: List[Any],
+        scale: TickScale,
     ) -> None:
+        pm = scale.px_mult
+        sm = scale.sz_mult
         for lvl in levels or []:
-            if not lvl:
-                continue
-            price = self._to_float(lvl[0]) if len(lvl) > 0 else 0.0
-            sz = self._to_float(lvl[1]) if len(lvl) > 1 else 0.0
+            # цены и объемы неотрицательны: int(x + 0.5) — то же округление, что round()
+            try:
+                price = int(float(lvl[0]) * pm + 0.5)
+                sz = int(float(lvl[1]) * sm + 0.5)
+            except (IndexError, TypeError, ValueError, OverflowError):
+                if not lvl:
+                    continue
+                price = scale.px_units(lvl[0])
+                sz = scale.sz_units(lvl[1]) if len(lvl) > 1 else 0
             if price <= 0:
                 continue
             if sz <= 0:
@@ -24,6 +39,38 @@ class OkxStateMixin:
                 # установка/обновление уровня
                 side_state[price] = sz
 
+    @staticmethod
+    def _rescale_okx_book(side_state: Dict[int, int], old: TickScale, new: TickScale) -> None:
+        # переход на более мелкую сетку точный: единицы умножаются на степень 10
+        pk = 10 ** (new.px_dec - old.px_dec)
+        sk = 10 ** (new.sz_dec - old.sz_dec)
+        rescaled = {p * pk: sz * sk for p, sz in side_state.items()}
+        side_state.clear()
+        side_state.update(rescaled)
+
+    def _build_okx_book(
+        self,
+        symbol: str,
+        ts_ms: int,
+        bids_state: Dict[int, int],
+        asks_state: Dict[int, int],
+        is_snapshot: bool,
+        scale: TickScale,
+    ) -> Dict[str, Any]:
+        pm = scale.px_mult
+        sm = scale.sz_mult
+        return {
+            "symbol": symbol,
+            "ts": ts_ms,
+            "bids": [(p / pm, bids_state[p] / sm) for p in sorted(bids_state, reverse=True)],
+            "asks": [(p / pm, asks_state[p] / sm) for p in sorted(asks_state)],
+            "existing": bool(is_snapshot),
+        }
+
+    def _tick_scale(self, symbol: str) -> Optional[TickScale]:
+        # шаги цены/объема из /public/instruments (заполняются вместе с кэшем instIdCode)
+        return self._tick_scales.get(symbol)
+
     def __init__(
         self,
         rest_base: str = "https://www.okx.com",
@@ -31,6 +78,20 @@ class OkxStateMixin:
         api_secret: Optional[str] = None,
         api_passphrase: Optional[str] = None,
         demo: bool = False,
+        rest_cache_ttl: Optional[Dict[str, float]] = None,
+        http2: bool = False,
+        http_max_connections: int = 100,
+        http_max_keepalive_connections: int = 20,
+        http_keepalive_expiry: float = 30.0,
+        http_prewarm_connections: int = 2,
+        ws_public_url: Optional[str] = None,
+        ws_private_url: Optional[str] = None,
+        ws_business_url: Optional[str] = None,
+        frame_recorder: Optional[FrameRecorder] = None,
+        ws_connect_rate: float = 3.0,
+        ws_connect_burst: int = 3,
+        ws_backoff_base_sec: float = 0.5,
+        ws_backoff_max_sec: float = 30.0,
     ) -> None:
         self._rest_base = rest_base.rstrip("/")
 
@@ -40,10 +101,35 @@ class OkxStateMixin:
         self._demo = demo
 
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._http2 = bool(http2)
+        self._http_limits = httpx.Limits(
+            max_connections=max(1, int(http_max_connections)),
+            max_keepalive_connections=max(0, int(http_max_keepalive_connections)),
+            keepalive_expiry=float(http_keepalive_expiry),
+        )
+        self._http_prewarm_connections = max(0, int(http_prewarm_connections))
+        self._http_in_flight = 0
+        self._http_in_flight_peak = 0
+        self._http_saturated_total = 0
+        # single-flight для одинаковых GET и опциональный микрокэш по классам эндпоинтов
+        # (ключ — префикс пути, например "/market/", значение — TTL в секундах)
+        # (по TtlStore на класс: запись истекает с его TTL, сверх REST_CACHE_MAX_ENTRIES
+        # вытесняется самая старая, без полных обходов)
+        self._rest_inflight: Dict[Tuple, asyncio.Future] = {}
+        self._rest_cache: Dict[str, TtlStore] = {
+            self._normalize_path(prefix): TtlStore(
+                "okx_rest" + self._normalize_path(prefix).rstrip("/").replace("/", "_"),
+                float(ttl),
+                REST_CACHE_MAX_ENTRIES,
+            )
+            for prefix, ttl in (rest_cache_ttl or {}).items()
+            if ttl and float(ttl) > 0
+        }
         self._inst_id_code_cache: Dict[str, str] = {}
         self._inst_id_code_cache_ts: float = 0.0
         self._inst_id_code_cache_ttl_sec: float = 60.0
         self._inst_id_code_cache_lock = asyncio.Lock()
+        self._tick_scales: Dict[str, TickScale] = {}
         self._order_ws = None
         self._order_ws_lock = asyncio.Lock()
         self._order_ws_req_lock = asyncio.Lock()
@@ -58,7 +144,24 @@ class OkxStateMixin:
             self._ws_public_url = "wss://ws.okx.com:8443/ws/v5/public"
             self._ws_private_url = "wss://ws.okx.com:8443/ws/v5/private"
 
+        # явные адреса (например, локальный симулятор) имеют приоритет над demo/prod
+        if ws_public_url:
+            self._ws_public_url = ws_public_url
+        if ws_private_url:
+            self._ws_private_url = ws_private_url
+        if ws_business_url:
+            self._ws_candles_url = ws_business_url
+
         self._ws_private_channels = {"orders", "fills", "account", "positions"}
+        # запись сырых фреймов всех WS для последующего воспроизведения
+        self._frame_recorder = frame_recorder
+        # задержки переподключения и бюджет новых подключений на тип сокета
+        self._reconnect = ReconnectManager(
+            connect_rate=ws_connect_rate,
+            connect_burst=ws_connect_burst,
+            backoff_base_sec=ws_backoff_base_sec,
+            backoff_max_sec=ws_backoff_max_sec,
+        )
 
     def _assert_private_ws(self, channel: str, ws_url: str) -> None:
         if channel in self._ws_private_channels and ws_url != self._ws_private_url:
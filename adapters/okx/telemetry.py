@@ -0,0 +1,37 @@
+from common.metrics import REGISTRY
+
+REST_LATENCY = REGISTRY.histogram(
+    "okx_rest_request_seconds",
+    "OKX REST request latency",
+    ("method", "path", "status"),
+)
+WS_FRAMES = REGISTRY.counter(
+    "okx_ws_frames_total",
+    "OKX WS data frames received",
+    ("channel",),
+)
+WS_PARSE = REGISTRY.histogram(
+    "okx_ws_parse_seconds",
+    "OKX WS frame decode and parse time",
+    ("channel",),
+)
+WS_ACTIVE_SOCKETS = REGISTRY.gauge(
+    "okx_ws_active_sockets",
+    "Open upstream OKX WS connections",
+    ("kind",),
+)
+WS_RECONNECTS = REGISTRY.counter(
+    "okx_ws_reconnects_total",
+    "OKX WS reconnect attempts after a dropped or failed connection",
+    ("kind",),
+)
+WS_CONNECT_WAIT = REGISTRY.histogram(
+    "okx_ws_connect_wait_seconds",
+    "Time a new OKX WS connection waited for the connection-rate budget",
+    ("kind",),
+)
+WS_GAPS = REGISTRY.counter(
+    "okx_ws_gaps_total",
+    "OKX WS subscriptions resumed after a gap in the stream",
+    ("channel",),
+)
@@ -0,0 +1,132 @@
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable, Optional
+
+# Фиксированная точка для цен и объемов: значение хранится целым числом единиц
+# 10^-dec, где dec — число знаков в tickSz (для цены) и lotSz (для объема) инструмента.
+# Ключи стакана — int, поэтому одинаковая строка OKX всегда дает один и тот же ключ,
+# сравнения и хеширование точные, а обратный перевод в float (units / 10^dec)
+# совпадает с float() исходной строки.
+
+# точность по умолчанию, пока метаданные инструмента неизвестны
+DEFAULT_DECIMALS = 8
+
+
+def decimals_of(step: Any) -> Optional[int]:
+    # "0.001" -> 3, "1" -> 0, "1e-8" -> 8
+    if step is None or str(step).strip() == "":
+        return None
+    try:
+        exp = Decimal(str(step).strip()).normalize().as_tuple().exponent
+    except (InvalidOperation, ValueError):
+        return None
+    if not isinstance(exp, int):
+        return None
+    return max(0, -exp)
+
+
+def _decimals_in(s: Any) -> int:
+    s = str(s)
+    i = s.find(".")
+    return 0 if i < 0 else len(s) - i - 1
+
+
+def _fmt_units(units: int, dec: int) -> str:
+    if dec <= 0:
+        return str(units)
+    neg = units < 0
+    s = str(-units if neg else units).rjust(dec + 1, "0")
+    head = s[:-dec]
+    tail = s[-dec:].rstrip("0")
+    out = f"{head}.{tail}" if tail else head
+    return f"-{out}" if neg else out
+
+
+def fmt_decimal(x: Any) -> str:
+    # произвольное число без экспоненты и хвостовых нулей
+    try:
+        f = float(x)
+    except Exception:
+        return "" if x is None else str(x)
+    s = f"{f:.16f}".rstrip("0").rstrip(".")
+    return s if s else "0"
+
+
+class TickScale:
+    __slots__ = ("px_dec", "sz_dec", "px_mult", "sz_mult")
+
+    def __init__(self, px_dec: int = DEFAULT_DECIMALS, sz_dec: int = DEFAULT_DECIMALS):
+        self.px_dec = int(px_dec)
+        self.sz_dec = int(sz_dec)
+        self.px_mult = 10 ** self.px_dec
+        self.sz_mult = 10 ** self.sz_dec
+
+    @classmethod
+    def from_steps(cls, tick_sz: Any, lot_sz: Any) -> Optional["TickScale"]:
+        px_dec = decimals_of(tick_sz)
+        sz_dec = decimals_of(lot_sz)
+        if px_dec is None or sz_dec is None:
+            return None
+        return cls(px_dec, sz_dec)
+
+    @classmethod
+    def infer(cls, levels: Iterable[Any]) -> "TickScale":
+        # по строкам снапшота стакана, когда метаданные инструмента недоступны
+        px_dec = 0
+        sz_dec = 0
+        for lvl in levels:
+            if not lvl:
+                continue
+            px_dec = max(px_dec, _decimals_in(lvl[0]))
+            if len(lvl) > 1:
+                sz_dec = max(sz_dec, _decimals_in(lvl[1]))
+        return cls(px_dec, sz_dec)
+
+    def widen(self, other: "TickScale") -> "TickScale":
+        if other.px_dec <= self.px_dec and other.sz_dec <= self.sz_dec:
+            return self
+        return TickScale(max(self.px_dec, other.px_dec), max(self.sz_dec, other.sz_dec))
+
+    def px_units(self, v: Any) -> int:
+        try:
+            return round(float(v) * self.px_mult)
+        except (TypeError, ValueError, OverflowError):
+            return 0
+
+    def sz_units(self, v: Any) -> int:
+        try:
+            return round(float(v) * self.sz_mult)
+        except (TypeError, ValueError, OverflowError):
+            return 0
+
+    def px(self, units: int) -> float:
+        return units / self.px_mult
+
+    def sz(self, units: int) -> float:
+        return units / self.sz_mult
+
+    def fmt_px(self, v: Any) -> str:
+        return self._fmt(v, self.px_dec, self.px_mult)
+
+    def fmt_sz(self, v: Any) -> str:
+        return self._fmt(v, self.sz_dec, self.sz_mult)
+
+    @staticmethod
+    def _fmt(v: Any, dec: int, mult: int) -> str:
+        try:
+            f = float(v)
+            units = round(f * mult)
+        except (TypeError, ValueError, OverflowError):
+            return fmt_decimal(v)
+        # значение не на сетке шага: не округляем молча, отдаем как есть — решит биржа
+        if units / mult != f:
+            return fmt_decimal(v)
+        return _fmt_units(units, dec)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TickScale) and (self.px_dec, self.sz_dec) == (other.px_dec, other.sz_dec)
+
+    def __hash__(self) -> int:
+        return hash((self.px_dec, self.sz_dec))
+
+    def __repr__(self) -> str:
+        return f"TickScale(px_dec={self.px_dec}, sz_dec={self.sz_dec})"
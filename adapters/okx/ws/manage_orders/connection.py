@@ -1,19 +1,103 @@
 import asyncio
-import json
-from typing import Any, Dict, List, Optional
+import contextlib
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 import websockets
 
+from adapters.okx.telemetry import WS_ACTIVE_SOCKETS, WS_FRAMES, WS_GAPS, WS_PARSE
+from common import codec
+from common.frame_log import RecordingSocket
+
 
 class OkxWsOrderConnectionMixin:
+    def _ws_kind(self, url: str) -> str:
+        if url == self._ws_private_url:
+            return "private"
+        if url == self._ws_candles_url:
+            return "business"
+        return "public"
+
+    @contextlib.asynccontextmanager
+    async def _ws_session(self, url: str) -> AsyncIterator[Any]:
+        kind = self._ws_kind(url)
+        await self._reconnect.acquire(kind)
+        async with websockets.connect(url, ping_interval=20, ping_timeout=20) as ws:
+            gauge = WS_ACTIVE_SOCKETS.labels(kind)
+            gauge.inc()
+            try:
+                yield self._record_ws(ws, kind)
+            finally:
+                gauge.dec()
+
+    def _record_ws(self, ws, kind: str):
+        if self._frame_recorder is None:
+            return ws
+        return RecordingSocket(ws, self._frame_recorder, kind)
+
+    def _observe_ws_frame(self, channel: str, t0: float) -> None:
+        WS_FRAMES.labels(channel).inc()
+        WS_PARSE.labels(channel).observe(time.perf_counter() - t0)
+
+    async def _ws_notify_gap(
+        self,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]],
+        channel: str,
+        args: Optional[List[Dict[str, Any]]],
+        since_ms: int,
+    ) -> None:
+        # подписка восстановлена после обрыва: данные за [since, until] потеряны,
+        # потребитель перезапрашивает снимок (REST, полный стакан и т.п.)
+        WS_GAPS.labels(channel).inc()
+        if on_gap is None:
+            return
+        ev = {"event": "gap", "channel": channel, "args": args, "since": since_ms, "until": int(time.time() * 1000)}
+        try:
+            res = on_gap(ev)
+            if asyncio.iscoroutine(res):
+                await res
+        except Exception:
+            return
+
     async def _ws_unsubscribe(self, ws, args: Optional[List[Dict[str, Any]]]) -> None:
         if not args:
             return
         try:
-            await ws.send(json.dumps({"op": "unsubscribe", "args": args}))
+            await ws.send(codec.dumps({"op": "unsubscribe", "args": args}))
         except Exception:
             return
 
+    async def _ws_close_on_stop(self, ws, stop_event: asyncio.Event, unsub_args: Optional[List[Dict[str, Any]]]) -> None:
+        await stop_event.wait()
+        await self._ws_unsubscribe(ws, unsub_args)
+        try:
+            await ws.close()
+        except Exception:
+            pass
+
+    async def _ws_frames(
+        self,
+        ws,
+        stop_event: asyncio.Event,
+        unsub_args: Optional[List[Dict[str, Any]]],
+    ) -> AsyncIterator[Any]:
+        # Кадры сокета до stop_event без таймаута на каждый recv: одна задача на сессию
+        # ждет stop, отписывается и закрывает сокет, и ожидающий recv сразу завершается.
+        watcher = asyncio.create_task(self._ws_close_on_stop(ws, stop_event, unsub_args))
+        try:
+            while True:
+                try:
+                    raw = await ws.recv()
+                except Exception:
+                    if stop_event.is_set():
+                        return
+                    raise
+                if stop_event.is_set():
+                    return
+                yield raw
+        finally:
+            watcher.cancel()
+
     async def _close_order_ws(self) -> None:
         ws = self._order_ws
         self._order_ws = None
@@ -22,11 +106,10 @@ class OkxWsOrderConnectionMixin:
         current = asyncio.current_task()
         if task is not None and task is not current:
             task.cancel()
-            try:
-                await task
-            except Exception:
-                pass
+            # CancelledError отмененной задачи не должен уходить вызывающему
+            await asyncio.gather(task, return_exceptions=True)
         if ws is not None:
+            WS_ACTIVE_SOCKETS.labels("order").dec()
             try:
                 await ws.close()
             except Exception:
@@ -61,35 +144,39 @@ class OkxWsOrderConnectionMixin:
             if self._order_ws is not None:
                 return self._order_ws
 
+            await self._reconnect.acquire("private")
             ws = await websockets.connect(self._ws_private_url, ping_interval=20, ping_timeout=20)
-            await ws.send(json.dumps(self._ws_login_payload()))
+            ws = self._record_ws(ws, "order")
+            try:
+                await self._order_ws_login(ws)
+            except BaseException:
+                # логин не прошел (таймаут, ошибка, обрыв): сокет закрываем, в счетчик
+                # активных он не попадает — прогрев повторяет этот путь без конца
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+                raise
+            WS_ACTIVE_SOCKETS.labels("order").inc()
+            self._order_ws = ws
+            self._start_order_ws_keepalive(ws)
+            return ws
 
-            login_deadline = asyncio.get_event_loop().time() + 5.0
-            while True:
-                if asyncio.get_event_loop().time() > login_deadline:
-                    try:
-                        await ws.close()
-                    except Exception:
-                        pass
-                    raise RuntimeError("OKX WS login timeout")
+    async def _order_ws_login(self, ws) -> None:
+        await ws.send(codec.dumps(self._ws_login_payload()))
 
-                raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                msg = json.loads(raw)
+        login_deadline = asyncio.get_event_loop().time() + 5.0
+        while True:
+            if asyncio.get_event_loop().time() > login_deadline:
+                raise RuntimeError("OKX WS login timeout")
 
-                if msg.get("event") == "error":
-                    try:
-                        await ws.close()
-                    except Exception:
-                        pass
-                    raise RuntimeError(f"OKX WS login error {msg.get('code')}: {msg.get('msg')}")
+            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
+            msg = codec.loads(raw)
 
-                if msg.get("event") == "login":
-                    if msg.get("code") == "0":
-                        self._order_ws = ws
-                        self._start_order_ws_keepalive(ws)
-                        return ws
-                    try:
-                        await ws.close()
-                    except Exception:
-                        pass
-                    raise RuntimeError(f"OKX WS login error {msg.get('code')}: {msg.get('msg')}")
+            if msg.get("event") == "error":
+                raise RuntimeError(f"OKX WS login error {msg.get('code')}: {msg.get('msg')}")
+
+            if msg.get("event") == "login":
+                if msg.get("code") == "0":
+                    return
+                raise RuntimeError(f"OKX WS login error {msg.get('code')}: {msg.get('msg')}")
@@ -1,6 +1,9 @@
 import uuid
 from typing import Any, Dict, Optional
 
+from adapters.okx.ticks import fmt_decimal
+from common import tracing
+
 
 class OkxWsOrderCreateMixin:
     async def place_market_order_ws(
@@ -20,14 +23,6 @@ class OkxWsOrderCreateMixin:
         inst_id = symbol
         side_s = str(side or "").lower().strip()
 
-        def _fmt_sz(x: Any) -> str:
-            try:
-                f = float(x)
-            except Exception:
-                return "" if x is None else str(x)
-            s = f"{f:.16f}".rstrip("0").rstrip(".")
-            return s if s else "0"
-
         if td_mode is None:
             td_mode = "cash" if str(inst_type).upper() == "SPOT" else "cross"
 
@@ -36,14 +31,16 @@ class OkxWsOrderCreateMixin:
             "tdMode": td_mode,
             "side": side_s,
             "ordType": "market",
-            "sz": _fmt_sz(quantity),
         }
-        inst_id_code = await self._resolve_inst_id_code(inst_id, inst_type)
+        with tracing.span(cl_ord_id, "resolve_inst_id_code"):
+            inst_id_code = await self._resolve_inst_id_code(inst_id, inst_type)
         if not inst_id_code:
             raise RuntimeError(
                 f"Cannot resolve instIdCode for instType={str(inst_type or '').upper()} instId={inst_id}"
             )
         body["instIdCode"] = inst_id_code
+        scale = self._tick_scale(inst_id)
+        body["sz"] = scale.fmt_sz(quantity) if scale is not None else fmt_decimal(quantity)
         if cl_ord_id:
             body["clOrdId"] = str(cl_ord_id)
         if pos_side:
@@ -106,14 +103,6 @@ class OkxWsOrderCreateMixin:
         inst_id = symbol
         side_s = str(side or "").lower().strip()
 
-        def _fmt_num(x: Any) -> str:
-            try:
-                f = float(x)
-            except Exception:
-                return "" if x is None else str(x)
-            s = f"{f:.16f}".rstrip("0").rstrip(".")
-            return s if s else "0"
-
         if td_mode is None:
             td_mode = "cash" if str(inst_type).upper() == "SPOT" else "cross"
 
@@ -126,15 +115,21 @@ class OkxWsOrderCreateMixin:
             "tdMode": td_mode,
             "side": side_s,
             "ordType": ord_type_s,
-            "sz": _fmt_num(quantity),
-            "px": _fmt_num(price),
         }
-        inst_id_code = await self._resolve_inst_id_code(inst_id, inst_type)
+        with tracing.span(cl_ord_id, "resolve_inst_id_code"):
+            inst_id_code = await self._resolve_inst_id_code(inst_id, inst_type)
         if not inst_id_code:
             raise RuntimeError(
                 f"Cannot resolve instIdCode for instType={str(inst_type or '').upper()} instId={inst_id}"
             )
         body["instIdCode"] = inst_id_code
+        scale = self._tick_scale(inst_id)
+        if scale is not None:
+            body["sz"] = scale.fmt_sz(quantity)
+            body["px"] = scale.fmt_px(price)
+        else:
+            body["sz"] = fmt_decimal(quantity)
+            body["px"] = fmt_decimal(price)
         if cl_ord_id:
             body["clOrdId"] = str(cl_ord_id)
         if pos_side:
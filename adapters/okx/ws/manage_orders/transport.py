@@ -1,18 +1,26 @@
 import asyncio
-import json
+import time
 from typing import Any, Dict
 
+from common import codec, tracing
+
 
 class OkxWsOrderTransportMixin:
     async def _place_order_via_private_ws(self, body: Dict[str, Any], req_id: str) -> Dict[str, Any]:
         order_msg = {"id": req_id, "op": "order", "args": [body]}
+        trace_id = body.get("clOrdId")
+        t_wait = time.time()
 
         async with self._order_ws_req_lock:
             last_err = None
             for _ in range(2):
                 ws = await self._ensure_order_ws()
                 try:
-                    await ws.send(json.dumps(order_msg))
+                    t_send = time.time()
+                    tracing.add_span(trace_id, "order_ws_wait", t_wait, t_send)
+                    await ws.send(codec.dumps(order_msg))
+                    t_sent = time.time()
+                    tracing.add_span(trace_id, "ws_send", t_send, t_sent)
 
                     resp_deadline = asyncio.get_event_loop().time() + 5.0
                     while True:
@@ -20,13 +28,15 @@ class OkxWsOrderTransportMixin:
                             raise RuntimeError("OKX WS order timeout")
 
                         raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        msg = json.loads(raw)
+                        msg = codec.loads(raw)
                         if msg.get("id") != req_id:
                             continue
+                        tracing.add_span(trace_id, "okx_ack", t_sent, time.time(), code=msg.get("code"))
                         return msg
                 except Exception as e:
                     last_err = e
                     await self._close_order_ws()
+                    t_wait = time.time()
                     continue
             if last_err is not None:
                 raise last_err
@@ -40,7 +50,7 @@ class OkxWsOrderTransportMixin:
             for _ in range(2):
                 ws = await self._ensure_order_ws()
                 try:
-                    await ws.send(json.dumps(cancel_msg))
+                    await ws.send(codec.dumps(cancel_msg))
 
                     resp_deadline = asyncio.get_event_loop().time() + 5.0
                     while True:
@@ -48,7 +58,7 @@ class OkxWsOrderTransportMixin:
                             raise RuntimeError("OKX WS cancel-order timeout")
 
                         raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        msg = json.loads(raw)
+                        msg = codec.loads(raw)
                         if msg.get("id") != req_id:
                             continue
                         return msg
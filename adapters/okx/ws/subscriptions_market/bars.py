@@ -1,8 +1,8 @@
 import asyncio
-import json
+import time
 from typing import Any, Callable, Dict, List, Optional
 
-import websockets
+from common import codec
 
 
 class OkxWsBarsSubscriptionMixin:
@@ -19,6 +19,7 @@ class OkxWsBarsSubscriptionMixin:
         on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
         unsub_args: Optional[List[Dict[str, Any]]] = None,
         inst_type: Optional[str] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> None:
         channel = self._tf_to_okx_ws_channel(tf)
         sub_msg = {
@@ -27,19 +28,17 @@ class OkxWsBarsSubscriptionMixin:
         }
         unsub_args = unsub_args or sub_msg.get("args")
 
+        backoff = self._reconnect.backoff("business")
+        gap_since: Optional[int] = None
         while not stop_event.is_set():
+            subscribed_sent = False
             try:
-                async with websockets.connect(self._ws_candles_url, ping_interval=20, ping_timeout=20) as ws:
-                    await ws.send(json.dumps(sub_msg))
-                    subscribed_sent = False
+                async with self._ws_session(self._ws_candles_url) as ws:
+                    await ws.send(codec.dumps(sub_msg))
 
-                    while not stop_event.is_set():
-                        try:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        except asyncio.TimeoutError:
-                            continue
-
-                        msg = json.loads(raw)
+                    async for raw in self._ws_frames(ws, stop_event, unsub_args):
+                        t0 = time.perf_counter()
+                        msg = codec.loads(raw)
 
                         if msg.get("event") == "subscribe":
                             if (not subscribed_sent) and on_subscribed is not None:
@@ -47,6 +46,10 @@ class OkxWsBarsSubscriptionMixin:
                                 if asyncio.iscoroutine(res):
                                     await res
                             subscribed_sent = True
+                            backoff.reset()
+                            if gap_since is not None:
+                                await self._ws_notify_gap(on_gap, "candles", sub_msg["args"], gap_since)
+                                gap_since = None
                             continue
 
                         if msg.get("event") == "error":
@@ -60,15 +63,19 @@ class OkxWsBarsSubscriptionMixin:
                         if not data:
                             continue
 
-                        for candle_arr in data:
-                            bar = self._parse_okx_candle_any(symbol, candle_arr, inst_type=inst_type)
+                        bars = [
+                            self._parse_okx_candle_any(symbol, candle_arr, inst_type=inst_type)
+                            for candle_arr in data
+                        ]
+                        self._observe_ws_frame("candles", t0)
+
+                        for bar in bars:
                             res = on_data(bar)
                             if asyncio.iscoroutine(res):
                                 await res
 
-                    if stop_event.is_set() and subscribed_sent:
-                        await self._ws_unsubscribe(ws, unsub_args)
-
             except Exception:
-                await asyncio.sleep(1.0)
+                if subscribed_sent and gap_since is None:
+                    gap_since = int(time.time() * 1000)
+                await backoff.sleep()
                 continue
@@ -1,8 +1,9 @@
 import asyncio
-import json
+import time
 from typing import Any, Callable, Dict, List, Optional
 
-import websockets
+from adapters.okx.ticks import TickScale
+from common import codec, tick_trace
 
 
 class OkxWsOrderBookSubscriptionMixin:
@@ -15,6 +16,7 @@ class OkxWsOrderBookSubscriptionMixin:
         on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
         on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
         unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> None:
         sub_msg = {
             "op": "subscribe",
@@ -27,22 +29,22 @@ class OkxWsOrderBookSubscriptionMixin:
         }
         unsub_args = unsub_args or sub_msg.get("args")
 
+        backoff = self._reconnect.backoff("public")
+        gap_since: Optional[int] = None
         while not stop_event.is_set():
+            subscribed_sent = False
             try:
-                async with websockets.connect(self._ws_public_url, ping_interval=20, ping_timeout=20) as ws:
-                    await ws.send(json.dumps(sub_msg))
-                    subscribed_sent = False
+                async with self._ws_session(self._ws_public_url) as ws:
+                    await ws.send(codec.dumps(sub_msg))
 
-                    bids_state: Dict[float, float] = {}
-                    asks_state: Dict[float, float] = {}
+                    bids_state: Dict[int, int] = {}
+                    asks_state: Dict[int, int] = {}
+                    scale = self._tick_scale(symbol) or TickScale()
 
-                    while not stop_event.is_set():
-                        try:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        except asyncio.TimeoutError:
-                            continue
-
-                        msg = json.loads(raw)
+                    async for raw in self._ws_frames(ws, stop_event, unsub_args):
+                        t0 = time.perf_counter()
+                        recv_s = time.time()
+                        msg = codec.loads(raw)
 
                         if msg.get("event") == "subscribe":
                             if (not subscribed_sent) and on_subscribed is not None:
@@ -50,6 +52,10 @@ class OkxWsOrderBookSubscriptionMixin:
                                 if asyncio.iscoroutine(res):
                                     await res
                             subscribed_sent = True
+                            backoff.reset()
+                            if gap_since is not None:
+                                await self._ws_notify_gap(on_gap, "books", sub_msg["args"], gap_since)
+                                gap_since = None
                             continue
 
                         if msg.get("event") == "error":
@@ -66,34 +72,49 @@ class OkxWsOrderBookSubscriptionMixin:
                         if not data:
                             continue
 
+                        books = []
                         for item in data:
                             ts_ms = self._to_int(item.get("ts"))
 
+                            bids = item.get("bids") or []
+                            asks = item.get("asks") or []
                             if is_snapshot:
                                 bids_state.clear()
                                 asks_state.clear()
-
-                            self._apply_okx_book_delta(bids_state, item.get("bids") or [])
-                            self._apply_okx_book_delta(asks_state, item.get("asks") or [])
-
-                            bids_full = sorted(bids_state.items(), key=lambda x: x[0], reverse=True)
-                            asks_full = sorted(asks_state.items(), key=lambda x: x[0])
-
-                            book = {
-                                "symbol": symbol,
-                                "ts": ts_ms,
-                                "bids": [(float(p), float(v)) for (p, v) in bids_full],
-                                "asks": [(float(p), float(v)) for (p, v) in asks_full],
-                                "existing": bool(is_snapshot),
-                            }
-
+                                # шаг из метаданных, расширенный до точности строк снапшота;
+                                # без метаданных — не грубее DEFAULT_DECIMALS
+                                known = self._tick_scale(symbol)
+                                scale = TickScale.infer(bids).widen(TickScale.infer(asks))
+                                scale = scale.widen(known if known is not None else TickScale())
+                            else:
+                                # дельта точнее текущей сетки (откуда бы та ни взялась: метаданные
+                                # могли устареть после смены tickSz/lotSz) — переводим уровни
+                                # в более мелкую сетку, а не округляем дельту
+                                wider = scale.widen(TickScale.infer(bids)).widen(TickScale.infer(asks))
+                                if wider is not scale:
+                                    self._rescale_okx_book(bids_state, scale, wider)
+                                    self._rescale_okx_book(asks_state, scale, wider)
+                                    scale = wider
+
+                            self._apply_okx_book_delta(bids_state, bids, scale)
+                            self._apply_okx_book_delta(asks_state, asks, scale)
+
+                            books.append(
+                                self._build_okx_book(symbol, ts_ms, bids_state, asks_state, is_snapshot, scale)
+                            )
+                        self._observe_ws_frame("books", t0)
+                        if tick_trace.enabled():
+                            parse_s = time.time()
+                            for book in books:
+                                book["_trace"] = tick_trace.stamp(book.get("ts"), recv_s, parse_s)
+
+                        for book in books:
                             res = on_data(book)
                             if asyncio.iscoroutine(res):
                                 await res
 
-                    if stop_event.is_set() and subscribed_sent:
-                        await self._ws_unsubscribe(ws, unsub_args)
-
             except Exception:
-                await asyncio.sleep(1.0)
+                if subscribed_sent and gap_since is None:
+                    gap_since = int(time.time() * 1000)
+                await backoff.sleep()
                 continue
@@ -1,8 +1,8 @@
 import asyncio
-import json
+import time
 from typing import Any, Callable, Dict, List, Optional
 
-import websockets
+from common import codec, tick_trace
 
 
 class OkxWsQuotesSubscriptionMixin:
@@ -14,60 +14,120 @@ class OkxWsQuotesSubscriptionMixin:
         on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
         on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
         unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> None:
-        sub_msg = {
-            "op": "subscribe",
-            "args": [
-                {
-                    "channel": "tickers",
-                    "instId": symbol,
-                }
-            ],
-        }
-        unsub_args = unsub_args or sub_msg.get("args")
+        await self.subscribe_quotes_multi([symbol], on_data, stop_event, on_subscribed, on_error, unsub_args, on_gap)
 
+    async def subscribe_quotes_multi(
+        self,
+        symbols: List[str],
+        on_data: Callable[[dict], Any],
+        stop_event: asyncio.Event,
+        on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_symbol_error: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ) -> None:
+        # один сокет на весь список: tickers по каждому instId в одном subscribe,
+        # тикеры приходят вперемешку и различаются по arg.instId.
+        # OKX отвечает на каждый arg отдельно: on_subscribed — когда ответ пришел по всем,
+        # отклоненный символ снимается из списка (on_symbol_error), остальные продолжают;
+        # on_error — только если не осталось ни одного символа
+        args = [{"channel": "tickers", "instId": s} for s in dict.fromkeys(symbols)]
+        failed: Dict[str, Dict[str, Any]] = {}
+
+        backoff = self._reconnect.backoff("public")
+        gap_since: Optional[int] = None
+        ever_subscribed = False
         while not stop_event.is_set():
+            subscribed_sent = False
+            # без внешних unsub_args отписываемся от текущего (живого) списка
+            session_unsub = unsub_args or args
+            unanswered = {a["instId"] for a in args}
             try:
-                async with websockets.connect(self._ws_public_url, ping_interval=20, ping_timeout=20) as ws:
-                    await ws.send(json.dumps(sub_msg))
-                    subscribed_sent = False
-
-                    while not stop_event.is_set():
-                        try:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        except asyncio.TimeoutError:
-                            continue
+                async with self._ws_session(self._ws_public_url) as ws:
+                    await ws.send(codec.dumps({"op": "subscribe", "args": list(args)}))
 
-                        msg = json.loads(raw)
+                    async for raw in self._ws_frames(ws, stop_event, session_unsub):
+                        t0 = time.perf_counter()
+                        recv_s = time.time()
+                        msg = codec.loads(raw)
+                        event = msg.get("event")
 
-                        if msg.get("event") == "subscribe":
-                            if (not subscribed_sent) and on_subscribed is not None:
-                                res = on_subscribed(msg)
+                        if event == "error":
+                            inst_id = _error_inst_id(msg, unanswered, args)
+                            if inst_id is None or len(args) <= 1:
+                                if on_error is not None:
+                                    res = on_error(msg)
+                                    if asyncio.iscoroutine(res):
+                                        await res
+                                return
+                            args[:] = [a for a in args if a["instId"] != inst_id]
+                            failed[inst_id] = msg
+                            if on_symbol_error is not None:
+                                res = on_symbol_error(inst_id, msg)
                                 if asyncio.iscoroutine(res):
                                     await res
-                            subscribed_sent = True
-                            continue
+                            event = "subscribe" if inst_id in unanswered else None
+                            unanswered.discard(inst_id)
 
-                        if msg.get("event") == "error":
-                            if on_error is not None:
-                                res = on_error(msg)
+                        if event == "subscribe":
+                            unanswered.discard((msg.get("arg") or {}).get("instId"))
+                            if unanswered or subscribed_sent:
+                                continue
+                            subscribed_sent = True
+                            if (not ever_subscribed) and on_subscribed is not None:
+                                res = on_subscribed(
+                                    {"event": "subscribe", "args": list(args), "failed": list(failed)}
+                                )
                                 if asyncio.iscoroutine(res):
                                     await res
-                            return
+                            ever_subscribed = True
+                            backoff.reset()
+                            if gap_since is not None:
+                                await self._ws_notify_gap(on_gap, "tickers", list(args), gap_since)
+                                gap_since = None
+                            continue
 
                         data = msg.get("data")
                         if not data:
                             continue
 
-                        for item in data:
-                            t = self._parse_okx_ticker_any(symbol, item)
+                        symbol = (msg.get("arg") or {}).get("instId")
+                        items = [self._parse_okx_ticker_any(item.get("instId") or symbol, item) for item in data]
+                        self._observe_ws_frame("tickers", t0)
+                        if tick_trace.enabled():
+                            parse_s = time.time()
+                            for t in items:
+                                t._trace = tick_trace.stamp(t.ts, recv_s, parse_s)
+
+                        for t in items:
                             res = on_data(t)
                             if asyncio.iscoroutine(res):
                                 await res
 
-                    if stop_event.is_set() and subscribed_sent:
-                        await self._ws_unsubscribe(ws, unsub_args)
-
             except Exception:
-                await asyncio.sleep(1.0)
+                if subscribed_sent and gap_since is None:
+                    gap_since = int(time.time() * 1000)
+                await backoff.sleep()
                 continue
+
+
+def _error_inst_id(msg: Dict[str, Any], unanswered: set, args: List[Dict[str, Any]]) -> Optional[str]:
+    # к какому символу из списка относится ошибка: arg.instId, иначе instId из текста
+    # OKX ("...channel:tickers,instId:XXX doesn't exist."), иначе единственный
+    # неотвеченный; None — ошибка всего потока
+    inst_id = (msg.get("arg") or {}).get("instId")
+    if inst_id and any(a["instId"] == inst_id for a in args):
+        return inst_id
+    text = str(msg.get("msg") or "")
+    i = text.find("instId:")
+    if i >= 0:
+        rest = text[i + len("instId:"):].split(None, 1)
+        inst_id = rest[0].rstrip(".,;") if rest else ""
+        if any(a["instId"] == inst_id for a in args):
+            return inst_id
+    if len(unanswered) == 1:
+        return next(iter(unanswered))
+    return None
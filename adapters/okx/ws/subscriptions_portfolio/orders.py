@@ -1,8 +1,8 @@
 import asyncio
-import json
+import time
 from typing import Any, Callable, Dict, List, Optional
 
-import websockets
+from common import codec, tracing
 
 
 class OkxWsOrdersSubscriptionMixin:
@@ -15,8 +15,8 @@ class OkxWsOrdersSubscriptionMixin:
         on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
         on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
         unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> None:
-        login_msg = self._ws_login_payload()
 
         inst_type_u = str(inst_type).strip().upper() if inst_type else ""
         if inst_type_u == "SPOT":
@@ -33,10 +33,15 @@ class OkxWsOrdersSubscriptionMixin:
         sub_msg = {"op": "subscribe", "args": sub_args_list}
         unsub_args = unsub_args or sub_msg.get("args")
 
+        backoff = self._reconnect.backoff("private")
+        gap_since: Optional[int] = None
         while not stop_event.is_set():
+            subscribed_sent = False
             try:
-                async with websockets.connect(self._ws_private_url, ping_interval=20, ping_timeout=20) as ws:
-                    await ws.send(json.dumps(login_msg))
+                # подпись логина с текущим временем: при переподключении нужна новая
+                login_msg = self._ws_login_payload()
+                async with self._ws_session(self._ws_private_url) as ws:
+                    await ws.send(codec.dumps(login_msg))
 
                     authed = False
                     login_deadline = asyncio.get_event_loop().time() + 5.0
@@ -49,7 +54,7 @@ class OkxWsOrdersSubscriptionMixin:
                             return
 
                         raw = await ws.recv()
-                        msg = json.loads(raw)
+                        msg = codec.loads(raw)
 
                         if msg.get("event") == "error":
                             if on_error is not None:
@@ -68,22 +73,21 @@ class OkxWsOrdersSubscriptionMixin:
                                     await res
                             return
 
-                    await ws.send(json.dumps(sub_msg))
-                    subscribed_sent = False
+                    await ws.send(codec.dumps(sub_msg))
 
-                    while not stop_event.is_set():
-                        try:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        except asyncio.TimeoutError:
-                            continue
-
-                        msg = json.loads(raw)
+                    async for raw in self._ws_frames(ws, stop_event, unsub_args):
+                        t0 = time.perf_counter()
+                        msg = codec.loads(raw)
                         if msg.get("event") == "subscribe":
                             if (not subscribed_sent) and on_subscribed is not None:
                                 res = on_subscribed(msg)
                                 if asyncio.iscoroutine(res):
                                     await res
                             subscribed_sent = True
+                            backoff.reset()
+                            if gap_since is not None:
+                                await self._ws_notify_gap(on_gap, "orders", sub_msg["args"], gap_since)
+                                gap_since = None
                             continue
                         if msg.get("event") == "error":
                             if on_error is not None:
@@ -96,16 +100,24 @@ class OkxWsOrdersSubscriptionMixin:
                         if not data:
                             continue
 
-                        for item in data:
-                            order = self._parse_okx_order_any(item)
+                        orders = [self._parse_okx_order_any(item) for item in data]
+                        self._observe_ws_frame("orders", t0)
+                        if tracing.enabled():
+                            for order in orders:
+                                tracing.resolve(order.get("clOrdId"), "orders_push", state=order.get("status"))
+
+                        for order in orders:
                             res = on_data(order)
                             if asyncio.iscoroutine(res):
                                 await res
 
-                    if stop_event.is_set() and subscribed_sent:
-                        await self._ws_unsubscribe(ws, unsub_args)
-
             except Exception as e:
+                if subscribed_sent or gap_since is not None:
+                    # живая подписка оборвалась: переподключаемся, о пропуске сообщит on_gap
+                    if gap_since is None:
+                        gap_since = int(time.time() * 1000)
+                    await backoff.sleep()
+                    continue
                 if on_error is not None:
                     try:
                         res = on_error({"event": "error", "code": None, "msg": f"OKX adapter error: {e}"})
@@ -113,5 +125,4 @@ class OkxWsOrdersSubscriptionMixin:
                             await res
                     except Exception:
                         pass
-                await asyncio.sleep(1.0)
                 return
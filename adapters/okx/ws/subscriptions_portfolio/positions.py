@@ -1,8 +1,8 @@
 import asyncio
-import json
+import time
 from typing import Any, Callable, Dict, List, Optional
 
-import websockets
+from common import codec
 
 
 class OkxWsPositionsSubscriptionMixin:
@@ -14,6 +14,7 @@ class OkxWsPositionsSubscriptionMixin:
         on_subscribed: Optional[Callable[[Dict[str, Any]], Any]] = None,
         on_error: Optional[Callable[[Dict[str, Any]], Any]] = None,
         unsub_args: Optional[List[Dict[str, Any]]] = None,
+        on_gap: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> None:
         inst_type_s = (str(inst_type).strip().upper() if inst_type else "SPOT")
 
@@ -30,8 +31,6 @@ class OkxWsPositionsSubscriptionMixin:
             except Exception:
                 return
 
-        login_msg = self._ws_login_payload()
-
         sub_args: List[Dict[str, Any]] = [{"channel": "account"}]
         if inst_type_s in ("FUTURES", "SWAP", "MARGIN"):
             sub_args.append({"channel": "positions", "instType": inst_type_s})
@@ -41,17 +40,22 @@ class OkxWsPositionsSubscriptionMixin:
         sub_msg = {"op": "subscribe", "args": sub_args}
         unsub_args = unsub_args or sub_msg.get("args")
 
+        backoff = self._reconnect.backoff("private")
+        gap_since: Optional[int] = None
         while not stop_event.is_set():
+            subscribed = False
             try:
-                async with websockets.connect(self._ws_private_url, ping_interval=20, ping_timeout=20) as ws:
-                    await ws.send(json.dumps(login_msg))
+                # подпись логина с текущим временем: при переподключении нужна новая
+                login_msg = self._ws_login_payload()
+                async with self._ws_session(self._ws_private_url) as ws:
+                    await ws.send(codec.dumps(login_msg))
 
                     authed = False
                     while not stop_event.is_set() and not authed:
                         raw = await ws.recv()
                         if isinstance(raw, bytes):
                             raw = raw.decode("utf-8", errors="replace")
-                        m = json.loads(raw)
+                        m = codec.loads(raw)
 
                         if m.get("event") == "login":
                             if m.get("code") == "0":
@@ -67,9 +71,8 @@ class OkxWsPositionsSubscriptionMixin:
                     if not authed:
                         continue
 
-                    await ws.send(json.dumps(sub_msg))
+                    await ws.send(codec.dumps(sub_msg))
 
-                    subscribed = False
                     sub_deadline = asyncio.get_event_loop().time() + 5.0
                     while not subscribed and not stop_event.is_set():
                         if asyncio.get_event_loop().time() > sub_deadline:
@@ -79,11 +82,15 @@ class OkxWsPositionsSubscriptionMixin:
                         raw = await ws.recv()
                         if isinstance(raw, bytes):
                             raw = raw.decode("utf-8", errors="replace")
-                        m = json.loads(raw)
+                        m = codec.loads(raw)
 
                         if m.get("event") == "subscribe":
                             await _call(on_subscribed, m)
                             subscribed = True
+                            backoff.reset()
+                            if gap_since is not None:
+                                await self._ws_notify_gap(on_gap, "positions", sub_msg["args"], gap_since)
+                                gap_since = None
                             break
 
                         if m.get("event") == "error":
@@ -107,16 +114,12 @@ class OkxWsPositionsSubscriptionMixin:
                                     if asyncio.iscoroutine(r):
                                         await r
 
-                    while not stop_event.is_set():
-                        try:
-                            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                        except asyncio.TimeoutError:
-                            continue
-
+                    async for raw in self._ws_frames(ws, stop_event, unsub_args):
+                        t0 = time.perf_counter()
                         if isinstance(raw, bytes):
                             raw = raw.decode("utf-8", errors="replace")
 
-                        m = json.loads(raw)
+                        m = codec.loads(raw)
 
                         if m.get("event") == "error":
                             await _call(on_error, m)
@@ -129,25 +132,29 @@ class OkxWsPositionsSubscriptionMixin:
                             continue
 
                         if ch == "account":
-                            for it in (data or []):
-                                for pos in self._parse_okx_account_balance_any(it or {}):
-                                    r = on_data(pos)
-                                    if asyncio.iscoroutine(r):
-                                        await r
-                            continue
-
-                        if ch == "positions":
-                            for it in (data or []):
-                                pos = self._parse_okx_position_any(it or {})
-                                r = on_data(pos)
-                                if asyncio.iscoroutine(r):
-                                    await r
+                            items = [
+                                pos
+                                for it in (data or [])
+                                for pos in self._parse_okx_account_balance_any(it or {})
+                            ]
+                        elif ch == "positions":
+                            items = [self._parse_okx_position_any(it or {}) for it in (data or [])]
+                        else:
                             continue
+                        self._observe_ws_frame(ch, t0)
 
-                    if stop_event.is_set() and subscribed:
-                        await self._ws_unsubscribe(ws, unsub_args)
+                        for pos in items:
+                            r = on_data(pos)
+                            if asyncio.iscoroutine(r):
+                                await r
 
             except Exception as e:
+                if subscribed or gap_since is not None:
+                    # живая подписка оборвалась: переподключаемся, о пропуске сообщит on_gap
+                    if gap_since is None:
+                        gap_since = int(time.time() * 1000)
+                    await backoff.sleep()
+                    continue
                 await _call(on_error, {"event": "error", "msg": str(e)})
-                await asyncio.sleep(1.0)
+                await backoff.sleep()
                 continue
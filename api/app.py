@@ -1,19 +1,61 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import core
+from api import idempotency
+from api import instruments_cache
+from api import telemetry
+from api import warmup
+from common import tracing
 from api.rest.md import router as md_router
 from api.rest.commandapi import router as commandapi_router
+from api.rest.metrics import router as metrics_router
+from api.rest.health import router as health_router
 from api.hyperion import router as hyperion_router
 from api.ws import router as ws_router
 from api.cws import router as cws_router
 
 app = FastAPI(title="Astras Crypto Gateway")
 
+@app.on_event("startup")
+async def _startup_universe_snapshot():
+    # снимок реестра с диска до прогрева: первые запросы не ждут загрузки с OKX
+    if instruments_cache.load_snapshot(core.adapter):
+        app.state.universe_reconcile_task = asyncio.create_task(instruments_cache.reconcile(core.adapter))
+
 @app.on_event("startup")
 async def _startup_warmup():
+    # не ждем сети: компоненты прогреваются в фоне, балансировщик смотрит /health/ready
     await core.warmup_okx()
 
+@app.on_event("startup")
+async def _startup_loop_lag():
+    app.state.loop_lag_task = asyncio.create_task(telemetry.monitor_event_loop_lag())
+
+@app.on_event("shutdown")
+async def _shutdown_warmup():
+    await warmup.stop()
+
+@app.on_event("shutdown")
+async def _shutdown_frame_recorder():
+    if core.frame_recorder is not None:
+        core.frame_recorder.close()
+
+@app.on_event("shutdown")
+async def _shutdown_order_trace():
+    # дописать накопленные трассы в файл до выхода
+    tracing.configure(False)
+
+@app.on_event("shutdown")
+async def _shutdown_idempotency():
+    idempotency.close()
+
+@app.on_event("shutdown")
+async def _shutdown_universe_snapshot():
+    await instruments_cache.save_snapshot_now(core.adapter)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -29,6 +71,8 @@ app.add_middleware(
 
 app.include_router(md_router)
 app.include_router(commandapi_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 app.include_router(hyperion_router)
 app.include_router(ws_router)
 app.include_router(cws_router)
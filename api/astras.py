@@ -1,5 +1,6 @@
 import datetime
 from typing import Callable, Awaitable
+from adapters.okx.records import Order
 from api import instruments_cache
 
 
@@ -88,38 +89,39 @@ def _norm_tif_okx_to_astras(tif: str):
 
 
 def astras_order_simple_from_okx_neutral(
-    o: dict,
+    o: Order,
     exchange: str,
     portfolio: str,
     existing: bool,
 ) -> dict:
-    symbol = o.get("symbol", "0")
-    price = o.get("price", 0) or 0
-    qty = o.get("qty", 0) or 0
-    filled = o.get("filled", 0) or 0
+    o = Order.of(o)
+    symbol = o.symbol or "0"
+    price = o.price or 0
+    qty = o.qty or 0
+    filled = o.filled or 0
 
-    order_type = _norm_order_type_okx_to_astras(str(o.get("type", "0")))
-    order_status = _norm_order_status_okx_to_astras(str(o.get("status", "0")))
-    time_in_force = _norm_tif_okx_to_astras(str(o.get("tif", "")))
+    order_type = _norm_order_type_okx_to_astras(o.type or "0")
+    order_status = _norm_order_status_okx_to_astras(o.status or "0")
+    time_in_force = _norm_tif_okx_to_astras(o.tif or "")
 
     broker_symbol = None
     if exchange != "0" and symbol != "0":
         broker_symbol = f"{exchange}:{symbol}"
 
-    trans_time = iso_from_unix_ms(int(o.get("ts_create", 0) or 0))
-    update_time = iso_from_unix_ms(int(o.get("ts_update", 0) or 0))
+    trans_time = iso_from_unix_ms(int(o.ts_create or 0))
+    update_time = iso_from_unix_ms(int(o.ts_update or 0))
 
     volume = 0
 
     return {
-        "id": o.get("id", "0"),
+        "id": o.id or "0",
         "symbol": symbol,
         "brokerSymbol": broker_symbol,
         "portfolio": portfolio,
         "exchange": exchange,
         "comment": None,
         "type": order_type,
-        "side": o.get("side", "0"),
+        "side": o.side or "0",
         "status": order_status,
         "transTime": trans_time,
         "updateTime": update_time,
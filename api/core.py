@@ -3,27 +3,150 @@ import os
 import uuid
 from typing import Optional
 
-from adapters.okx import OkxAdapter
+from adapters.okx import OkxAdapter, OkxIngestProxyAdapter, OkxReplayAdapter, columns
+from api import idempotency
+from api import instruments_cache
+from api import warmup
+from common import codec, tick_trace, tracing
+from common.frame_log import FrameRecorder
+from common.idempotency_store import IdempotencyBackend, SqliteBackend, load_backend
 from dotenv import load_dotenv
 
 load_dotenv()
+# модули кодека и колоночного разбора импортируются раньше .env — перечитываем выбор бэкенда
+codec.configure(os.getenv("JSON_CODEC"))
+columns.configure(os.getenv("COLUMNS_BACKEND"))
 
 
-def _make_adapter():
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default) in ("1", "true", "True", "yes", "YES")
+
+
+def _rest_cache_ttl_from_env() -> dict[str, float]:
+    # TTL микрокэша REST по классам эндпоинтов, в миллисекундах; 0 — выключено
+    return {
+        "/market/": _env_float("OKX_REST_CACHE_MARKET_MS") / 1000.0,
+        "/public/": _env_float("OKX_REST_CACHE_PUBLIC_MS") / 1000.0,
+        "/account/": _env_float("OKX_REST_CACHE_ACCOUNT_MS") / 1000.0,
+    }
+
+
+def _order_trace_exporter() -> tracing.SpanExporter:
+    spec = os.getenv("ORDER_TRACE_EXPORTER")
+    if spec:
+        return tracing.load_exporter(spec)
+    return tracing.FileSpanExporter(os.getenv("ORDER_TRACE_LOG", "order_trace.jsonl"))
+
+
+def _frame_recorder() -> Optional[FrameRecorder]:
+    directory = os.getenv("OKX_RECORD_DIR")
+    if not directory:
+        return None
+    return FrameRecorder(
+        directory,
+        segment_bytes=_env_int("OKX_RECORD_SEGMENT_MB", 64) * 1024 * 1024,
+        segment_sec=_env_float("OKX_RECORD_SEGMENT_SEC", 3600.0),
+    )
+
+
+def _idempotency_backend() -> Optional[IdempotencyBackend]:
+    name = os.getenv("IDEMPOTENCY_BACKEND", "memory").strip()
+    if name in ("", "memory"):
+        return None
+    if name == "sqlite":
+        return SqliteBackend(
+            os.getenv("IDEMPOTENCY_SQLITE_PATH", "idempotency.sqlite3"),
+            idempotency.ttl_sec(),
+            idempotency.max_entries(),
+            flush_ms=_env_float("IDEMPOTENCY_FLUSH_MS", 20.0),
+        )
+    return load_backend(name, idempotency.ttl_sec(), idempotency.max_entries())
+
+
+def _adapter_kwargs() -> dict:
+    return dict(
+        rest_base=os.getenv("OKX_REST_BASE") or "https://www.okx.com",
+        api_key=os.getenv("OKX_API_KEY"),
+        api_secret=os.getenv("OKX_API_SECRET"),
+        api_passphrase=os.getenv("OKX_API_PASSPHRASE"),
+        demo=_env_bool("OKX_DEMO"),
+        rest_cache_ttl=_rest_cache_ttl_from_env(),
+        http2=_env_bool("OKX_HTTP2"),
+        http_max_connections=_env_int("OKX_HTTP_MAX_CONNECTIONS", 100),
+        http_max_keepalive_connections=_env_int("OKX_HTTP_MAX_KEEPALIVE", 20),
+        http_keepalive_expiry=_env_float("OKX_HTTP_KEEPALIVE_EXPIRY_SEC", 30.0),
+        http_prewarm_connections=_env_int("OKX_HTTP_PREWARM_CONNECTIONS", 2),
+        ws_public_url=os.getenv("OKX_WS_PUBLIC_URL") or None,
+        ws_private_url=os.getenv("OKX_WS_PRIVATE_URL") or None,
+        ws_business_url=os.getenv("OKX_WS_BUSINESS_URL") or None,
+        ws_connect_rate=_env_float("OKX_WS_CONNECT_RATE", 3.0),
+        ws_connect_burst=_env_int("OKX_WS_CONNECT_BURST", 3),
+        ws_backoff_base_sec=_env_float("OKX_WS_BACKOFF_BASE_SEC", 0.5),
+        ws_backoff_max_sec=_env_float("OKX_WS_BACKOFF_MAX_SEC", 30.0),
+    )
+
+
+def make_upstream_adapter():
+    # адаптер с собственными подключениями к OKX (или к записи трафика)
     name = os.getenv("ADAPTER", "okx").lower()
     if name == "okx":
-        return OkxAdapter(
-            api_key=os.getenv("OKX_API_KEY"),
-            api_secret=os.getenv("OKX_API_SECRET"),
-            api_passphrase=os.getenv("OKX_API_PASSPHRASE"),
-            demo=os.getenv("OKX_DEMO", "0") in ("1", "true", "True", "yes", "YES"),
-        )
-    raise RuntimeError("Поддерживается только ADAPTER=okx")
+        return OkxAdapter(frame_recorder=frame_recorder, **_adapter_kwargs())
+    if name == "replay":
+        path = os.getenv("OKX_REPLAY_PATH")
+        if not path:
+            raise RuntimeError("ADAPTER=replay требует OKX_REPLAY_PATH")
+        return OkxReplayAdapter(path, _env_float("OKX_REPLAY_SPEED", 1.0), **_adapter_kwargs())
+    raise RuntimeError("Поддерживается только ADAPTER=okx или ADAPTER=replay")
+
+
+def _make_adapter():
+    ingest_socket = os.getenv("INGEST_SOCKET")
+    if ingest_socket:
+        # воркер за процессом приема: market data — из него, REST, заявки и портфель — напрямую
+        return OkxIngestProxyAdapter(ingest_socket, **_adapter_kwargs())
+    return make_upstream_adapter()
 
 
+frame_recorder = _frame_recorder()
 adapter = _make_adapter()
+tick_trace.configure(
+    enabled=_env_bool("MD_TRACE"),
+    sample_rate=_env_float("MD_TRACE_SAMPLE", 0.0),
+    log_path=os.getenv("MD_TRACE_LOG", "md_trace.jsonl"),
+)
+_idem_backend = _idempotency_backend()
+if _idem_backend is not None:
+    idempotency.configure(_idem_backend)
+instruments_cache.configure_snapshot(
+    os.getenv("UNIVERSE_SNAPSHOT_PATH") or None,
+    save_interval_sec=_env_float("UNIVERSE_SNAPSHOT_SAVE_SEC", 300.0),
+    max_age_sec=_env_float("UNIVERSE_SNAPSHOT_MAX_AGE_SEC", 86400.0),
+)
+warmup.configure(
+    stage_timeout_sec=_env_float("WARMUP_STAGE_TIMEOUT_SEC", 15.0),
+    retry_base_sec=_env_float("WARMUP_RETRY_BASE_SEC", 0.5),
+    retry_max_sec=_env_float("WARMUP_RETRY_MAX_SEC", 30.0),
+)
+if _env_bool("ORDER_TRACE"):
+    tracing.configure(True, _order_trace_exporter(), _env_float("ORDER_TRACE_TTL_SEC", 30.0))
 USER_SETTINGS: dict[str, str] = {}
 SUPPORTED_BOARDS = ["SPOT", "FUTURES", "SWAP"]
+# сколько держать апстрим стакана/котировок без подписчиков (0 — закрывать сразу)
+MD_STREAM_LINGER_SEC = _env_float("MD_STREAM_LINGER_SEC", 30.0)
 
 
 def okx_client_id(guid: str | None) -> str:
@@ -37,7 +160,13 @@ def okx_client_id(guid: str | None) -> str:
 
 
 async def warmup_okx():
-    await adapter.warmup()
+    # этапы идут параллельно в фоне; готовность — warmup.ready() и /health/ready
+    for name, stage in adapter.warmup_stages().items():
+        # пул HTTP только ускоряет первые запросы, на готовность не влияет
+        warmup.register(name, stage, required=name != "http_pool")
+    warmup.register("instrument_registry", lambda: instruments_cache.warm_registry(adapter))
+    warmup.register("ticker_cache", lambda: instruments_cache.warm_tickers(adapter))
+    warmup.start()
 
 
 async def resolve_order_ccy(
@@ -59,8 +188,6 @@ async def resolve_order_ccy(
         return parts[1] if side_s == "buy" else (parts[0] if side_s == "sell" else None)
 
     if inst_type_s in ("FUTURES", "SWAP"):
-        from api import instruments_cache
-
         instr = await instruments_cache.get_instr(symbol, adapter=adapter)
         ccy = (instr or {}).get("quoteCcy")
         if ccy is not None and str(ccy).strip():
@@ -1,18 +1,39 @@
+import time
+
 from fastapi import WebSocket
 from starlette.websockets import WebSocketState
 
+from api.telemetry import CLIENT_SEND, CLIENT_SEND_PENDING
+from common import codec
+
 
 class CWSContext:
     def __init__(self, ws: WebSocket):
         self.ws = ws
+        # время приема текущего сообщения клиента (для трасс заявок)
+        self.recv_ts = 0.0
 
     async def safe_send_json(self, payload: dict):
+        try:
+            text = codec.dumps(payload)
+        except Exception:
+            return
+        await self.safe_send_text(text)
+
+    async def safe_send_text(self, text: str):
+        # уже закодированный JSON; Astras ждет текстовые фреймы, поэтому send_text
         if self.ws.client_state != WebSocketState.CONNECTED:
             return
+        pending = CLIENT_SEND_PENDING.labels("cws", "ack")
+        pending.inc()
+        t0 = time.perf_counter()
         try:
-            await self.ws.send_json(payload)
+            await self.ws.send_text(text)
         except Exception:
             return
+        finally:
+            pending.dec()
+            CLIENT_SEND.labels("cws", "ack").observe(time.perf_counter() - t0)
 
     async def send_error_and_close(self, guid: str | None, http_code: int, message: str):
         try:
@@ -1,18 +1,35 @@
+import time
+
 from fastapi import WebSocketDisconnect
 
 from api import core
 from api import idempotency
+from common import tracing
 from .common import CWSContext
 
 
+def _start_order_trace(ctx: CWSContext, okx_client_id: str, opcode: str, order_guid: str) -> None:
+    if not tracing.enabled():
+        return
+    tracing.start(
+        okx_client_id,
+        opcode,
+        started_at=ctx.recv_ts or None,
+        expect=("client_ack", "orders_push"),
+        guid=order_guid,
+    )
+    if ctx.recv_ts:
+        tracing.add_span(okx_client_id, "receive", ctx.recv_ts, time.time())
+
+
 async def handle_create_opcode(
     ctx: CWSContext,
     msg: dict,
     opcode: str | None,
     req_guid: str | None,
-    market_idem: dict,
-    limit_idem: dict,
-    order_symbol_by_id: dict,
+    market_idem: str,
+    limit_idem: str,
+    order_symbol_by_id: str,
 ) -> bool:
     if opcode == "create:market":
         order_guid = msg.get("guid") or req_guid
@@ -27,6 +44,7 @@ async def handle_create_opcode(
             if cached is not None:
                 await ctx.safe_send_json(cached)
                 return True
+        _start_order_trace(ctx, okx_client_id, opcode, order_guid)
 
         side = (msg.get("side") or "").lower()
         qty = msg.get("quantity")
@@ -41,7 +59,8 @@ async def handle_create_opcode(
         allow_margin = bool(msg.get("allowMargin", False))
         inst_type_s = str(inst_type).strip().upper() if inst_type is not None else ""
         tgt_ccy = "base_ccy" if (inst_type_s == "SPOT" and side == "buy") else None
-        ccy = await core.resolve_order_ccy(symbol, inst_type_s, side, allow_margin)
+        with tracing.span(okx_client_id, "resolve_order_ccy"):
+            ccy = await core.resolve_order_ccy(symbol, inst_type_s, side, allow_margin)
         if inst_type_s in ("FUTURES", "SWAP"):
             td_mode = "cross"
         elif inst_type_s == "SPOT":
@@ -61,6 +80,7 @@ async def handle_create_opcode(
             )
         except Exception as e:
             err_text = str(e).strip() or type(e).__name__
+            tracing.fail(okx_client_id, err_text)
             await ctx.send_error_and_close(order_guid, 502, err_text)
             raise WebSocketDisconnect
 
@@ -75,7 +95,9 @@ async def handle_create_opcode(
         if bool(check_duplicates):
             idempotency.put_cached_payload(market_idem, order_guid, out)
 
-        await ctx.safe_send_json(out)
+        with tracing.span(okx_client_id, "client_ack"):
+            await ctx.safe_send_json(out)
+        tracing.resolve(okx_client_id, "client_ack", ordId=ord_id)
         return True
 
     if opcode == "create:limit":
@@ -91,6 +113,7 @@ async def handle_create_opcode(
             if cached is not None:
                 await ctx.safe_send_json(cached)
                 return True
+        _start_order_trace(ctx, okx_client_id, opcode, order_guid)
 
         side = (msg.get("side") or "").lower()
         qty = msg.get("quantity")
@@ -105,7 +128,8 @@ async def handle_create_opcode(
         )
         allow_margin = bool(msg.get("allowMargin", False))
         inst_type_s = str(inst_type).strip().upper() if inst_type is not None else ""
-        ccy = await core.resolve_order_ccy(symbol, inst_type_s, side, allow_margin)
+        with tracing.span(okx_client_id, "resolve_order_ccy"):
+            ccy = await core.resolve_order_ccy(symbol, inst_type_s, side, allow_margin)
 
         tif = str(msg.get("timeInForce") or "OneDay").lower()
         if tif in ("oneday", "goodtillcancelled"):
@@ -117,9 +141,11 @@ async def handle_create_opcode(
         elif tif == "bookorcancel":
             okx_ord_type = "post_only"
         elif tif == "attheclose":
+            tracing.fail(okx_client_id, "unsupported timeInForce")
             await ctx.send_error_and_close(order_guid, 400, "timeInForce attheclose is not supported for OKX")
             raise WebSocketDisconnect
         else:
+            tracing.fail(okx_client_id, "unsupported timeInForce")
             await ctx.send_error_and_close(order_guid, 400, f"Unsupported timeInForce: {tif}")
             raise WebSocketDisconnect
 
@@ -143,6 +169,7 @@ async def handle_create_opcode(
             )
         except Exception as e:
             err_text = str(e).strip() or type(e).__name__
+            tracing.fail(okx_client_id, err_text)
             await ctx.send_error_and_close(order_guid, 502, err_text)
             raise WebSocketDisconnect
 
@@ -157,7 +184,9 @@ async def handle_create_opcode(
         if bool(check_duplicates):
             idempotency.put_cached_payload(limit_idem, order_guid, out)
 
-        await ctx.safe_send_json(out)
+        with tracing.span(okx_client_id, "client_ack"):
+            await ctx.safe_send_json(out)
+        tracing.resolve(okx_client_id, "client_ack", ordId=ord_id)
         return True
 
     return False
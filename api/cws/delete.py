@@ -11,9 +11,9 @@ async def handle_delete_opcode(
     msg: dict,
     opcode: str | None,
     req_guid: str | None,
-    delete_market_idem: dict,
-    delete_limit_idem: dict,
-    order_symbol_by_id: dict,
+    delete_market_idem: str,
+    delete_limit_idem: str,
+    order_symbol_by_id: str,
 ) -> bool:
     if opcode not in ("delete:market", "delete:limit"):
         return False
@@ -1,6 +1,10 @@
+import time
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from api import idempotency
+from api.telemetry import CWS_ACK
+from common import codec
 from .common import CWSContext
 from .control import handle_control_opcode
 from .create import handle_create_opcode
@@ -29,11 +33,13 @@ async def cws_stream(ws: WebSocket):
 
         while True:
             try:
-                msg = await ws.receive_json()
+                msg = codec.loads(await ws.receive_text())
             except (WebSocketDisconnect, RuntimeError):
                 break
             except Exception:
                 break
+            t0 = time.perf_counter()
+            ctx.recv_ts = time.time()
 
             opcode = msg.get("opcode")
             req_guid = msg.get("guid")
@@ -51,6 +57,7 @@ async def cws_stream(ws: WebSocket):
                 limit_idem,
                 order_symbol_by_id,
             ):
+                CWS_ACK.labels(opcode or "unknown").observe(time.perf_counter() - t0)
                 continue
 
             if await handle_delete_opcode(
@@ -62,6 +69,7 @@ async def cws_stream(ws: WebSocket):
                 delete_limit_idem,
                 order_symbol_by_id,
             ):
+                CWS_ACK.labels(opcode or "unknown").observe(time.perf_counter() - t0)
                 continue
 
             if await handle_update_opcode(
@@ -72,6 +80,7 @@ async def cws_stream(ws: WebSocket):
                 update_limit_idem,
                 order_symbol_by_id,
             ):
+                CWS_ACK.labels(opcode or "unknown").observe(time.perf_counter() - t0)
                 continue
 
     except WebSocketDisconnect:
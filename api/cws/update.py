@@ -11,8 +11,8 @@ async def handle_update_opcode(
     msg: dict,
     opcode: str | None,
     req_guid: str | None,
-    update_limit_idem: dict,
-    order_symbol_by_id: dict,
+    update_limit_idem: str,
+    order_symbol_by_id: str,
 ) -> bool:
     if opcode != "update:limit":
         return False
@@ -1,111 +1,109 @@
-import time
 from typing import Any
 
+from common.idempotency_store import IdempotencyBackend, MemoryBackend
+
 
 _TTL_SEC = 60 * 60
-_CLEANUP_INTERVAL_SEC = 10 * 60
-_LAST_CLEANUP_TS = 0.0
+# жесткий предел на кэш в памяти: при переполнении вытесняются самые давние записи
+_MAX_ENTRIES = 100_000
+# сколько просроченных записей снимать с каждого кэша на одно сообщение /cws
+_EXPIRE_PER_MESSAGE = 16
+
+# пространства имен в бэкенде
+_CWS_MARKET_IDEMPOTENCY = "create_market"
+_CWS_LIMIT_IDEMPOTENCY = "create_limit"
+_CWS_DELETE_MARKET_IDEMPOTENCY = "delete_market"
+_CWS_DELETE_LIMIT_IDEMPOTENCY = "delete_limit"
+_CWS_UPDATE_LIMIT_IDEMPOTENCY = "update_limit"
+_CWS_ORDER_SYMBOL_BY_ID = "order_symbol"
+
+_backend: IdempotencyBackend = MemoryBackend(_TTL_SEC, _MAX_ENTRIES)
+
+
+def configure(backend: IdempotencyBackend) -> None:
+    global _backend
+    if _backend is not backend:
+        try:
+            _backend.close()
+        except Exception:
+            pass
+    _backend = backend
+
+
+def close() -> None:
+    _backend.close()
+
+
+def ttl_sec() -> float:
+    return _TTL_SEC
+
 
-_CWS_MARKET_IDEMPOTENCY: dict[str, tuple[float, dict[str, Any]]] = {}
-_CWS_LIMIT_IDEMPOTENCY: dict[str, tuple[float, dict[str, Any]]] = {}
-_CWS_DELETE_MARKET_IDEMPOTENCY: dict[str, tuple[float, dict[str, Any]]] = {}
-_CWS_DELETE_LIMIT_IDEMPOTENCY: dict[str, tuple[float, dict[str, Any]]] = {}
-_CWS_UPDATE_LIMIT_IDEMPOTENCY: dict[str, tuple[float, dict[str, Any]]] = {}
-_CWS_ORDER_SYMBOL_BY_ID: dict[str, tuple[float, str]] = {}
+def max_entries() -> int:
+    return _MAX_ENTRIES
 
 
 def maybe_cleanup() -> None:
-    global _LAST_CLEANUP_TS
-    now = time.time()
-    if now - _LAST_CLEANUP_TS < _CLEANUP_INTERVAL_SEC:
-        return
-
-    cutoff = now - _TTL_SEC
-    for cache in (
-        _CWS_MARKET_IDEMPOTENCY,
-        _CWS_LIMIT_IDEMPOTENCY,
-        _CWS_DELETE_MARKET_IDEMPOTENCY,
-        _CWS_DELETE_LIMIT_IDEMPOTENCY,
-        _CWS_UPDATE_LIMIT_IDEMPOTENCY,
-        _CWS_ORDER_SYMBOL_BY_ID,
-    ):
-        for key, (ts, _) in list(cache.items()):
-            if ts < cutoff:
-                cache.pop(key, None)
-
-    _LAST_CLEANUP_TS = now
+    # истечение размазано по операциям: с головы каждого кэша снимается не больше
+    # _EXPIRE_PER_MESSAGE записей, полных обходов нет
+    _backend.expire(_EXPIRE_PER_MESSAGE)
 
 
 def get_cached_payload(
-    cache: dict[str, tuple[float, dict[str, Any]]],
+    cache: str,
     key: str,
 ) -> dict[str, Any] | None:
-    item = cache.get(key)
-    if not item:
-        return None
-    ts, payload = item
-    if time.time() - ts > _TTL_SEC:
-        cache.pop(key, None)
-        return None
-    return payload
+    return _backend.get(cache, key)
 
 
 def put_cached_payload(
-    cache: dict[str, tuple[float, dict[str, Any]]],
+    cache: str,
     key: str,
     payload: dict[str, Any],
 ) -> None:
-    cache[key] = (time.time(), payload)
+    _backend.put(cache, key, payload)
 
 
 def get_order_symbol(
-    cache: dict[str, tuple[float, str]],
+    cache: str,
     order_id: str,
 ) -> str:
-    item = cache.get(order_id)
-    if not item:
-        return ""
-    ts, symbol = item
-    if time.time() - ts > _TTL_SEC:
-        cache.pop(order_id, None)
-        return ""
-    return symbol
+    return _backend.get(cache, order_id) or ""
 
 
 def set_order_symbol(
-    cache: dict[str, tuple[float, str]],
+    cache: str,
     order_id: str,
     symbol: str,
 ) -> None:
-    cache[order_id] = (time.time(), symbol)
+    _backend.put(cache, order_id, symbol)
 
 
 def pop_order_symbol(
-    cache: dict[str, tuple[float, str]],
+    cache: str,
     order_id: str,
 ) -> None:
-    cache.pop(order_id, None)
+    _backend.pop(cache, order_id)
 
 
-def cws_market_idempotency() -> dict[str, tuple[float, dict[str, Any]]]:
+def cws_market_idempotency() -> str:
     return _CWS_MARKET_IDEMPOTENCY
 
 
-def cws_limit_idempotency() -> dict[str, tuple[float, dict[str, Any]]]:
+def cws_limit_idempotency() -> str:
     return _CWS_LIMIT_IDEMPOTENCY
 
 
-def cws_delete_market_idempotency() -> dict[str, tuple[float, dict[str, Any]]]:
+def cws_delete_market_idempotency() -> str:
     return _CWS_DELETE_MARKET_IDEMPOTENCY
 
 
-def cws_delete_limit_idempotency() -> dict[str, tuple[float, dict[str, Any]]]:
+def cws_delete_limit_idempotency() -> str:
     return _CWS_DELETE_LIMIT_IDEMPOTENCY
 
 
-def cws_update_limit_idempotency() -> dict[str, tuple[float, dict[str, Any]]]:
+def cws_update_limit_idempotency() -> str:
     return _CWS_UPDATE_LIMIT_IDEMPOTENCY
 
 
-def cws_order_symbol_by_id() -> dict[str, tuple[float, str]]:
+def cws_order_symbol_by_id() -> str:
     return _CWS_ORDER_SYMBOL_BY_ID
@@ -2,12 +2,28 @@ import asyncio
 import time
 from typing import Optional
 
+from adapters.okx.records import Ticker
+from common import snapshot_file
+
 
 _INSTR_CACHE: dict[str, dict] = {}
 _INSTR_CACHE_TS: float = 0.0
 _INSTR_LOCK = asyncio.Lock()
 _INSTR_TTL_SEC = 60.0
 
+# последние тикеры по instType; типы из _TICKERS_FROM_SNAPSHOT загружены с диска при
+# старте и отдаются как есть, пока reconcile не сходит на биржу
+_TICKERS: dict[str, list] = {}
+_TICKERS_FROM_SNAPSHOT: set[str] = set()
+
+# снимок реестра инструментов и тикеров на диске (UNIVERSE_SNAPSHOT_PATH)
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_PATH: str | None = None
+_SNAPSHOT_SAVE_SEC = 300.0
+_SNAPSHOT_MAX_AGE_SEC = 86400.0
+_snapshot_saved_at = 0.0
+_snapshot_task: asyncio.Task | None = None
+
 
 def _get_adapter(adapter=None):
     if adapter is not None:
@@ -33,17 +49,26 @@ def get_instruments_ttl_sec() -> float:
 
 
 async def load_ticker_map_for_types(inst_types: list[str], adapter=None) -> dict[str, dict]:
-    ad = _get_adapter(adapter)
+    if _TICKERS_FROM_SNAPSHOT and all(it in _TICKERS_FROM_SNAPSHOT for it in inst_types):
+        merged = [t for it in inst_types for t in _TICKERS.get(it, [])]
+        return {t.get("symbol"): t for t in merged if t.get("symbol")}
+    return await _fetch_ticker_map(inst_types, _get_adapter(adapter))
+
+
+async def _fetch_ticker_map(inst_types: list[str], ad) -> dict[str, dict]:
     results = await asyncio.gather(
         *(ad.list_tickers(inst_type=it) for it in inst_types),
         return_exceptions=True,
     )
     merged: list[dict] = []
-    for r in results:
+    for it, r in zip(inst_types, results):
         if isinstance(r, Exception):
             continue
         if r:
+            _TICKERS[it] = r
+            _TICKERS_FROM_SNAPSHOT.discard(it)
             merged.extend(r)
+    _schedule_snapshot_save(ad)
     return {t.get("symbol"): t for t in merged if t.get("symbol")}
 
 
@@ -60,11 +85,15 @@ async def refresh_instr_cache(adapter=None) -> None:
             continue
 
     new_map = {x.get("symbol"): x for x in (raw_all or []) if x.get("symbol")}
+    if not new_map and _INSTR_CACHE:
+        # биржа недоступна: остаемся на прежнем реестре (в том числе из снимка)
+        return
     _INSTR_CACHE.clear()
     _INSTR_CACHE.update(new_map)
 
     global _INSTR_CACHE_TS
     _INSTR_CACHE_TS = time.time()
+    _schedule_snapshot_save(ad)
 
 
 async def ensure_instr_cache(adapter=None) -> None:
@@ -80,7 +109,116 @@ async def ensure_instr_cache(adapter=None) -> None:
             return
 
 
+async def warm_registry(adapter=None) -> None:
+    await ensure_instr_cache(adapter=adapter)
+    if not _INSTR_CACHE:
+        raise RuntimeError("реестр инструментов пуст")
+
+
+async def warm_tickers(adapter=None) -> None:
+    tickers = await load_ticker_map_for_types(["SPOT", "FUTURES", "SWAP"], adapter=adapter)
+    if not tickers:
+        raise RuntimeError("кэш тикеров пуст")
+
+
 async def get_instr(symbol: str, adapter=None) -> Optional[dict]:
     if not _INSTR_CACHE:
         await refresh_instr_cache(adapter=adapter)
     return _INSTR_CACHE.get(symbol)
+
+
+def configure_snapshot(path: str | None, save_interval_sec: float = 300.0, max_age_sec: float = 86400.0) -> None:
+    global _SNAPSHOT_PATH, _SNAPSHOT_SAVE_SEC, _SNAPSHOT_MAX_AGE_SEC
+    _SNAPSHOT_PATH = path or None
+    _SNAPSHOT_SAVE_SEC = max(0.0, float(save_interval_sec))
+    _SNAPSHOT_MAX_AGE_SEC = float(max_age_sec)
+
+
+def load_snapshot(adapter=None) -> bool:
+    # при старте: реестр, тикеры и instIdCode из файла сразу, без сети
+    global _INSTR_CACHE_TS
+    if not _SNAPSHOT_PATH:
+        return False
+    snap = snapshot_file.read(_SNAPSHOT_PATH, _SNAPSHOT_VERSION)
+    if snap is None:
+        return False
+    ts, data = snap
+    if _SNAPSHOT_MAX_AGE_SEC > 0 and time.time() - ts > _SNAPSHOT_MAX_AGE_SEC:
+        return False
+    if not isinstance(data, dict):
+        return False
+    instruments = data.get("instruments") or []
+    if not instruments:
+        return False
+
+    if not _INSTR_CACHE:
+        _INSTR_CACHE.update({x.get("symbol"): x for x in instruments if x.get("symbol")})
+        # считаем свежим на время TTL: первые запросы обслуживаются из снимка,
+        # сверка с биржей идет в фоне (reconcile)
+        _INSTR_CACHE_TS = time.time()
+    for it, rows in (data.get("tickers") or {}).items():
+        if it in _TICKERS:
+            continue
+        _TICKERS[it] = [Ticker.from_mapping(t) for t in rows or []]
+        _TICKERS_FROM_SNAPSHOT.add(it)
+
+    ad = _get_adapter(adapter)
+    meta = data.get("meta")
+    if isinstance(meta, dict) and hasattr(ad, "import_instrument_meta"):
+        ad.import_instrument_meta(meta)
+    return True
+
+
+async def reconcile(adapter=None) -> None:
+    # фоновая сверка снимка с биржей; запросы /public/instruments из реестра и из кэша
+    # instIdCode адаптера идут одновременно и склеиваются single-flight адаптера
+    ad = _get_adapter(adapter)
+    try:
+        jobs = [refresh_instr_cache(adapter=ad), _fetch_ticker_map(["SPOT", "FUTURES", "SWAP"], ad)]
+        if hasattr(ad, "refresh_instrument_meta"):
+            jobs.append(ad.refresh_instrument_meta())
+        async with _INSTR_LOCK:
+            await asyncio.gather(*jobs, return_exceptions=True)
+        await save_snapshot_now(ad)
+    finally:
+        _TICKERS_FROM_SNAPSHOT.clear()
+
+
+def _snapshot_data(ad) -> dict:
+    data: dict = {
+        "instruments": list(_INSTR_CACHE.values()),
+        "tickers": {it: list(rows) for it, rows in _TICKERS.items()},
+    }
+    if hasattr(ad, "export_instrument_meta"):
+        data["meta"] = ad.export_instrument_meta()
+    return data
+
+
+def _schedule_snapshot_save(ad) -> None:
+    global _snapshot_task, _snapshot_saved_at
+    if not _SNAPSHOT_PATH or not _INSTR_CACHE:
+        return
+    if _snapshot_task is not None and not _snapshot_task.done():
+        return
+    now = time.time()
+    if now - _snapshot_saved_at < _SNAPSHOT_SAVE_SEC:
+        return
+    _snapshot_saved_at = now
+    # копии контейнеров снимаются в event loop, сериализация и запись — в потоке
+    data = _snapshot_data(ad)
+    _snapshot_task = asyncio.create_task(_save_snapshot(_SNAPSHOT_PATH, data))
+
+
+async def _save_snapshot(path: str, data: dict) -> None:
+    try:
+        await asyncio.to_thread(snapshot_file.write, path, _SNAPSHOT_VERSION, data)
+    except Exception:
+        pass
+
+
+async def save_snapshot_now(adapter=None) -> None:
+    global _snapshot_saved_at
+    if not _SNAPSHOT_PATH or not _INSTR_CACHE:
+        return
+    _snapshot_saved_at = time.time()
+    await _save_snapshot(_SNAPSHOT_PATH, _snapshot_data(_get_adapter(adapter)))
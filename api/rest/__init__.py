@@ -1,4 +1,5 @@
 from .md import router as md_router
 from .commandapi import router as commandapi_router
+from .metrics import router as metrics_router
 
-__all__ = ["md_router", "commandapi_router"]
+__all__ = ["md_router", "commandapi_router", "metrics_router"]
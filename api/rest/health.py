@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from api import warmup
+
+router = APIRouter()
+
+
+@router.get("/health/live")
+def health_live():
+    # процесс жив и цикл событий отвечает
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def health_ready():
+    # 503, пока не прогреты сокет заявок, реестр инструментов и кэш тикеров
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
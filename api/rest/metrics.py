@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api import core
+from api.ws.common import connections_report
+from common import tick_trace
+from common.metrics import REGISTRY
+
+router = APIRouter()
+
+
+def _http_pool_values() -> dict[tuple[str, ...], float]:
+    stats = core.adapter.http_pool_stats()
+    out: dict[tuple[str, ...], float] = {}
+    for k, v in stats.items():
+        if isinstance(v, bool) or v is None:
+            continue
+        out[(k,)] = float(v)
+    return out
+
+
+REGISTRY.callback_gauge(
+    "okx_http_pool",
+    "OKX REST connection pool state",
+    ("stat",),
+    _http_pool_values,
+)
+
+
+@router.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/md-latency")
+def md_latency():
+    return {"enabled": tick_trace.enabled(), "channels": tick_trace.report()}
+
+
+@router.get("/metrics/ws-subscriptions")
+def ws_subscriptions():
+    # подписки и задачи апстрима по каждому открытому соединению /ws
+    return {"connections": connections_report()}
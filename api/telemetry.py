@@ -0,0 +1,79 @@
+import asyncio
+import os
+import resource
+
+from common.metrics import REGISTRY
+
+# opcode Astras для каждого канала подписок WSContext
+CHANNEL_OPCODES = {
+    "quotes": "QuotesSubscribe",
+    "book": "OrderBookGetAndSubscribe",
+    "bars": "BarsGetAndSubscribe",
+    "orders": "OrdersGetAndSubscribeV2",
+    "fills": "TradesGetAndSubscribeV2",
+    "positions": "PositionsGetAndSubscribeV2",
+    "summaries": "SummariesGetAndSubscribeV2",
+}
+
+CLIENT_SEND = REGISTRY.histogram(
+    "astras_ws_send_seconds",
+    "Time to hand a frame to the client socket",
+    ("endpoint", "opcode"),
+)
+CLIENT_SEND_PENDING = REGISTRY.gauge(
+    "astras_ws_send_pending",
+    "Frames waiting on the client socket",
+    ("endpoint", "opcode"),
+)
+WS_SUBSCRIPTIONS = REGISTRY.gauge(
+    "astras_ws_subscriptions",
+    "Active client subscriptions on /ws",
+    ("channel",),
+)
+CWS_ACK = REGISTRY.histogram(
+    "astras_cws_ack_seconds",
+    "Order command latency from client frame to ack",
+    ("opcode",),
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay of a periodic event loop tick past its due time",
+)
+
+
+def _process_values() -> dict[tuple[str, ...], float]:
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    out = {
+        ("cpu_user_seconds",): ru.ru_utime,
+        ("cpu_system_seconds",): ru.ru_stime,
+        ("cpu_seconds",): ru.ru_utime + ru.ru_stime,
+        ("max_rss_bytes",): float(ru.ru_maxrss * 1024),
+    }
+    try:
+        with open("/proc/self/statm", "r") as f:
+            out[("rss_bytes",)] = float(int(f.read().split()[1]) * resource.getpagesize())
+    except Exception:
+        pass
+    try:
+        out[("open_fds",)] = float(len(os.listdir("/proc/self/fd")))
+    except Exception:
+        pass
+    return out
+
+
+REGISTRY.callback_gauge(
+    "gateway_process",
+    "Gateway process CPU time, memory and descriptors",
+    ("stat",),
+    _process_values,
+)
+
+
+async def monitor_event_loop_lag(interval: float = 0.1) -> None:
+    # насколько позже положенного просыпается периодическая задача: блокирующий код
+    # в обработчиках и перегрузка цикла видны здесь раньше, чем в задержках клиентов
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.labels().observe(max(0.0, loop.time() - due))
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable
+
+from common.metrics import REGISTRY
+
+# Фоновый прогрев шлюза: каждый компонент (сокет заявок, реестр инструментов,
+# кэш тикеров, ...) прогревается своей задачей параллельно с остальными, с таймаутом
+# на попытку и повтором с джиттером до успеха. Старт приложения не ждет сети;
+# /health/ready отвечает 200 только когда прогреты все обязательные компоненты.
+
+WARM_READY = REGISTRY.gauge(
+    "gateway_warm_ready",
+    "Gateway component warmed up (1) or still warming (0)",
+    ("component",),
+)
+WARM_ATTEMPTS = REGISTRY.counter(
+    "gateway_warm_attempts_total",
+    "Warmup attempts per component and outcome",
+    ("component", "outcome"),
+)
+
+
+class _Component:
+    __slots__ = ("name", "fn", "required", "state", "attempts", "error", "started_at", "ready_at")
+
+    def __init__(self, name: str, fn: Callable[[], Awaitable[object]], required: bool):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.state = "pending"
+        self.attempts = 0
+        self.error: str | None = None
+        self.started_at = 0.0
+        self.ready_at: float | None = None
+
+
+_COMPONENTS: dict[str, _Component] = {}
+_TASKS: dict[str, asyncio.Task] = {}
+_STAGE_TIMEOUT_SEC = 15.0
+_RETRY_BASE_SEC = 0.5
+_RETRY_MAX_SEC = 30.0
+
+
+def configure(stage_timeout_sec: float = 15.0, retry_base_sec: float = 0.5, retry_max_sec: float = 30.0) -> None:
+    global _STAGE_TIMEOUT_SEC, _RETRY_BASE_SEC, _RETRY_MAX_SEC
+    _STAGE_TIMEOUT_SEC = max(0.1, float(stage_timeout_sec))
+    _RETRY_BASE_SEC = max(0.01, float(retry_base_sec))
+    _RETRY_MAX_SEC = max(_RETRY_BASE_SEC, float(retry_max_sec))
+
+
+def register(name: str, fn: Callable[[], Awaitable[object]], required: bool = True) -> None:
+    _COMPONENTS[name] = _Component(name, fn, required)
+    WARM_READY.labels(name).set(0)
+
+
+async def _run(c: _Component) -> None:
+    c.state = "warming"
+    c.started_at = time.time()
+    delay = _RETRY_BASE_SEC
+    while True:
+        c.attempts += 1
+        try:
+            await asyncio.wait_for(c.fn(), timeout=_STAGE_TIMEOUT_SEC)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            c.error = f"timeout {_STAGE_TIMEOUT_SEC:g}s"
+            WARM_ATTEMPTS.labels(c.name, "timeout").inc()
+        except Exception as e:
+            c.error = f"{type(e).__name__}: {e}"
+            WARM_ATTEMPTS.labels(c.name, "error").inc()
+        else:
+            c.state = "ready"
+            c.error = None
+            c.ready_at = time.time()
+            WARM_ATTEMPTS.labels(c.name, "ok").inc()
+            WARM_READY.labels(c.name).set(1)
+            return
+        # full jitter: перезапущенные разом воркеры не бьют в OKX синхронно
+        await asyncio.sleep(random.uniform(0.0, delay))
+        delay = min(delay * 2.0, _RETRY_MAX_SEC)
+
+
+def start() -> None:
+    for name, c in _COMPONENTS.items():
+        t = _TASKS.get(name)
+        if t is not None and not t.done():
+            continue
+        if c.state == "ready":
+            continue
+        _TASKS[name] = asyncio.create_task(_run(c))
+
+
+async def stop() -> None:
+    tasks = [t for t in _TASKS.values() if not t.done()]
+    for t in tasks:
+        t.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    _TASKS.clear()
+
+
+def ready() -> bool:
+    return bool(_COMPONENTS) and all(c.state == "ready" for c in _COMPONENTS.values() if c.required)
+
+
+def report() -> dict:
+    now = time.time()
+    components = {}
+    for name, c in _COMPONENTS.items():
+        item = {
+            "state": c.state,
+            "required": c.required,
+            "attempts": c.attempts,
+        }
+        if c.ready_at is not None:
+            item["warmupMs"] = int((c.ready_at - c.started_at) * 1000)
+        elif c.started_at:
+            item["elapsedMs"] = int((now - c.started_at) * 1000)
+        if c.error:
+            item["error"] = c.error
+        components[name] = item
+    return {"ready": ready(), "components": components}
@@ -1,31 +1,55 @@
 import asyncio
+import time
 from fastapi import WebSocket
 from starlette.websockets import WebSocketState
 
+from api.telemetry import CHANNEL_OPCODES, CLIENT_SEND, CLIENT_SEND_PENDING
+from common import codec
+from .registry import SubscriptionRegistry
+
+# открытые соединения /ws — для отчета о подписках по соединениям
+CONNECTIONS: set["WSContext"] = set()
+
+
+def msg_flag(msg: dict, name: str, default: bool = False) -> bool:
+    # флаг запроса: true, 1 или строка "true"/"1"; строка "false" — не истина
+    v = msg.get(name, default)
+    if isinstance(v, str):
+        return v.strip().lower() in ("true", "1")
+    return v is True or (isinstance(v, int) and v == 1)
+
 
 class WSContext:
     def __init__(self, ws: WebSocket):
         self.ws = ws
-        self.active: dict[str, list[asyncio.Event]] = {
-            "quotes": [],
-            "book": [],
-            "fills": [],
-            "orders": [],
-            "positions": [],
-            "summaries": [],
-            "bars": [],
-        }
-        self.subs: dict[str, asyncio.Event] = {}
-        self.last_sent_ms_book: dict[str, int] = {}
-        self.last_sent_ms_quotes: dict[str, int] = {}
+        self.opened_at = time.time()
+        self.subs = SubscriptionRegistry()
+        self.opcode_by_guid: dict[str, str] = {}
+        CONNECTIONS.add(self)
 
     async def safe_send_json(self, payload: dict):
+        try:
+            text = codec.dumps(payload)
+        except Exception:
+            return
+        await self.safe_send_text(text, payload.get("guid") or payload.get("requestGuid"))
+
+    async def safe_send_text(self, text: str, guid: str | None = None):
+        # уже закодированный JSON; Astras ждет текстовые фреймы, поэтому send_text
         if self.ws.client_state != WebSocketState.CONNECTED:
             return
+        opcode = self.opcode_by_guid.get(guid, "other") if guid else "other"
+        pending = CLIENT_SEND_PENDING.labels("ws", opcode)
+        pending.inc()
+        t0 = time.perf_counter()
         try:
-            await self.ws.send_json(payload)
+            await self.ws.send_text(text)
         except Exception:
-            return
+            return False
+        finally:
+            pending.dec()
+            CLIENT_SEND.labels("ws", opcode).observe(time.perf_counter() - t0)
+        return True
 
     async def send_ack_200(self, guid: str | None):
         await self.safe_send_json(
@@ -44,6 +68,9 @@ class WSContext:
         stop_ev: asyncio.Event,
         timeout_s: float = 5.0,
     ) -> bool:
+        if subscribed_ev.is_set() and not error_ev.is_set():
+            # поток уже идет (общий хаб): без ожидания и лишних задач
+            return True
         done, pending = await asyncio.wait(
             [
                 asyncio.create_task(subscribed_ev.wait()),
@@ -57,6 +84,7 @@ class WSContext:
 
         if error_ev.is_set():
             stop_ev.set()
+            await self._drop_failed_sub(guid, stop_ev)
             return False
         if subscribed_ev.is_set():
             return True
@@ -69,8 +97,14 @@ class WSContext:
             }
         )
         stop_ev.set()
+        await self._drop_failed_sub(guid, stop_ev)
         return False
 
+    async def _drop_failed_sub(self, guid: str, stop_ev: asyncio.Event):
+        # подписка не состоялась: запись и задача апстрима не должны висеть до отписки
+        if await self.subs.remove(guid, stop_ev):
+            self.opcode_by_guid.pop(guid, None)
+
     async def send_error_and_close(self, guid: str | None, http_code: int, message: str):
         try:
             await self.safe_send_json(
@@ -95,28 +129,43 @@ class WSContext:
         http_code = self._okx_code_as_int(okx_code)
         await self.send_error_and_close(guid, http_code, okx_msg)
 
-    def replace_sub(self, guid: str, stop: asyncio.Event, channel: str):
-        old = self.subs.pop(guid, None)
-        if old:
-            old.set()
-        self.active[channel].append(stop)
-        self.subs[guid] = stop
+    async def send_okx_ws_error(self, guid: str | None, ev: dict):
+        # ошибка OKX ответом на подписку без закрытия соединения
+        await self.safe_send_json(
+            {
+                "message": ev.get("msg") or ev.get("message") or "OKX WS error",
+                "httpCode": self._okx_code_as_int(ev.get("code")),
+                "requestGuid": guid,
+            }
+        )
+
+    async def replace_sub(self, guid: str, stop: asyncio.Event, channel: str):
+        await self.subs.add(guid, channel, stop)
+        self.opcode_by_guid[guid] = CHANNEL_OPCODES.get(channel, channel)
+
+    def spawn(self, guid: str, stop: asyncio.Event, coro):
+        # задача апстрима принадлежит подписке: снимается вместе с ней
+        return self.subs.spawn(guid, stop, coro)
+
+    async def unsubscribe_guid(self, guid: str):
+        await self.subs.remove(guid)
+        self.opcode_by_guid.pop(guid, None)
 
-    def unsubscribe_guid(self, guid: str):
-        ev = self.subs.pop(guid, None)
-        if ev:
-            ev.set()
-        self.last_sent_ms_book.pop(guid, None)
-        self.last_sent_ms_quotes.pop(guid, None)
+    def report(self) -> dict:
+        client = self.ws.client
+        return {
+            "client": f"{client.host}:{client.port}" if client else None,
+            "openedAt": int(self.opened_at),
+            "subscriptions": len(self.subs),
+            "tasks": self.subs.tasks(),
+            "channels": self.subs.counts(),
+        }
 
     async def cleanup(self):
-        for lst in self.active.values():
-            for ev in lst:
-                ev.set()
-
-        for ev in self.subs.values():
-            try:
-                ev.set()
-            except Exception:
-                pass
-        self.subs.clear()
+        CONNECTIONS.discard(self)
+        await self.subs.close_all()
+        self.opcode_by_guid.clear()
+
+
+def connections_report() -> list[dict]:
+    return [ctx.report() for ctx in list(CONNECTIONS)]
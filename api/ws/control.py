@@ -28,7 +28,7 @@ async def handle_control_opcode(ctx: WSContext, msg: dict, opcode: str | None, r
 
     if opcode == "unsubscribe":
         unsub_guid = msg.get("guid") or req_guid
-        ctx.unsubscribe_guid(unsub_guid)
+        await ctx.unsubscribe_guid(unsub_guid)
         await ctx.safe_send_json(
             {
                 "message": "Handled successfully",
@@ -1,6 +1,7 @@
 import asyncio
 import time
 
+from adapters.okx.records import Candle
 from api import core
 from ..common import WSContext
 
@@ -9,7 +10,7 @@ async def handle_bars(ctx: WSContext, msg: dict, req_guid: str | None):
     sub_guid = msg.get("guid") or req_guid
 
     stop = asyncio.Event()
-    ctx.replace_sub(sub_guid, stop, "bars")
+    await ctx.replace_sub(sub_guid, stop, "bars")
 
     code = msg.get("code")
     tf = str(msg.get("tf", "60"))
@@ -22,21 +23,22 @@ async def handle_bars(ctx: WSContext, msg: dict, req_guid: str | None):
     data_format = msg.get("format")
     frequency = msg.get("frequency")
 
-    async def send_bar_astras(bar: dict, _guid: str):
-        o = bar.get("open")
-        h = bar.get("high")
-        l = bar.get("low")
-        c = bar.get("close")
+    async def send_bar_astras(bar: Candle, _guid: str):
+        bar = Candle.of(bar)
+        o = bar.open
+        h = bar.high
+        l = bar.low
+        c = bar.close
         if o is None or h is None or l is None or c is None:
             return
 
-        ts_ms = bar.get("ts", 0)
+        ts_ms = bar.ts or 0
         try:
             t_sec = int(int(ts_ms) / 1000)
         except Exception:
             return
 
-        vol = bar.get("volume", 0)
+        vol = bar.volume or 0
 
         payload = {
             "time": t_sec,
@@ -74,7 +76,24 @@ async def handle_bars(ctx: WSContext, msg: dict, req_guid: str | None):
                 return
             await send_bar_astras(b, _guid)
 
-        asyncio.create_task(
+        async def _on_gap(ev: dict):
+            # свечи за время обрыва апстрима добираем из истории
+            try:
+                missed = await core.adapter.get_bars_history(
+                    symbol=code,
+                    tf=tf,
+                    from_ts=int(ev.get("since") or 0) // 1000,
+                    inst_type=instrument_group,
+                )
+                missed.sort(key=lambda x: int(x.get("ts", 0)))
+                for hbar in missed:
+                    await send_bar_astras(hbar, sub_guid)
+            except Exception:
+                pass
+
+        ctx.spawn(
+            sub_guid,
+            stop,
             core.adapter.subscribe_bars(
                 symbol=code,
                 tf=tf,
@@ -86,6 +105,7 @@ async def handle_bars(ctx: WSContext, msg: dict, req_guid: str | None):
                 stop_event=stop,
                 on_subscribed=_on_subscribed,
                 on_error=_on_error,
+                on_gap=_on_gap,
                 unsub_args=unsub_args,
             )
         )
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+from common import codec, tick_trace
+from ..common import WSContext
+
+
+# render(data, render_key, snapshot) -> payload dict (или None — пропустить)
+RenderFn = Callable[[dict, Hashable, bool], dict | None]
+# start(key, on_data, stop, on_subscribed, on_error, on_gap) -> корутина апстрим-подписки
+StartFn = Callable[..., Awaitable[None]]
+
+
+class Subscriber:
+    __slots__ = (
+        "ctx",
+        "guid",
+        "guid_tail",
+        "stop",
+        "render_key",
+        "frequency_ms",
+        "last_sent_ms",
+        "snapshot_sent",
+        "ready",
+        "subscribed_evt",
+        "error_evt",
+        "render_own",
+    )
+
+    def __init__(
+        self,
+        ctx: WSContext,
+        guid: str,
+        stop: asyncio.Event,
+        render_key: Hashable,
+        frequency_ms: int,
+        render_own: Callable[[dict, bool], dict | None] | None = None,
+    ):
+        self.ctx = ctx
+        self.guid = guid
+        # хвост сообщения с guid кодируем один раз на подписку
+        self.guid_tail = ',"guid":' + codec.dumps(guid) + "}"
+        self.stop = stop
+        self.render_key = render_key
+        self.frequency_ms = frequency_ms
+        self.last_sent_ms = 0
+        self.snapshot_sent = False
+        self.ready = False
+        self.subscribed_evt = asyncio.Event()
+        self.error_evt = asyncio.Event()
+        # собственный рендер со своим состоянием (например, дельты стакана);
+        # такие подписчики не участвуют в общем кодировании
+        self.render_own = render_own
+
+
+class _Stream:
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.subs: dict[int, Subscriber] = {}
+        self.stop = asyncio.Event()
+        self.subscribed = False
+        self.last: dict | None = None
+        self.task: asyncio.Task | None = None
+        self.linger: asyncio.TimerHandle | None = None
+
+
+# Одна апстрим-подписка на ключ (символ) и общий рендер payload для всех клиентов:
+# payload кодируется один раз на (render_key, snapshot) за тик, затем к нему
+# дописывается уже закодированный guid конкретного клиента.
+# Новый подписчик на уже идущий поток получает подтверждение и последнее состояние
+# сразу, без подписки на OKX; поток без подписчиков живет еще linger_sec, чтобы
+# возврат к недавнему символу в виджете тоже был мгновенным.
+class BroadcastHub:
+    def __init__(self, start: StartFn, render: RenderFn, channel: str, linger_sec: float = 0.0):
+        self._start = start
+        self._render = render
+        self._channel = channel
+        self._linger_sec = max(0.0, float(linger_sec))
+        self._streams: dict[Hashable, _Stream] = {}
+        # ссылки на фоновые задачи (отправки, наблюдатели): без них задачу может
+        # собрать GC посреди отправки
+        self._tasks: set[asyncio.Task] = set()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def join(self, key: Hashable, sub: Subscriber) -> None:
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = _Stream(key)
+            self._streams[key] = stream
+            stream.task = self._spawn(self._run(stream))
+        elif stream.linger is not None:
+            stream.linger.cancel()
+            stream.linger = None
+        stream.subs[id(sub)] = sub
+        if stream.subscribed:
+            sub.subscribed_evt.set()
+        self._spawn(self._watch(stream, sub))
+
+    async def activate(self, key: Hashable, sub: Subscriber) -> None:
+        # после ack клиенту: начинаем отдавать данные и сразу шлем последнее состояние
+        sub.ready = True
+        stream = self._streams.get(key)
+        if stream is None or stream.last is None or sub.stop.is_set():
+            return
+        text = self._encode_for(sub, stream.last, True)
+        if text is None:
+            return
+        sub.snapshot_sent = True
+        sub.last_sent_ms = int(time.time() * 1000)
+        await sub.ctx.safe_send_text(text + sub.guid_tail, sub.guid)
+
+    async def _watch(self, stream: _Stream, sub: Subscriber) -> None:
+        await sub.stop.wait()
+        stream.subs.pop(id(sub), None)
+        if stream.subs or stream.stop.is_set():
+            return
+        if self._linger_sec > 0 and stream.subscribed:
+            if stream.linger is None:
+                stream.linger = asyncio.get_running_loop().call_later(self._linger_sec, self._close_idle, stream)
+            return
+        self._close_idle(stream)
+
+    def _close_idle(self, stream: _Stream) -> None:
+        stream.linger = None
+        if stream.subs:
+            return
+        stream.stop.set()
+        if self._streams.get(stream.key) is stream:
+            self._streams.pop(stream.key, None)
+
+    async def _run(self, stream: _Stream) -> None:
+        try:
+            await self._start(
+                stream.key,
+                lambda data, _s=stream: self._on_data(_s, data),
+                stream.stop,
+                lambda ev, _s=stream: self._on_subscribed(_s, ev),
+                lambda ev, _s=stream: self._on_error(_s, ev),
+                lambda ev, _s=stream: self._on_gap(_s, ev),
+            )
+        finally:
+            if stream.linger is not None:
+                stream.linger.cancel()
+                stream.linger = None
+            if self._streams.get(stream.key) is stream:
+                self._streams.pop(stream.key, None)
+
+    def _on_subscribed(self, stream: _Stream, _ev: dict) -> None:
+        stream.subscribed = True
+        for sub in stream.subs.values():
+            sub.subscribed_evt.set()
+
+    def _on_gap(self, stream: _Stream, _ev: dict) -> None:
+        # апстрим переподключился после обрыва: прежнее состояние устарело,
+        # следующий тик уходит каждому подписчику полным снимком
+        stream.last = None
+        for sub in stream.subs.values():
+            sub.snapshot_sent = False
+
+    def _on_error(self, stream: _Stream, ev: dict) -> None:
+        # поток больше не выдается новым подписчикам: иначе тот, кто успел войти до
+        # выхода _run, ждал бы ошибку до таймаута; следующий join поднимет новый поток
+        if self._streams.get(stream.key) is stream:
+            self._streams.pop(stream.key, None)
+        stream.stop.set()
+        for sub in list(stream.subs.values()):
+            sub.error_evt.set()
+            self._spawn(sub.ctx.handle_okx_ws_error(sub.guid, ev))
+
+    def _encode(self, data: dict, render_key: Hashable, snapshot: bool) -> str | None:
+        payload = self._render(data, render_key, snapshot)
+        if payload is None:
+            return None
+        return '{"data":' + codec.dumps(payload)
+
+    def _encode_for(self, sub: Subscriber, data: dict, snapshot: bool) -> str | None:
+        if sub.render_own is not None:
+            payload = sub.render_own(data, snapshot)
+            return None if payload is None else '{"data":' + codec.dumps(payload)
+        return self._encode(data, sub.render_key, snapshot)
+
+    async def _send_traced(self, sub: Subscriber, text: str, trace: dict, enqueue_s: float) -> None:
+        if await sub.ctx.safe_send_text(text, sub.guid):
+            tick_trace.finish(self._channel, trace, enqueue_s)
+
+    def _on_data(self, stream: _Stream, data: dict) -> None:
+        stream.last = data
+        if not stream.subs:
+            return
+
+        now_ms = int(time.time() * 1000)
+        upstream_snapshot = bool(data.get("existing", False))
+        trace = data.get("_trace")
+        heads: dict[tuple[Hashable, bool], str | None] = {}
+        for sub in list(stream.subs.values()):
+            if not sub.ready or sub.stop.is_set():
+                continue
+            if sub.frequency_ms > 0 and (now_ms - sub.last_sent_ms) < sub.frequency_ms:
+                continue
+
+            snapshot = upstream_snapshot or not sub.snapshot_sent
+            k = (sub.render_key, snapshot)
+            if sub.render_own is not None:
+                head = self._encode_for(sub, data, snapshot)
+            elif k in heads:
+                head = heads[k]
+            else:
+                head = heads[k] = self._encode(data, sub.render_key, snapshot)
+            if head is None:
+                continue
+
+            sub.last_sent_ms = now_ms
+            sub.snapshot_sent = True
+            if trace is not None:
+                self._spawn(self._send_traced(sub, head + sub.guid_tail, trace, time.time()))
+            else:
+                self._spawn(sub.ctx.safe_send_text(head + sub.guid_tail, sub.guid))
@@ -2,7 +2,132 @@ import asyncio
 import time
 
 from api import core
-from ..common import WSContext
+from ..common import WSContext, msg_flag
+from .broadcast import BroadcastHub, Subscriber
+
+
+def render_book_payload(book: dict, render_key: tuple, snapshot: bool) -> dict | None:
+    data_format_norm, depth = render_key
+    ms_ts = int(book.get("ts", 0) or 0)
+    ts_sec = int(ms_ts / 1000) if ms_ts else 0
+    existing_flag = bool(snapshot)
+    bids_in = book.get("bids") or []
+    asks_in = book.get("asks") or []
+
+    if depth and depth > 0:
+        bids_in = bids_in[:depth]
+        asks_in = asks_in[:depth]
+    if data_format_norm == "slim":
+        return {
+            "b": [{"p": float(p), "v": float(v)} for (p, v) in bids_in],
+            "a": [{"p": float(p), "v": float(v)} for (p, v) in asks_in],
+            "t": ms_ts,
+            "h": bool(existing_flag),
+        }
+    if data_format_norm == "simple":
+        return {
+            "snapshot": existing_flag,
+            "bids": [{"price": float(p), "volume": float(v)} for (p, v) in bids_in],
+            "asks": [{"price": float(p), "volume": float(v)} for (p, v) in asks_in],
+            "timestamp": ts_sec,
+            "ms_timestamp": ms_ts,
+            "existing": existing_flag,
+        }
+    return None
+
+
+def _levels(rows: list, fmt: str) -> list[dict]:
+    if fmt == "slim":
+        return [{"p": float(p), "v": float(v)} for (p, v) in rows]
+    return [{"price": float(p), "volume": float(v)} for (p, v) in rows]
+
+
+# Инкрементальный формат: только изменившиеся уровни top-depth с прошлого сообщения
+# этому guid (объем 0 — уровень удален), периодический полный снапшот и seq для
+# обнаружения пропусков на клиенте.
+class DeltaBookEncoder:
+    def __init__(self, data_format_norm: str, depth: int, snapshot_interval_ms: int):
+        self.fmt = data_format_norm
+        self.depth = depth
+        self.snapshot_interval_ms = snapshot_interval_ms
+        self.seq = 0
+        self.last_snapshot_ms = 0
+        self.bids: dict[float, float] = {}
+        self.asks: dict[float, float] = {}
+
+    @staticmethod
+    def _diff(prev: dict[float, float], cur: dict[float, float]) -> list[tuple[float, float]]:
+        out = [(p, v) for p, v in cur.items() if prev.get(p) != v]
+        out.extend((p, 0.0) for p in prev if p not in cur)
+        return out
+
+    def render(self, book: dict, snapshot: bool) -> dict | None:
+        if self.fmt not in ("slim", "simple"):
+            return None
+        now_ms = int(time.time() * 1000)
+        if self.snapshot_interval_ms > 0 and now_ms - self.last_snapshot_ms >= self.snapshot_interval_ms:
+            snapshot = True
+
+        bids_in = book.get("bids") or []
+        asks_in = book.get("asks") or []
+        if self.depth and self.depth > 0:
+            bids_in = bids_in[: self.depth]
+            asks_in = asks_in[: self.depth]
+        bids_cur = {float(p): float(v) for (p, v) in bids_in}
+        asks_cur = {float(p): float(v) for (p, v) in asks_in}
+
+        if snapshot:
+            bids_out = list(bids_cur.items())
+            asks_out = list(asks_cur.items())
+            self.last_snapshot_ms = now_ms
+        else:
+            bids_out = self._diff(self.bids, bids_cur)
+            asks_out = self._diff(self.asks, asks_cur)
+            if not bids_out and not asks_out:
+                return None
+        self.bids = bids_cur
+        self.asks = asks_cur
+        self.seq += 1
+
+        ms_ts = int(book.get("ts", 0) or 0)
+        if self.fmt == "slim":
+            return {
+                "b": _levels(bids_out, "slim"),
+                "a": _levels(asks_out, "slim"),
+                "t": ms_ts,
+                "h": bool(snapshot),
+                "s": self.seq,
+            }
+        return {
+            "snapshot": bool(snapshot),
+            "bids": _levels(bids_out, "simple"),
+            "asks": _levels(asks_out, "simple"),
+            "timestamp": int(ms_ts / 1000) if ms_ts else 0,
+            "ms_timestamp": ms_ts,
+            "existing": bool(snapshot),
+            "seq": self.seq,
+        }
+
+
+def _start_book_stream(symbol, on_data, stop, on_subscribed, on_error, on_gap):
+    return core.adapter.subscribe_order_book(
+        symbol=symbol,
+        depth=0,
+        on_data=on_data,
+        stop_event=stop,
+        on_subscribed=on_subscribed,
+        on_error=on_error,
+        on_gap=on_gap,
+        unsub_args=[{"channel": "books", "instId": symbol}],
+    )
+
+
+book_hub = BroadcastHub(
+    _start_book_stream,
+    render_book_payload,
+    "books",
+    linger_sec=core.MD_STREAM_LINGER_SEC,
+)
 
 
 async def handle_order_book(ctx: WSContext, msg: dict, req_guid: str | None):
@@ -24,69 +149,24 @@ async def handle_order_book(ctx: WSContext, msg: dict, req_guid: str | None):
         frequency = min_freq
 
     sub_guid = msg.get("guid") or req_guid
-    ctx.replace_sub(sub_guid, stop, "book")
+    await ctx.replace_sub(sub_guid, stop, "book")
 
     exchange = msg.get("exchange")
     instrument_group = msg.get("instrumentGroup")
 
-    async def on_book(book: dict, _guid: str):
-        now_ms = int(time.time() * 1000)
-        freq_ms = frequency if isinstance(frequency, int) else 25
-        prev_ms = ctx.last_sent_ms_book.get(_guid, 0)
-        if freq_ms > 0 and (now_ms - prev_ms) < freq_ms:
-            return
-
-        ctx.last_sent_ms_book[_guid] = now_ms
-        ms_ts = int(book.get("ts", 0) or 0)
-        ts_sec = int(ms_ts / 1000) if ms_ts else 0
-        existing_flag = bool(book.get("existing", False))
-        bids_in = book.get("bids") or []
-        asks_in = book.get("asks") or []
-
-        if depth and depth > 0:
-            bids_in = bids_in[:depth]
-            asks_in = asks_in[:depth]
-        if data_format_norm == "slim":
-            payload = {
-                "b": [{"p": float(p), "v": float(v)} for (p, v) in bids_in],
-                "a": [{"p": float(p), "v": float(v)} for (p, v) in asks_in],
-                "t": ms_ts,
-                "h": bool(existing_flag),
-            }
-        elif data_format_norm == "simple":
-            payload = {
-                "snapshot": existing_flag,
-                "bids": [{"price": float(p), "volume": float(v)} for (p, v) in bids_in],
-                "asks": [{"price": float(p), "volume": float(v)} for (p, v) in asks_in],
-                "timestamp": ts_sec,
-                "ms_timestamp": ms_ts,
-                "existing": existing_flag,
-            }
-        await ctx.safe_send_json({"data": payload, "guid": _guid})
+    render_own = None
+    if msg_flag(msg, "incremental"):
+        try:
+            snapshot_interval = int(msg.get("snapshotInterval", 5000))
+        except Exception:
+            snapshot_interval = 5000
+        render_own = DeltaBookEncoder(data_format_norm, depth, snapshot_interval).render
 
     if code:
-        subscribed_evt = asyncio.Event()
-        error_evt = asyncio.Event()
-
-        def _on_subscribed(_ev: dict):
-            subscribed_evt.set()
-
-        def _on_error(ev: dict):
-            error_evt.set()
-            return asyncio.create_task(ctx.handle_okx_ws_error(sub_guid, ev))
-
-        asyncio.create_task(
-            core.adapter.subscribe_order_book(
-                symbol=code,
-                depth=depth,
-                on_data=lambda b, _g=sub_guid: asyncio.create_task(on_book(b, _g)),
-                stop_event=stop,
-                on_subscribed=_on_subscribed,
-                on_error=_on_error,
-                unsub_args=[{"channel": "books", "instId": code}],
-            )
-        )
-
-        if not await ctx.wait_okx_subscribed_or_error(subscribed_evt, error_evt, sub_guid, stop):
+        sub = Subscriber(ctx, sub_guid, stop, (data_format_norm, depth), frequency, render_own)
+        book_hub.join(code, sub)
+
+        if not await ctx.wait_okx_subscribed_or_error(sub.subscribed_evt, sub.error_evt, sub_guid, stop):
             return
         await ctx.send_ack_200(sub_guid)
+        await book_hub.activate(code, sub)
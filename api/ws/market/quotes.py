@@ -2,8 +2,212 @@ import asyncio
 import time
 from typing import List
 
+from adapters.okx.records import Ticker
 from api import core
+from common import codec, tick_trace
 from ..common import WSContext
+from .broadcast import BroadcastHub, Subscriber
+
+
+def render_quote_payload(t: Ticker, _render_key=None, _snapshot: bool = False) -> dict | None:
+    t = Ticker.of(t)
+    last_raw = t.last
+    if last_raw is None and t.bid is None and t.ask is None:
+        return None
+
+    ts_ms = int(t.ts or 0)
+    ts_sec = int(ts_ms / 1000) if ts_ms else 0
+    last_price = last_raw or 0
+    bid = t.bid or 0
+    ask = t.ask or 0
+    bid_sz = t.bid_sz or 0
+    ask_sz = t.ask_sz or 0
+    high_price = t.high24h or 0
+    low_price = t.low24h or 0
+    open_price = t.open24h or 0
+    volume = t.vol24h or 0
+    if open_price > 0:
+        change = last_price - open_price
+        change_percent = (change / open_price) * 100.0
+    else:
+        change = 0.0
+        change_percent = 0.0
+
+    return {
+        "symbol": t.symbol,
+        "exchange": "OKX",
+        "description": None,
+        "prev_close_price": open_price,
+        "last_price": last_price,
+        "last_price_timestamp": ts_sec,
+        "high_price": high_price,
+        "low_price": low_price,
+        "accruedInt": 0,
+        "volume": volume,
+        "open_interest": None,
+        "ask": ask,
+        "bid": bid,
+        "ask_vol": ask_sz,
+        "bid_vol": bid_sz,
+        "ob_ms_timestamp": None,
+        "open_price": open_price,
+        "yield": None,
+        "lotsize": 0,
+        "lotvalue": 0,
+        "facevalue": 0,
+        "type": "0",
+        "total_bid_vol": 0,
+        "total_ask_vol": 0,
+        "accrued_interest": 0,
+        "change": change,
+        "change_percent": change_percent,
+    }
+
+
+def _start_quotes_stream(symbol, on_data, stop, on_subscribed, on_error, on_gap):
+    return core.adapter.subscribe_quotes(
+        symbol=symbol,
+        on_data=on_data,
+        stop_event=stop,
+        on_subscribed=on_subscribed,
+        on_error=on_error,
+        on_gap=on_gap,
+        unsub_args=[{"channel": "tickers", "instId": symbol}],
+    )
+
+
+quotes_hub = BroadcastHub(
+    _start_quotes_stream,
+    render_quote_payload,
+    "tickers",
+    linger_sec=core.MD_STREAM_LINGER_SEC,
+)
+
+
+# Котировки по списку символов под одним guid (виджет списка наблюдения): один
+# апстрим tickers на весь список, по символу хранится только последний тикер —
+# промежуточные тики схлопываются, — и раз в frequency мс накопленное уходит клиенту
+# пачкой из одной задачи. Медленный клиент тормозит только свою пачку: пока она
+# отправляется, новые тики лишь перезаписывают последнее состояние символов.
+# Отклоненный OKX символ (делистинг, опечатка) не роняет список и не закрывает /ws:
+# клиент получает по нему кадр ошибки с guid подписки, остальные символы идут дальше.
+class QuotesBatch:
+    def __init__(self, ctx: WSContext, guid: str, stop: asyncio.Event, frequency_ms: int):
+        self.ctx = ctx
+        self.guid = guid
+        self.guid_tail = ',"guid":' + codec.dumps(guid) + "}"
+        self.stop = stop
+        self.frequency_s = max(0, frequency_ms) / 1000.0
+        self.pending: dict[str, Ticker] = {}
+        self.ready = False
+        self.subscribed_evt = asyncio.Event()
+        self.error_evt = asyncio.Event()
+        # ошибки по символам до ack клиенту: уходят сразу после него
+        self.failed: list[tuple[str, dict]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushing = False
+        self._last_flush = 0.0
+        # ссылки на фоновые задачи, как в BroadcastHub: GC не снимет их посреди отправки
+        self._tasks: set[asyncio.Task] = set()
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_data(self, t: Ticker) -> None:
+        if self.stop.is_set():
+            return
+        self.pending[t.symbol] = t
+        if self.ready:
+            self._schedule()
+
+    def on_subscribed(self, _ev: dict) -> None:
+        self.subscribed_evt.set()
+
+    def on_error(self, ev: dict) -> None:
+        # не осталось ни одного символа: подписка не состоялась, соединение живет
+        self.error_evt.set()
+        failed, self.failed = self.failed, []
+        self._spawn(self._send_error(ev, failed))
+
+    async def _send_error(self, ev: dict, failed: list[tuple[str, dict]]) -> None:
+        # ответ на подписку — последней ошибкой, отклоненные раньше символы — следом
+        await self.ctx.send_okx_ws_error(self.guid, ev)
+        for symbol, sev in failed:
+            await self._send_symbol_error(symbol, sev)
+
+    def on_symbol_error(self, symbol: str, ev: dict) -> None:
+        self.pending.pop(symbol, None)
+        if self.ready:
+            self._spawn(self._send_symbol_error(symbol, ev))
+        else:
+            self.failed.append((symbol, ev))
+
+    async def _send_symbol_error(self, symbol: str, ev: dict) -> None:
+        await self.ctx.safe_send_json(
+            {
+                "data": {
+                    "error": "SymbolSubscribeFailed",
+                    "symbol": symbol,
+                    "code": ev.get("code"),
+                    "message": ev.get("msg") or ev.get("message") or "OKX WS error",
+                },
+                "guid": self.guid,
+            }
+        )
+
+    def activate(self) -> None:
+        # после ack клиенту: ошибки по символам и все, что пришло до него, уходят первыми
+        self.ready = True
+        failed, self.failed = self.failed, []
+        for symbol, ev in failed:
+            self._spawn(self._send_symbol_error(symbol, ev))
+        if self.pending:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is not None or self._flushing:
+            return
+        loop = asyncio.get_running_loop()
+        delay = self._last_flush + self.frequency_s - loop.time()
+        self._timer = loop.call_later(max(0.0, delay), self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        self._flushing = True
+        self._spawn(self._flush())
+
+    async def _flush(self) -> None:
+        try:
+            batch, self.pending = self.pending, {}
+            self._last_flush = asyncio.get_running_loop().time()
+            enqueue_s = time.time()
+            for t in batch.values():
+                if self.stop.is_set():
+                    return
+                payload = render_quote_payload(t)
+                if payload is None:
+                    continue
+                text = '{"data":' + codec.dumps(payload) + self.guid_tail
+                if not await self.ctx.safe_send_text(text, self.guid):
+                    return
+                tick_trace.finish("tickers", t.get("_trace"), enqueue_s)
+        finally:
+            self._flushing = False
+            if self.pending and not self.stop.is_set():
+                self._schedule()
+
+
+def _quote_symbols(code, symbols) -> list[str]:
+    # code задан — как раньше, один символ через общий хаб; список — только без code
+    if isinstance(code, str) and code.strip():
+        return [code.strip()]
+    out: list[str] = []
+    for s in symbols or []:
+        if isinstance(s, str) and s.strip() and s.strip() not in out:
+            out.append(s.strip())
+    return out
 
 
 async def handle_quotes(ctx: WSContext, msg: dict, req_guid: str | None, symbols: List[str]):
@@ -18,115 +222,39 @@ async def handle_quotes(ctx: WSContext, msg: dict, req_guid: str | None, symbols
         frequency = 25
 
     sub_guid = msg.get("guid") or req_guid
-    ctx.replace_sub(sub_guid, stop, "quotes")
+    await ctx.replace_sub(sub_guid, stop, "quotes")
 
-    exchange_out = "OKX"
-    symbol = code or (symbols[0] if symbols else "")
+    wanted = _quote_symbols(code, symbols)
 
-    async def send_quote_astras(t: dict, _guid: str):
-        last_raw = t.get("last")
-        bid_raw = t.get("bid")
-        ask_raw = t.get("ask")
-        if last_raw is None and bid_raw is None and ask_raw is None:
-            return
-
-        now_ms = int(time.time() * 1000)
-        freq_ms = frequency if isinstance(frequency, int) else 25
-        prev_ms = ctx.last_sent_ms_quotes.get(_guid, 0)
-        if freq_ms > 0 and (now_ms - prev_ms) < freq_ms:
-            return
-
-        ctx.last_sent_ms_quotes[_guid] = now_ms
-        ts_ms = int(t.get("ts", 0) or 0)
-        ts_sec = int(ts_ms / 1000) if ts_ms else 0
-        last_price = last_raw or 0
-        bid = t.get("bid", 0) or 0
-        ask = t.get("ask", 0) or 0
-        bid_sz = t.get("bid_sz", 0) or 0
-        ask_sz = t.get("ask_sz", 0) or 0
-        high_price = t.get("high24h", 0) or 0
-        low_price = t.get("low24h", 0) or 0
-        open_price = t.get("open24h", 0) or 0
-        volume = t.get("vol24h", 0) or 0
-        if open_price > 0:
-            change = last_price - open_price
-            change_percent = (change / open_price) * 100.0
-        else:
-            change = 0.0
-            change_percent = 0.0
-
-        payload = {
-            "symbol": symbol,
-            "exchange": exchange_out,
-            "description": None,
-            "prev_close_price": open_price,
-            "last_price": last_price,
-            "last_price_timestamp": ts_sec,
-            "high_price": high_price,
-            "low_price": low_price,
-            "accruedInt": 0,
-            "volume": volume,
-            "open_interest": None,
-            "ask": ask,
-            "bid": bid,
-            "ask_vol": ask_sz,
-            "bid_vol": bid_sz,
-            "ob_ms_timestamp": None,
-            "open_price": open_price,
-            "yield": None,
-            "lotsize": 0,
-            "lotvalue": 0,
-            "facevalue": 0,
-            "type": "0",
-            "total_bid_vol": 0,
-            "total_ask_vol": 0,
-            "accrued_interest": 0,
-            "change": change,
-            "change_percent": change_percent,
-        }
-
-        await ctx.safe_send_json({"data": payload, "guid": _guid})
-
-    if symbol:
-        unsub_args = [{"channel": "tickers", "instId": symbol}]
-        subscribed_evt = asyncio.Event()
-        error_evt = asyncio.Event()
-        history_done = False
-        live_buffer: list[dict] = []
-
-        def _on_subscribed(_ev: dict):
-            subscribed_evt.set()
-
-        def _on_error(ev: dict):
-            error_evt.set()
-            return asyncio.create_task(ctx.handle_okx_ws_error(sub_guid, ev))
-
-        async def _on_live_quote(q: dict, _guid: str):
-            nonlocal history_done
-            if not history_done:
-                live_buffer.append(q)
-                return
-            await send_quote_astras(q, _guid)
-
-        asyncio.create_task(
-            core.adapter.subscribe_quotes(
-                symbol=symbol,
-                on_data=lambda q, _g=sub_guid: asyncio.create_task(_on_live_quote(q, _g)),
+    if len(wanted) > 1:
+        batch = QuotesBatch(ctx, sub_guid, stop, frequency)
+        ctx.spawn(
+            sub_guid,
+            stop,
+            core.adapter.subscribe_quotes_multi(
+                symbols=wanted,
+                on_data=batch.on_data,
                 stop_event=stop,
-                on_subscribed=_on_subscribed,
-                on_error=_on_error,
-                unsub_args=unsub_args,
-            )
+                on_subscribed=batch.on_subscribed,
+                on_error=batch.on_error,
+                on_symbol_error=batch.on_symbol_error,
+            ),
         )
 
-        if not await ctx.wait_okx_subscribed_or_error(subscribed_evt, error_evt, sub_guid, stop):
+        if not await ctx.wait_okx_subscribed_or_error(batch.subscribed_evt, batch.error_evt, sub_guid, stop):
             return
 
         await ctx.send_ack_200(sub_guid)
+        batch.activate()
+        return
+
+    if wanted:
+        symbol = wanted[0]
+        sub = Subscriber(ctx, sub_guid, stop, None, frequency)
+        quotes_hub.join(symbol, sub)
 
-        history_done = True
+        if not await ctx.wait_okx_subscribed_or_error(sub.subscribed_evt, sub.error_evt, sub_guid, stop):
+            return
 
-        if live_buffer:
-            for q in live_buffer:
-                await send_quote_astras(q, sub_guid)
-            live_buffer.clear()
+        await ctx.send_ack_200(sub_guid)
+        await quotes_hub.activate(symbol, sub)
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from typing import List
 
 from api import astras
@@ -13,7 +14,7 @@ async def handle_orders(ctx: WSContext, msg: dict, req_guid: str | None, symbols
     statuses = msg.get("orderStatuses") or []
     skip_history = bool(msg.get("skipHistory", False))
     sub_guid = msg.get("guid") or req_guid
-    ctx.replace_sub(sub_guid, stop, "orders")
+    await ctx.replace_sub(sub_guid, stop, "orders")
 
     instrument_group = msg.get("instrumentGroup")
     data_format = msg.get("format")
@@ -69,7 +70,36 @@ async def handle_orders(ctx: WSContext, msg: dict, req_guid: str | None, symbols
         inst_types_ws = ["SPOT", "SWAP", "FUTURES", "MARGIN"]
     unsub_args = [{"channel": "orders", "instType": it} for it in inst_types_ws]
 
-    asyncio.create_task(
+    async def _on_gap(ev: dict):
+        # обновления за время обрыва потеряны: заново отдаем активные заявки снимком,
+        # а заявки, завершенные за [since, until] (исполнены, сняты, отклонены), —
+        # финальным состоянием из истории, иначе клиент так и видит их активными
+        since = int(ev.get("since") or 0)
+        until = int(ev.get("until") or 0) or int(time.time() * 1000)
+        inst_id = symbols[0] if symbols else None
+        sent: set[str] = set()
+        for it in inst_types_ws:
+            try:
+                pending = await core.adapter.get_orders_pending(inst_type=it, inst_id=inst_id)
+                for po in pending:
+                    if po.get("id") not in sent:
+                        sent.add(po.get("id"))
+                        await send_order_astras(po, True, sub_guid)
+            except Exception:
+                pass
+            try:
+                history = await core.adapter.get_orders_history(inst_type=it, inst_id=inst_id, limit=100)
+                for ho in history:
+                    if ho.get("id") in sent or not (since <= int(ho.get("ts_update") or 0) <= until):
+                        continue
+                    sent.add(ho.get("id"))
+                    await send_order_astras(ho, False, sub_guid)
+            except Exception:
+                pass
+
+    ctx.spawn(
+        sub_guid,
+        stop,
         core.adapter.subscribe_orders(
             symbols,
             lambda ord_, _g=sub_guid: asyncio.create_task(_on_live_order(ord_, _g)),
@@ -77,6 +107,7 @@ async def handle_orders(ctx: WSContext, msg: dict, req_guid: str | None, symbols
             inst_type=inst_type_ws,
             on_subscribed=_on_subscribed,
             on_error=_on_error,
+            on_gap=_on_gap,
             unsub_args=unsub_args,
         )
     )
@@ -1,5 +1,6 @@
 import asyncio
 
+from adapters.okx.records import Position
 from api import core
 from ..common import WSContext
 
@@ -13,12 +14,13 @@ async def handle_positions(ctx: WSContext, msg: dict, req_guid: str | None):
     sub_guid = msg.get("guid") or req_guid
     inst_type = msg.get("instrumentGroup") or msg.get("board")
     inst_type_s = str(inst_type).strip().upper() if inst_type else None
-    ctx.replace_sub(sub_guid, stop, "positions")
+    await ctx.replace_sub(sub_guid, stop, "positions")
 
-    async def send_pos_astras(p: dict, existing_flag: bool, _guid: str):
-        symbol = p.get("symbol")
-        qty_units_raw = p.get("qtyUnits")
-        avg_price_raw = p.get("avgPrice")
+    async def send_pos_astras(p: Position, existing_flag: bool, _guid: str):
+        p = Position.of(p)
+        symbol = p.symbol
+        qty_units_raw = p.qtyUnits
+        avg_price_raw = p.avgPrice
         qty_units = float(qty_units_raw) if qty_units_raw is not None else 0.00
         avg_price = float(avg_price_raw) if avg_price_raw is not None else 0
         volume = 0.00
@@ -34,8 +36,8 @@ async def handle_positions(ctx: WSContext, msg: dict, req_guid: str | None):
             "avgPrice": avg_price,
             "qtyUnits": qty_units,
             "openUnits": 0,
-            "lotSize": float(p.get("lotSize", 0) or 0),
-            "shortName": p.get("shortName") or symbol,
+            "lotSize": float(p.lotSize or 0),
+            "shortName": p.shortName or symbol,
             "qtyT0": qty_units,
             "qtyT1": qty_units,
             "qtyT2": qty_units,
@@ -50,7 +52,7 @@ async def handle_positions(ctx: WSContext, msg: dict, req_guid: str | None):
             "open": 0,
             "dailyUnrealisedPl": 0,
             "unrealisedPl": 0,
-            "isCurrency": bool(p.get("isCurrency", False)),
+            "isCurrency": bool(p.isCurrency),
             "existing": bool(existing_flag),
         }
 
@@ -75,6 +77,15 @@ async def handle_positions(ctx: WSContext, msg: dict, req_guid: str | None):
     def _on_subscribed(_ev: dict):
         subscribed_evt.set()
 
+    async def _on_gap(_ev: dict):
+        # изменения за время обрыва потеряны: заново отдаем позиции снимком
+        try:
+            snap = await core.adapter.get_positions_snapshot(inst_type=inst_type_s)
+            for pos in (snap or []):
+                await send_pos_astras(pos, True, sub_guid)
+        except Exception:
+            pass
+
     unsub_args = [{"channel": "account"}]
     inst_type_u = (inst_type_s or "SPOT").strip().upper()
     if inst_type_u in ("FUTURES", "SWAP", "MARGIN"):
@@ -82,13 +93,16 @@ async def handle_positions(ctx: WSContext, msg: dict, req_guid: str | None):
     else:
         unsub_args.append({"channel": "positions", "instType": "MARGIN"})
 
-    asyncio.create_task(
+    ctx.spawn(
+        sub_guid,
+        stop,
         core.adapter.subscribe_positions(
             on_data=lambda p, _g=sub_guid: asyncio.create_task(_on_live_pos(p, _g)),
             stop_event=stop,
             inst_type=inst_type_s,
             on_error=_on_error,
             on_subscribed=_on_subscribed,
+            on_gap=_on_gap,
             unsub_args=unsub_args,
         )
     )
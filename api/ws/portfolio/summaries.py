@@ -9,7 +9,7 @@ async def handle_summaries(ctx: WSContext, msg: dict, req_guid: str | None):
     portfolio = msg.get("portfolio")
     skip_history = bool(msg.get("skipHistory", False))
     sub_guid = msg.get("guid") or req_guid
-    ctx.replace_sub(sub_guid, stop, "summaries")
+    await ctx.replace_sub(sub_guid, stop, "summaries")
 
     async def send_summary_astras(s: dict, _guid: str):
         total_eq = float(s.get("totalEq", 0) or 0)
@@ -65,7 +65,9 @@ async def handle_summaries(ctx: WSContext, msg: dict, req_guid: str | None):
             return
         await send_summary_astras(s, _guid)
 
-    asyncio.create_task(
+    ctx.spawn(
+        sub_guid,
+        stop,
         core.adapter.subscribe_summaries(
             on_data=lambda s, _g=sub_guid: asyncio.create_task(_on_live_summary(s, _g)),
             stop_event=stop,
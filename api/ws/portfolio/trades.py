@@ -1,5 +1,6 @@
 import asyncio
 
+from adapters.okx.records import Fill
 from api import astras
 from api import core
 from ..common import WSContext
@@ -11,19 +12,21 @@ async def handle_trades(ctx: WSContext, msg: dict, req_guid: str | None):
     exchange_out = "OKX"
     skip_history = bool(msg.get("skipHistory", False))
     sub_guid = msg.get("guid") or req_guid
-    ctx.replace_sub(sub_guid, stop, "fills")
+    await ctx.replace_sub(sub_guid, stop, "fills")
 
-    async def send_trade_astras(t: dict, existing_flag: bool, _guid: str):
-        if str(t.get("id", "0")) == "0" or str(t.get("symbol", "0")) == "0":
+    async def send_trade_astras(t: Fill, existing_flag: bool, _guid: str):
+        t = Fill.of(t)
+        trade_id = str(t.id or "0")
+        if trade_id == "0" or str(t.symbol or "0") == "0":
             return
-        ts_ms = int(t.get("ts", 0) or 0)
+        ts_ms = int(t.ts or 0)
         date_iso = astras.iso_from_unix_ms(ts_ms) if ts_ms else None
-        symbol = t.get("symbol") or "N/A"
-        qty = float(t.get("qty", 0) or 0)
-        price = float(t.get("price", 0) or 0)
+        symbol = t.symbol or "N/A"
+        qty = float(t.qty or 0)
+        price = float(t.price or 0)
         payload = {
-            "id": str(t.get("id", "0")),
-            "orderno": str(t.get("orderno", "0")),
+            "id": trade_id,
+            "orderno": str(t.orderno or "0"),
             "comment": None,
             "symbol": symbol,
             "brokerSymbol": symbol,
@@ -35,12 +38,12 @@ async def handle_trades(ctx: WSContext, msg: dict, req_guid: str | None):
             "qty": qty,
             "price": price,
             "accruedInt": 0,
-            "side": t.get("side", "0"),
+            "side": t.side or "0",
             "existing": bool(existing_flag),
-            "commission": t.get("commission", 0) or 0,
+            "commission": t.commission or 0,
             "repoSpecificFields": None,
             "settleDate": None,
-            "volume": t.get("volume", 0) or 0,
+            "volume": t.volume or 0,
             "value": 0,
         }
         await ctx.safe_send_json({"data": payload, "guid": _guid})
@@ -70,13 +73,25 @@ async def handle_trades(ctx: WSContext, msg: dict, req_guid: str | None):
     inst_types_ws = [inst_type_ws] if inst_type_ws in ("SPOT", "SWAP", "FUTURES") else ["SPOT", "SWAP", "FUTURES"]
     unsub_args = [{"channel": "orders", "instType": it} for it in inst_types_ws]
 
-    asyncio.create_task(
+    async def _on_gap(_ev: dict):
+        # сделки за время обрыва добираем из истории
+        try:
+            history = await core.adapter.get_trades_history(inst_type=inst_type_rest, limit=100)
+            for tr in history:
+                await send_trade_astras(tr, True, sub_guid)
+        except Exception:
+            pass
+
+    ctx.spawn(
+        sub_guid,
+        stop,
         core.adapter.subscribe_trades(
             on_data=lambda tr, _g=sub_guid: asyncio.create_task(_on_live_trade(tr, _g)),
             stop_event=stop,
             inst_type=inst_type_ws,
             on_subscribed=_on_subscribed,
             on_error=_on_error,
+            on_gap=_on_gap,
             unsub_args=unsub_args,
         )
     )
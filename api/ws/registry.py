@@ -0,0 +1,93 @@
+import asyncio
+from typing import Coroutine
+
+from api.telemetry import WS_SUBSCRIPTIONS
+
+# Подписки одного клиентского соединения: guid -> канал, stop и задачи апстрима,
+# которыми подписка владеет. Добавление и удаление — O(1). При отписке, замене guid
+# и закрытии соединения выставляется stop, задачам дается STOP_GRACE_SEC на штатную
+# отписку от OKX, оставшиеся отменяются, и завершения дожидаемся в любом случае.
+
+STOP_GRACE_SEC = 1.0
+
+
+class _Entry:
+    __slots__ = ("channel", "stop", "tasks")
+
+    def __init__(self, channel: str, stop: asyncio.Event):
+        self.channel = channel
+        self.stop = stop
+        self.tasks: set[asyncio.Task] = set()
+
+
+async def _finish(tasks) -> None:
+    tasks = [t for t in tasks if not t.done()]
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=STOP_GRACE_SEC)
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class SubscriptionRegistry:
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._counts: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, guid: object) -> bool:
+        return guid in self._entries
+
+    def get(self, guid: str | None) -> asyncio.Event | None:
+        e = self._entries.get(guid)
+        return e.stop if e is not None else None
+
+    def counts(self) -> dict[str, int]:
+        return {ch: n for ch, n in self._counts.items() if n}
+
+    def tasks(self) -> int:
+        return sum(len(e.tasks) for e in self._entries.values())
+
+    async def add(self, guid: str, channel: str, stop: asyncio.Event) -> None:
+        # тот же guid повторно — прежняя подписка снимается полностью
+        await self.remove(guid)
+        self._entries[guid] = _Entry(channel, stop)
+        self._counts[channel] = self._counts.get(channel, 0) + 1
+        WS_SUBSCRIPTIONS.labels(channel).inc()
+
+    def spawn(self, guid: str, stop: asyncio.Event, coro: Coroutine) -> asyncio.Task | None:
+        e = self._entries.get(guid)
+        if e is None or e.stop is not stop or stop.is_set():
+            # подписку уже сняли, пока обработчик готовил запуск
+            coro.close()
+            return None
+        task = asyncio.create_task(coro)
+        e.tasks.add(task)
+        task.add_done_callback(e.tasks.discard)
+        return task
+
+    def _pop(self, guid: str) -> _Entry | None:
+        e = self._entries.pop(guid, None)
+        if e is None:
+            return None
+        self._counts[e.channel] -= 1
+        WS_SUBSCRIPTIONS.labels(e.channel).dec()
+        e.stop.set()
+        return e
+
+    async def remove(self, guid: str | None, stop: asyncio.Event | None = None) -> bool:
+        # stop задан — снимаем, только если guid еще принадлежит этой подписке
+        e = self._entries.get(guid)
+        if e is None or (stop is not None and e.stop is not stop):
+            return False
+        self._pop(guid)
+        await _finish(e.tasks)
+        return True
+
+    async def close_all(self) -> None:
+        entries = [self._pop(guid) for guid in list(self._entries)]
+        await _finish([t for e in entries for t in e.tasks])
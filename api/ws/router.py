@@ -1,6 +1,7 @@
 from typing import List
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from common import codec
 from .common import WSContext
 from .control import handle_control_opcode
 from .market import handle_market_opcode
@@ -21,7 +22,7 @@ async def ws_stream(ws: WebSocket):
     try:
         while True:
             try:
-                msg = await ws.receive_json()
+                msg = codec.loads(await ws.receive_text())
             except (WebSocketDisconnect, RuntimeError):
                 break
             except Exception:
@@ -0,0 +1,187 @@
+import random
+
+# Детерминированные фреймы в формате OKX: один и тот же seed — одни и те же данные,
+# поэтому результаты разных прогонов сравнимы.
+SEED = 20240601
+
+
+def _px(v: float) -> str:
+    return f"{v:.1f}"
+
+
+def book_frames(levels: int = 400, updates: int = 1000, seed: int = SEED) -> list[dict]:
+    rnd = random.Random(seed)
+    mid = 65000.0
+    frames = [
+        {
+            "action": "snapshot",
+            "ts": "1717200000000",
+            "bids": [[_px(mid - 0.1 * (i + 1)), f"{rnd.uniform(0.01, 5):.4f}", "0", "1"] for i in range(levels)],
+            "asks": [[_px(mid + 0.1 * (i + 1)), f"{rnd.uniform(0.01, 5):.4f}", "0", "1"] for i in range(levels)],
+        }
+    ]
+    for n in range(updates):
+        bids = []
+        asks = []
+        for _ in range(rnd.randint(1, 6)):
+            lvl = rnd.randint(1, levels + 20)
+            # четверть изменений — удаление уровня
+            sz = "0" if rnd.random() < 0.25 else f"{rnd.uniform(0.01, 5):.4f}"
+            if rnd.random() < 0.5:
+                bids.append([_px(mid - 0.1 * lvl), sz, "0", "1"])
+            else:
+                asks.append([_px(mid + 0.1 * lvl), sz, "0", "1"])
+        frames.append(
+            {
+                "action": "update",
+                "ts": str(1717200000000 + (n + 1) * 10),
+                "bids": bids,
+                "asks": asks,
+            }
+        )
+    return frames
+
+
+def ticker_items(n: int = 1000, seed: int = SEED) -> list[dict]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        last = 65000 + rnd.uniform(-50, 50)
+        out.append(
+            {
+                "instType": "SPOT",
+                "instId": "BTC-USDT",
+                "last": _px(last),
+                "lastSz": f"{rnd.uniform(0.001, 1):.4f}",
+                "askPx": _px(last + 0.1),
+                "askSz": f"{rnd.uniform(0.01, 5):.4f}",
+                "bidPx": _px(last - 0.1),
+                "bidSz": f"{rnd.uniform(0.01, 5):.4f}",
+                "open24h": "64000.0",
+                "high24h": "66000.0",
+                "low24h": "63000.0",
+                "volCcy24h": "123456789.1",
+                "vol24h": "1900.5",
+                "ts": str(1717200000000 + i * 100),
+            }
+        )
+    return out
+
+
+def candle_rows(n: int = 1000, seed: int = SEED) -> list[list[str]]:
+    rnd = random.Random(seed)
+    out = []
+    px = 65000.0
+    for i in range(n):
+        o = px
+        c = px + rnd.uniform(-30, 30)
+        h = max(o, c) + rnd.uniform(0, 10)
+        l = min(o, c) - rnd.uniform(0, 10)
+        px = c
+        out.append(
+            [
+                str(1717200000000 + i * 60000),
+                _px(o),
+                _px(h),
+                _px(l),
+                _px(c),
+                f"{rnd.uniform(1, 50):.4f}",
+                f"{rnd.uniform(1e4, 1e6):.2f}",
+                f"{rnd.uniform(1e4, 1e6):.2f}",
+                "1",
+            ]
+        )
+    return out
+
+
+def order_items(n: int = 1000, seed: int = SEED) -> list[dict]:
+    rnd = random.Random(seed)
+    states = ["live", "partially_filled", "filled", "canceled"]
+    out = []
+    for i in range(n):
+        sz = rnd.uniform(0.001, 2)
+        out.append(
+            {
+                "instType": "SPOT",
+                "instId": rnd.choice(["BTC-USDT", "ETH-USDT", "SOL-USDT"]),
+                "ordId": str(600000000000000000 + i),
+                "clOrdId": f"{i:032x}",
+                "px": _px(65000 + rnd.uniform(-100, 100)),
+                "avgPx": "",
+                "sz": f"{sz:.4f}",
+                "fillSz": f"{sz * rnd.random():.4f}",
+                "ordType": rnd.choice(["limit", "market", "post_only", "ioc"]),
+                "side": rnd.choice(["buy", "sell"]),
+                "state": rnd.choice(states),
+                "tif": "",
+                "cTime": str(1717200000000 + i * 10),
+                "uTime": str(1717200000000 + i * 10 + 5),
+            }
+        )
+    return out
+
+
+def fill_items(n: int = 1000, seed: int = SEED) -> list[dict]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append(
+            {
+                "instType": "SPOT",
+                "instId": rnd.choice(["BTC-USDT", "ETH-USDT", "SOL-USDT"]),
+                "tradeId": str(100000 + i),
+                "ordId": str(600000000000000000 + i),
+                "side": rnd.choice(["buy", "sell"]),
+                "fillPx": _px(65000 + rnd.uniform(-100, 100)),
+                "fillSz": f"{rnd.uniform(0.001, 1):.4f}",
+                "fee": f"-{rnd.uniform(0.0001, 0.1):.6f}",
+                "feeCcy": "USDT",
+                "fillTime": str(1717200000000 + i * 10),
+            }
+        )
+    return out
+
+
+def instruments(n: int = 2000, seed: int = SEED) -> tuple[list[dict], dict[str, dict]]:
+    rnd = random.Random(seed)
+    quotes = ["USDT", "USDC", "BTC", "EUR"]
+    items = []
+    tickers: dict[str, dict] = {}
+    for i in range(n):
+        base = f"C{i:04d}"
+        quote = rnd.choice(quotes)
+        inst_type = rnd.choice(["SPOT", "SPOT", "SWAP", "FUTURES"])
+        symbol = f"{base}-{quote}" if inst_type == "SPOT" else f"{base}-{quote}-{inst_type}"
+        items.append(
+            {
+                "symbol": symbol,
+                "instType": inst_type,
+                "quoteCcy": quote,
+                "settleCcy": quote if inst_type != "SPOT" else None,
+                "tickSz": "0.01",
+                "lotSz": "0.0001",
+                "state": "live",
+                "type": "CRYPTO",
+                "description": f"{base}/{quote}",
+            }
+        )
+        if rnd.random() < 0.9:
+            last = rnd.uniform(0.01, 70000)
+            tickers[symbol] = {
+                "last": last,
+                "open24h": last * rnd.uniform(0.9, 1.1),
+                "high24h": last * 1.1,
+                "low24h": last * 0.9,
+                "vol24h": rnd.uniform(0, 1e6),
+            }
+    return items, tickers
+
+
+HYPERION_FILTERS = [
+    {"currencyInformation": {"nominal": {"contains": "USD"}}},
+    {"tradingDetails": {"price": {"gte": 1}}},
+]
+HYPERION_ORDER = [
+    {"tradingDetails": {"tradeVolume": "DESC"}},
+    {"basicInformation": {"symbol": "ASC"}},
+]
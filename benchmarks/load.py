@@ -0,0 +1,451 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+import uuid
+
+import httpx
+import websockets
+
+from common.metrics import Registry
+
+# Нагрузочный прогон шлюза: много терминалов Astras на /ws и /cws одновременно.
+# Шлюз запускается отдельно (лучше против симулятора okx_sim), харнесс только
+# подключается к нему и снимает /metrics до и после прогона.
+
+SUB_KINDS = ("book", "book_inc", "quotes", "bars", "orders", "trades", "positions", "summaries")
+DEFAULT_MIX = "book=30,book_inc=10,quotes=25,bars=10,orders=10,trades=5,positions=5,summaries=5"
+
+PORTFOLIO_OPCODES = {
+    "orders": "OrdersGetAndSubscribeV2",
+    "trades": "TradesGetAndSubscribeV2",
+    "positions": "PositionsGetAndSubscribeV2",
+    "summaries": "SummariesGetAndSubscribeV2",
+}
+
+_METRIC_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)$')
+
+
+def parse_mix(spec: str) -> list[tuple[str, float]]:
+    out = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SUB_KINDS:
+            raise ValueError(f"неизвестный тип подписки: {name}")
+        out.append((name, float(weight or 1)))
+    if not out:
+        raise ValueError("пустой --mix")
+    return out
+
+
+def subscribe_message(kind: str, symbol: str, args, guid: str) -> dict:
+    base = {"guid": guid, "token": args.token, "exchange": "OKX"}
+    if kind in ("book", "book_inc"):
+        msg = {"opcode": "OrderBookGetAndSubscribe", "code": symbol, "depth": args.depth, "format": "slim"}
+        if kind == "book_inc":
+            msg["incremental"] = True
+        return {**base, **msg}
+    if kind == "quotes":
+        return {**base, "opcode": "QuotesSubscribe", "code": symbol, "format": "simple"}
+    if kind == "bars":
+        return {
+            **base,
+            "opcode": "BarsGetAndSubscribe",
+            "code": symbol,
+            "tf": "60",
+            "from": int(time.time()) - 600,
+            "skipHistory": True,
+            "format": "simple",
+        }
+    return {
+        **base,
+        "opcode": PORTFOLIO_OPCODES[kind],
+        "portfolio": args.portfolio,
+        "instrumentGroup": "SPOT",
+        "skipHistory": True,
+        "format": "simple",
+    }
+
+
+class Stats:
+    def __init__(self, late_ms: float):
+        self.late_ms = late_ms
+        self.reg = Registry()
+        self.fanout = self.reg.histogram("fanout", "", ("kind",))
+        self.sub_ack = self.reg.histogram("sub_ack", "", ("kind",))
+        self.order_ack = self.reg.histogram("order_ack", "", ("opcode",))
+        self.connect = self.reg.histogram("connect", "", ("endpoint",))
+        self.messages = self.reg.counter("messages", "", ("kind",))
+        self.late = self.reg.counter("late", "", ("kind",))
+        self.gaps = self.reg.counter("gaps", "", ("kind",))
+        self.errors = self.reg.counter("errors", "", ("where",))
+        self.connected = 0
+        self.measuring = False
+
+
+async def _connect(url: str, stats: Stats, endpoint: str):
+    t0 = time.perf_counter()
+    ws = await websockets.connect(url, max_size=None, ping_interval=None, open_timeout=30)
+    stats.connect.labels(endpoint).observe(time.perf_counter() - t0)
+    return ws
+
+
+async def ws_client(url: str, kind: str, symbol: str, args, stats: Stats, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            ws = await _connect(url, stats, "ws")
+        except Exception:
+            stats.errors.labels("ws_connect").inc()
+            await asyncio.sleep(1.0)
+            continue
+        stats.connected += 1
+        try:
+            guid = str(uuid.uuid4())
+            t_sub = time.perf_counter()
+            await ws.send(json.dumps(subscribe_message(kind, symbol, args, guid)))
+            acked = False
+            last_seq = None
+            while not stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), 1.0)
+                except asyncio.TimeoutError:
+                    continue
+                now_ms = time.time() * 1000.0
+                msg = json.loads(raw)
+                if "httpCode" in msg:
+                    if msg.get("httpCode") == 200 and not acked:
+                        acked = True
+                        stats.sub_ack.labels(kind).observe(time.perf_counter() - t_sub)
+                    elif msg.get("httpCode") != 200:
+                        stats.errors.labels(f"sub_{kind}").inc()
+                    continue
+                data = msg.get("data")
+                if not stats.measuring or not isinstance(data, dict):
+                    continue
+                stats.messages.labels(kind).inc()
+                if kind in ("book", "book_inc"):
+                    ts = data.get("t") or 0
+                    if ts:
+                        lat = max(0.0, now_ms - ts)
+                        stats.fanout.labels(kind).observe(lat / 1000.0)
+                        if lat > stats.late_ms:
+                            stats.late.labels(kind).inc()
+                    seq = data.get("s")
+                    if seq is not None:
+                        if last_seq is not None and seq > last_seq + 1:
+                            stats.gaps.labels(kind).inc(seq - last_seq - 1)
+                        last_seq = seq
+        except websockets.ConnectionClosed:
+            stats.errors.labels("ws_closed").inc()
+        except Exception:
+            stats.errors.labels("ws_client").inc()
+        finally:
+            stats.connected -= 1
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+
+async def _request(ws, msg: dict, timeout: float) -> dict:
+    await ws.send(json.dumps(msg))
+    deadline = time.monotonic() + timeout
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise asyncio.TimeoutError
+        resp = json.loads(await asyncio.wait_for(ws.recv(), left))
+        if resp.get("requestGuid") == msg["guid"]:
+            return resp
+
+
+async def cws_client(url: str, symbol: str, args, stats: Stats, stop: asyncio.Event) -> None:
+    # цикл create:limit далеко от рынка -> delete:limit, чтобы заявки не исполнялись
+    interval = 1.0 / args.order_rate if args.order_rate > 0 else 0.0
+    while not stop.is_set():
+        try:
+            ws = await _connect(url, stats, "cws")
+        except Exception:
+            stats.errors.labels("cws_connect").inc()
+            await asyncio.sleep(1.0)
+            continue
+        stats.connected += 1
+        try:
+            while not stop.is_set():
+                create = {
+                    "opcode": "create:limit",
+                    "guid": str(uuid.uuid4()),
+                    "token": args.token,
+                    "side": "buy",
+                    "quantity": args.order_qty,
+                    "price": args.order_price,
+                    "instrument": {"symbol": symbol, "exchange": "OKX", "instrumentGroup": "SPOT"},
+                    "user": {"portfolio": args.portfolio},
+                }
+                t0 = time.perf_counter()
+                resp = await _request(ws, create, args.order_timeout)
+                if stats.measuring:
+                    stats.order_ack.labels("create:limit").observe(time.perf_counter() - t0)
+                if resp.get("httpCode") != 200:
+                    stats.errors.labels("create").inc()
+                    break
+                delete = {
+                    "opcode": "delete:limit",
+                    "guid": str(uuid.uuid4()),
+                    "token": args.token,
+                    "orderId": resp.get("orderNumber"),
+                    "exchange": "OKX",
+                    "portfolio": args.portfolio,
+                }
+                t0 = time.perf_counter()
+                resp = await _request(ws, delete, args.order_timeout)
+                if stats.measuring:
+                    stats.order_ack.labels("delete:limit").observe(time.perf_counter() - t0)
+                if resp.get("httpCode") != 200:
+                    stats.errors.labels("delete").inc()
+                    break
+                if interval:
+                    await asyncio.sleep(interval * random.uniform(0.5, 1.5))
+        except asyncio.TimeoutError:
+            stats.errors.labels("cws_timeout").inc()
+        except websockets.ConnectionClosed:
+            stats.errors.labels("cws_closed").inc()
+        except Exception:
+            stats.errors.labels("cws_client").inc()
+        finally:
+            stats.connected -= 1
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+
+def parse_metrics(text: str) -> dict[tuple[str, str], float]:
+    out: dict[tuple[str, str], float] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        m = _METRIC_LINE.match(line)
+        if m is None:
+            continue
+        try:
+            out[(m.group(1), m.group(2) or "")] = float(m.group(3))
+        except ValueError:
+            pass
+    return out
+
+
+def _bucket_quantile(before: dict, after: dict, name: str, q: float) -> float | None:
+    # квантиль по приращению кумулятивных бакетов гистограммы за время прогона
+    buckets = []
+    for (n, labels), v in after.items():
+        if n != f"{name}_bucket":
+            continue
+        le = re.search(r'le="([^"]+)"', labels)
+        if le is None:
+            continue
+        bound = float("inf") if le.group(1) == "+Inf" else float(le.group(1))
+        buckets.append((bound, v - before.get((n, labels), 0.0)))
+    buckets.sort()
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    for bound, acc in buckets:
+        if acc >= rank:
+            return bound
+    return None
+
+
+async def scrape(client: httpx.AsyncClient, base: str) -> dict[tuple[str, str], float] | None:
+    try:
+        r = await client.get(f"{base}/metrics", timeout=10.0)
+        r.raise_for_status()
+        return parse_metrics(r.text)
+    except Exception:
+        return None
+
+
+def _hist_summary(h) -> dict:
+    out = {}
+    for key, child in h.children():
+        if not child.count:
+            continue
+        out["/".join(key)] = {
+            "count": child.count,
+            "p50_ms": round(child.quantile(0.5) * 1000, 3),
+            "p90_ms": round(child.quantile(0.9) * 1000, 3),
+            "p99_ms": round(child.quantile(0.99) * 1000, 3),
+            "p999_ms": round(child.quantile(0.999) * 1000, 3),
+            "max_ms": round(child.max * 1000, 3),
+        }
+    return out
+
+
+def _counter_summary(c) -> dict:
+    return {"/".join(key): child.value for key, child in c.children()}
+
+
+def gateway_summary(before: dict | None, after: dict | None, wall: float) -> dict:
+    if not before or not after:
+        return {}
+    cpu_key = ("gateway_process", '{stat="cpu_seconds"}')
+    rss_key = ("gateway_process", '{stat="rss_bytes"}')
+    out: dict = {}
+    if cpu_key in before and cpu_key in after and wall > 0:
+        out["cpu_cores"] = round((after[cpu_key] - before[cpu_key]) / wall, 3)
+    if rss_key in after:
+        out["rss_mb"] = round(after[rss_key] / 2**20, 1)
+        if rss_key in before:
+            out["rss_growth_mb"] = round((after[rss_key] - before[rss_key]) / 2**20, 1)
+    for name, q in (("p50", 0.5), ("p99", 0.99), ("p999", 0.999)):
+        v = _bucket_quantile(before, after, "event_loop_lag_seconds", q)
+        if v is not None:
+            out[f"loop_lag_{name}_ms"] = round(v * 1000, 3)
+    return out
+
+
+def report(stats: Stats, gw: dict, wall: float, args) -> dict:
+    msgs = _counter_summary(stats.messages)
+    total = sum(msgs.values())
+    rate = total / wall if wall > 0 else 0.0
+    res = {
+        "meta": {
+            "url": args.url,
+            "clients": args.clients,
+            "cws_clients": args.cws_clients,
+            "mix": args.mix,
+            "symbols": args.symbols,
+            "duration": round(wall, 2),
+            "late_ms": args.late_ms,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "messages": msgs,
+        "messages_per_sec": round(rate, 1),
+        "fanout_latency": _hist_summary(stats.fanout),
+        "late": _counter_summary(stats.late),
+        "seq_gaps": _counter_summary(stats.gaps),
+        "subscribe_ack": _hist_summary(stats.sub_ack),
+        "order_ack": _hist_summary(stats.order_ack),
+        "connect": _hist_summary(stats.connect),
+        "errors": _counter_summary(stats.errors),
+        "gateway": gw,
+    }
+    if gw.get("cpu_cores"):
+        res["messages_per_sec_per_core"] = round(rate / gw["cpu_cores"], 1)
+    return res
+
+
+def print_report(res: dict) -> None:
+    print()
+    print(f"клиентов: {res['meta']['clients']} /ws, {res['meta']['cws_clients']} /cws; "
+          f"окно замера {res['meta']['duration']} с")
+    print(f"сообщений: {sum(res['messages'].values())} ({res['messages_per_sec']}/с)")
+    for k, v in sorted(res["messages"].items()):
+        print(f"  {k:12s} {v:12.0f}")
+    for title, key in (("fan-out (now - t)", "fanout_latency"), ("ack подписки", "subscribe_ack"),
+                       ("ack заявок", "order_ack"), ("подключение", "connect")):
+        if not res[key]:
+            continue
+        print(f"{title}:")
+        for k, h in sorted(res[key].items()):
+            print(f"  {k:14s} n={h['count']:<9d} p50={h['p50_ms']:9.3f} p90={h['p90_ms']:9.3f} "
+                  f"p99={h['p99_ms']:9.3f} max={h['max_ms']:9.3f} ms")
+    if res["late"]:
+        print(f"опоздавших (> {res['meta']['late_ms']} мс): {res['late']}")
+    if res["seq_gaps"]:
+        print(f"пропусков по seq: {res['seq_gaps']}")
+    if res["errors"]:
+        print(f"ошибок: {res['errors']}")
+    if res["gateway"]:
+        print(f"шлюз: {res['gateway']}")
+    if "messages_per_sec_per_core" in res:
+        print(f"сообщений/с на ядро: {res['messages_per_sec_per_core']}")
+
+
+async def run(args) -> dict:
+    base = args.url.rstrip("/")
+    ws_base = "ws" + base[4:] if base.startswith("http") else base
+    mix = parse_mix(args.mix)
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    rnd = random.Random(args.seed)
+    stats = Stats(args.late_ms)
+    stop = asyncio.Event()
+    tasks = []
+    gap = 1.0 / args.ramp_rate if args.ramp_rate > 0 else 0.0
+
+    async with httpx.AsyncClient() as http:
+        kinds = [k for k, _ in mix]
+        weights = [w for _, w in mix]
+        print(f"подключаем {args.clients} /ws и {args.cws_clients} /cws ...", flush=True)
+        for i in range(args.clients + args.cws_clients):
+            symbol = rnd.choice(symbols)
+            if i < args.clients:
+                kind = rnd.choices(kinds, weights)[0]
+                tasks.append(asyncio.create_task(ws_client(f"{ws_base}/ws", kind, symbol, args, stats, stop)))
+            else:
+                tasks.append(asyncio.create_task(cws_client(f"{ws_base}/cws", symbol, args, stats, stop)))
+            if gap:
+                await asyncio.sleep(gap)
+        await asyncio.sleep(args.warmup)
+        print(f"подключено: {stats.connected}; замер {args.duration} с", flush=True)
+
+        before = await scrape(http, base)
+        stats.measuring = True
+        t0 = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        wall = time.perf_counter() - t0
+        stats.measuring = False
+        after = await scrape(http, base)
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return report(stats, gateway_summary(before, after, wall), wall, args)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Нагрузочный прогон шлюза: много терминалов Astras на /ws и /cws")
+    p.add_argument("--url", default="http://127.0.0.1:8000", help="адрес шлюза")
+    p.add_argument("--clients", type=int, default=1000, help="число подключений /ws")
+    p.add_argument("--cws-clients", type=int, default=10, help="число подключений /cws")
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"веса подписок, типы: {', '.join(SUB_KINDS)}")
+    p.add_argument("--symbols", default="BTC-USDT,ETH-USDT,SOL-USDT")
+    p.add_argument("--depth", type=int, default=20)
+    p.add_argument("--duration", type=float, default=60.0, help="длительность замера, сек")
+    p.add_argument("--warmup", type=float, default=5.0, help="пауза после подключения всех клиентов, сек")
+    p.add_argument("--ramp-rate", type=float, default=200.0, help="новых подключений в секунду (0 — сразу все)")
+    p.add_argument("--late-ms", type=float, default=250.0, help="порог опоздания обновления стакана, мс")
+    p.add_argument("--order-rate", type=float, default=1.0, help="пар create/delete в секунду на клиента /cws")
+    p.add_argument("--order-price", type=float, default=1000.0, help="цена лимитной покупки (далеко от рынка)")
+    p.add_argument("--order-qty", type=float, default=0.001)
+    p.add_argument("--order-timeout", type=float, default=10.0)
+    p.add_argument("--portfolio", default="LOAD")
+    p.add_argument("--token", default="load")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--json", metavar="FILE", help="сохранить отчет в JSON")
+    args = p.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    res = asyncio.run(run(args))
+    print_report(res)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nотчет сохранен: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
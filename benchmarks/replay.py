@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from adapters.okx import OkxReplayAdapter
+from adapters.okx.telemetry import WS_PARSE
+
+# Прогон записанного трафика OKX через настоящие subscribe_* (разбор и сборка
+# стакана) без шлюза и клиентов: пропускная способность разбора на реальных фреймах
+# и проверка стаканов на пересечение bid/ask. Для fan-out — шлюз с ADAPTER=replay
+# и benchmarks.load.
+
+MARKET_CHANNELS = ("books", "tickers")
+
+
+async def run(path: str, speed: float, channels: tuple[str, ...]) -> dict:
+    a = OkxReplayAdapter(path, speed, api_key="replay", api_secret="replay", api_passphrase="replay")
+    counts: dict[str, int] = {}
+    crossed: dict[str, int] = {}
+    stop = asyncio.Event()
+    tasks = []
+
+    def on_book(book: dict) -> None:
+        counts["books"] = counts.get("books", 0) + 1
+        bids = book.get("bids") or []
+        asks = book.get("asks") or []
+        if bids and asks and bids[0][0] >= asks[0][0]:
+            sym = book.get("symbol") or ""
+            crossed[sym] = crossed.get(sym, 0) + 1
+
+    def on_ticker(_t: dict) -> None:
+        counts["tickers"] = counts.get("tickers", 0) + 1
+
+    for arg in a.replay_feed.args():
+        ch = arg.get("channel")
+        if ch not in channels or ch not in MARKET_CHANNELS:
+            continue
+        inst_id = arg.get("instId")
+        if ch == "books":
+            coro = a.subscribe_order_book(symbol=inst_id, depth=0, on_data=on_book, stop_event=stop)
+        else:
+            coro = a.subscribe_quotes(symbol=inst_id, on_data=on_ticker, stop_event=stop)
+        tasks.append(asyncio.create_task(coro))
+
+    t0 = time.perf_counter()
+    await asyncio.sleep(0)
+    await a.replay_feed.wait_drained()
+    while a.replay_pending():
+        await asyncio.sleep(0.001)
+    wall = time.perf_counter() - t0
+    stop.set()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    parse = {}
+    for (ch,), child in WS_PARSE.children():
+        if child.count:
+            parse[ch] = {
+                "frames": child.count,
+                "p50_us": round(child.quantile(0.5) * 1e6, 1),
+                "p99_us": round(child.quantile(0.99) * 1e6, 1),
+                "max_us": round(child.max * 1e6, 1),
+            }
+    return {"wall_sec": wall, "items": counts, "parse": parse, "crossed_books": crossed}
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Воспроизведение записанных фреймов OKX через разбор адаптера")
+    p.add_argument("path", help="каталог сегментов, файл или glob")
+    p.add_argument("--speed", type=float, default=0.0, help="1 — реальное время, N — в N раз быстрее, 0 — без пауз")
+    p.add_argument("--channels", default=",".join(MARKET_CHANNELS))
+    args = p.parse_args(argv)
+
+    channels = tuple(c.strip() for c in args.channels.split(",") if c.strip())
+    res = asyncio.run(run(args.path, args.speed, channels))
+    wall = res["wall_sec"]
+    print(f"время: {wall:.3f} с")
+    for ch, n in sorted(res["items"].items()):
+        print(f"  {ch:10s} {n:10d} обновлений {n / wall if wall else 0:12.0f}/с")
+    for ch, st in sorted(res["parse"].items()):
+        print(f"  разбор {ch:10s} фреймов={st['frames']} p50={st['p50_us']} мкс p99={st['p99_us']} мкс max={st['max_us']} мкс")
+    if res["crossed_books"]:
+        print(f"пересеченные стаканы (bid >= ask): {res['crossed_books']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
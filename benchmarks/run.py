@@ -0,0 +1,252 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from adapters.okx import OkxAdapter
+from adapters.okx.ticks import TickScale
+from api import astras
+from api import hyperion
+from benchmarks import fixtures
+
+# Кейс: имя -> (функция одного прогона, число операций в прогоне)
+Case = tuple[Callable[[], object], int]
+
+
+def _book_cases(a: OkxAdapter) -> dict[str, Case]:
+    frames = fixtures.book_frames()
+    scale = TickScale.from_steps("0.1", "0.0001")
+
+    def apply_only():
+        bids: dict[int, int] = {}
+        asks: dict[int, int] = {}
+        for f in frames:
+            if f["action"] == "snapshot":
+                bids.clear()
+                asks.clear()
+            a._apply_okx_book_delta(bids, f["bids"], scale)
+            a._apply_okx_book_delta(asks, f["asks"], scale)
+
+    def apply_and_rebuild():
+        bids: dict[int, int] = {}
+        asks: dict[int, int] = {}
+        for f in frames:
+            is_snapshot = f["action"] == "snapshot"
+            if is_snapshot:
+                bids.clear()
+                asks.clear()
+            a._apply_okx_book_delta(bids, f["bids"], scale)
+            a._apply_okx_book_delta(asks, f["asks"], scale)
+            a._build_okx_book("BTC-USDT", a._to_int(f["ts"]), bids, asks, is_snapshot, scale)
+
+    return {
+        "book.apply_delta": (apply_only, len(frames)),
+        "book.apply_delta_rebuild": (apply_and_rebuild, len(frames)),
+    }
+
+
+def _parser_cases(a: OkxAdapter) -> dict[str, Case]:
+    tickers = fixtures.ticker_items()
+    candles = fixtures.candle_rows()
+    orders = fixtures.order_items()
+    fills = fixtures.fill_items()
+    return {
+        "parse.ticker": (lambda: [a._parse_okx_ticker_any("BTC-USDT", t) for t in tickers], len(tickers)),
+        "parse.candle": (
+            lambda: [a._parse_okx_candle_any("BTC-USDT", c, inst_type="SPOT") for c in candles],
+            len(candles),
+        ),
+        "parse.tickers_bulk": (lambda: a._parse_okx_tickers_bulk(tickers).rows(), len(tickers)),
+        "parse.candles_bulk": (
+            lambda: a._parse_okx_candles_bulk("BTC-USDT", candles, inst_type="SPOT").rows(),
+            len(candles),
+        ),
+        "parse.order": (lambda: [a._parse_okx_order_any(o) for o in orders], len(orders)),
+        "parse.trade": (
+            lambda: [a._parse_okx_trade_any(f, is_history=False, inst_type="SPOT") for f in fills],
+            len(fills),
+        ),
+    }
+
+
+def _astras_cases(a: OkxAdapter) -> dict[str, Case]:
+    neutral = [a._parse_okx_order_any(o) for o in fixtures.order_items()]
+    return {
+        "astras.order_simple": (
+            lambda: [
+                astras.astras_order_simple_from_okx_neutral(o, exchange="OKX", portfolio="P1", existing=False)
+                for o in neutral
+            ],
+            len(neutral),
+        ),
+    }
+
+
+def _hyperion_cases() -> dict[str, Case]:
+    items, tickers = fixtures.instruments()
+    page = items[:500]
+    return {
+        "hyperion.filter_sort": (
+            lambda: hyperion._filter_and_sort(
+                list(items),
+                fixtures.HYPERION_FILTERS,
+                fixtures.HYPERION_ORDER,
+                tickers,
+            ),
+            1,
+        ),
+        "hyperion.make_node": (lambda: [hyperion._make_node(x, tickers) for x in page], len(page)),
+    }
+
+
+def build_cases() -> dict[str, Case]:
+    a = OkxAdapter()
+    cases: dict[str, Case] = {}
+    cases.update(_book_cases(a))
+    cases.update(_parser_cases(a))
+    cases.update(_astras_cases(a))
+    cases.update(_hyperion_cases())
+    return cases
+
+
+def _measure_time(fn: Callable[[], object], ops: int, min_time: float, repeats: int) -> list[float]:
+    fn()
+    out = []
+    for _ in range(repeats):
+        loops = 0
+        t0 = time.perf_counter()
+        while True:
+            fn()
+            loops += 1
+            dt = time.perf_counter() - t0
+            if dt >= min_time:
+                break
+        out.append(dt / (loops * ops) * 1e9)
+    return out
+
+
+def _measure_alloc(fn: Callable[[], object], ops: int) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return (peak - base) / ops, (current - base) / ops
+
+
+def run(selected: dict[str, Case], min_time: float, repeats: int) -> dict:
+    results = {}
+    for name, (fn, ops) in selected.items():
+        samples = _measure_time(fn, ops, min_time, repeats)
+        peak_b, kept_b = _measure_alloc(fn, ops)
+        med = statistics.median(samples)
+        results[name] = {
+            "ns_per_op": round(med, 1),
+            "ns_per_op_min": round(min(samples), 1),
+            "ops_per_sec": round(1e9 / med, 1) if med else None,
+            "peak_bytes_per_op": round(peak_b, 1),
+            "result_bytes_per_op": round(kept_b, 1),
+        }
+        print(
+            f"{name:28s} {med:12.1f} ns/op {1e9 / med:14.0f} ops/s {peak_b:12.1f} B/op peak",
+            flush=True,
+        )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "seed": fixtures.SEED,
+            "min_time": min_time,
+            "repeats": repeats,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    base_res = baseline.get("results") or {}
+    print()
+    print(f"{'case':28s} {'ns/op':>12s} {'base':>12s} {'delta':>8s} {'B/op':>10s} {'base':>10s}")
+    for name, cur in (current.get("results") or {}).items():
+        base = base_res.get(name)
+        if base is None:
+            print(f"{name:28s} {cur['ns_per_op']:12.1f} {'—':>12s}")
+            continue
+        d_t = cur["ns_per_op"] / base["ns_per_op"] - 1.0 if base["ns_per_op"] else 0.0
+        base_b = base.get("peak_bytes_per_op") or 0.0
+        d_b = cur["peak_bytes_per_op"] / base_b - 1.0 if base_b else 0.0
+        flag = ""
+        if d_t > threshold:
+            flag += " SLOWER"
+            regressions.append(f"{name}: ns/op {base['ns_per_op']} -> {cur['ns_per_op']} ({d_t:+.1%})")
+        if d_b > threshold:
+            flag += " MORE-ALLOC"
+            regressions.append(
+                f"{name}: peak B/op {base_b} -> {cur['peak_bytes_per_op']} ({d_b:+.1%})"
+            )
+        print(
+            f"{name:28s} {cur['ns_per_op']:12.1f} {base['ns_per_op']:12.1f} {d_t:+8.1%} "
+            f"{cur['peak_bytes_per_op']:10.1f} {base_b:10.1f}{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Микробенчмарки горячих путей адаптера OKX")
+    p.add_argument("-k", "--filter", default="", help="запускать только кейсы, содержащие подстроку")
+    p.add_argument("--min-time", type=float, default=0.2, help="минимальное время одного замера, сек")
+    p.add_argument("--repeats", type=int, default=5)
+    p.add_argument("--save", metavar="FILE", help="сохранить результаты как baseline (JSON)")
+    p.add_argument("--compare", metavar="FILE", help="сравнить с baseline и вернуть 1 при регрессии")
+    p.add_argument("--threshold", type=float, default=0.10, help="допустимое ухудшение, доля (0.10 = 10%%)")
+    p.add_argument("--list", action="store_true", help="показать кейсы и выйти")
+    args = p.parse_args(argv)
+
+    cases = build_cases()
+    if args.list:
+        for name, (_, ops) in cases.items():
+            print(f"{name} ({ops} ops)")
+        return 0
+
+    selected = {k: v for k, v in cases.items() if args.filter in k}
+    if not selected:
+        print(f"Нет кейсов для фильтра {args.filter!r}", file=sys.stderr)
+        return 2
+
+    current = run(selected, args.min_time, args.repeats)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nbaseline сохранен: {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("\nРегрессии:")
+            for r in regressions:
+                print(f"  {r}")
+            return 1
+        print("\nРегрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
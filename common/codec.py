@@ -0,0 +1,62 @@
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # записи адаптера (adapters.okx.records) и прочие объекты с to_dict
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def _stdlib_loads(data: str | bytes | bytearray | memoryview) -> Any:
+    if not isinstance(data, str):
+        data = bytes(data).decode("utf-8")
+    return _decoder.decode(data)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return _encoder.encode(obj)
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:
+    return _encoder.encode(obj).encode("utf-8")
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def _orjson_loads(data: str | bytes | bytearray | memoryview) -> Any:
+        return orjson.loads(data)
+
+    def _orjson_dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+
+    def _orjson_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS).decode("utf-8")
+
+
+def configure(requested: str | None = None) -> str:
+    # вызывается из api.core после load_dotenv: JSON_CODEC из .env учитывается,
+    # даже если модуль импортирован раньше; вызывающие берут codec.loads/dumps через модуль
+    global BACKEND, loads, dumps, dumps_bytes
+    name = (requested or "auto").strip().lower()
+    if orjson is not None and name in ("auto", "orjson"):
+        BACKEND, loads, dumps, dumps_bytes = "orjson", _orjson_loads, _orjson_dumps, _orjson_dumps_bytes
+    else:
+        BACKEND, loads, dumps, dumps_bytes = "stdlib", _stdlib_loads, _stdlib_dumps, _stdlib_dumps_bytes
+    return BACKEND
+
+
+configure(os.getenv("JSON_CODEC"))
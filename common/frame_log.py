@@ -0,0 +1,151 @@
+import glob
+import gzip
+import itertools
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Iterator
+
+from common import codec
+from common.metrics import REGISTRY
+
+# Запись сырых фреймов WS в сжатые append-only сегменты: одна строка JSON на фрейм
+# {"t": время приема, "s": номер сессии, "k": тип сокета, "d": "in"|"out", "f": текст}.
+# Пишет отдельный поток; очередь ограничена, при отставании диска фреймы
+# отбрасываются и считаются в метрике, а не тормозят event loop.
+
+FRAMES_RECORDED = REGISTRY.counter(
+    "frame_log_frames_total",
+    "Raw WS frames written to the frame log",
+    ("kind",),
+)
+FRAMES_DROPPED = REGISTRY.counter(
+    "frame_log_dropped_total",
+    "Raw WS frames dropped because the frame log writer fell behind",
+)
+
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class FrameRecorder:
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        segment_sec: float = 3600.0,
+        max_pending: int = 100_000,
+        prefix: str = "okx",
+    ):
+        self.directory = directory
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.segment_sec = float(segment_sec)
+        self.prefix = prefix
+        os.makedirs(directory, exist_ok=True)
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._sessions = itertools.count(1)
+        self._segment_no = itertools.count(1)
+        self._raw = None
+        self._gz = None
+        self._opened_at = 0.0
+        self._thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+        self._thread.start()
+
+    def new_session(self) -> int:
+        return next(self._sessions)
+
+    def record(self, session: int, kind: str, direction: str, frame: Any, ts: float | None = None) -> None:
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            frame = bytes(frame).decode("utf-8", "replace")
+        try:
+            self._q.put_nowait((time.time() if ts is None else ts, session, kind, direction, frame))
+        except queue.Full:
+            FRAMES_DROPPED.labels().inc()
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join(timeout=10.0)
+
+    def _open_segment(self) -> None:
+        name = f"{self.prefix}-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{next(self._segment_no):04d}"
+        self._raw = open(os.path.join(self.directory, name + SEGMENT_SUFFIX), "wb")
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        self._opened_at = time.monotonic()
+
+    def _close_segment(self) -> None:
+        if self._gz is not None:
+            self._gz.close()
+            self._raw.close()
+        self._gz = None
+        self._raw = None
+
+    def _write(self, item: tuple) -> None:
+        ts, session, kind, direction, frame = item
+        if self._gz is None:
+            self._open_segment()
+        line = codec.dumps({"t": ts, "s": session, "k": kind, "d": direction, "f": frame})
+        self._gz.write(line.encode("utf-8") + b"\n")
+        FRAMES_RECORDED.labels(kind).inc()
+        if self._raw.tell() >= self.segment_bytes or time.monotonic() - self._opened_at >= self.segment_sec:
+            self._close_segment()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._q.get(timeout=1.0)
+            except queue.Empty:
+                # сброс на диск в простое: оборванный сегмент читается до последнего flush
+                if self._gz is not None:
+                    self._gz.flush()
+                continue
+            if item is None:
+                break
+            try:
+                self._write(item)
+            except Exception:
+                FRAMES_DROPPED.labels().inc()
+        self._close_segment()
+
+
+class RecordingSocket:
+    # обертка над клиентским WS: пишет входящие фреймы и исходящие subscribe/unsubscribe
+    # (login не пишем — в нем ключ и подпись)
+    def __init__(self, ws, recorder: FrameRecorder, kind: str):
+        self._ws = ws
+        self._recorder = recorder
+        self._kind = kind
+        self._session = recorder.new_session()
+
+    async def recv(self):
+        raw = await self._ws.recv()
+        self._recorder.record(self._session, self._kind, "in", raw)
+        return raw
+
+    async def send(self, message):
+        if '"op":"login"' not in (message if isinstance(message, str) else ""):
+            self._recorder.record(self._session, self._kind, "out", message)
+        return await self._ws.send(message)
+
+    def __getattr__(self, name):
+        return getattr(self._ws, name)
+
+
+def segment_paths(path: str) -> list[str]:
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*" + SEGMENT_SUFFIX)))
+    if any(ch in path for ch in "*?["):
+        return sorted(glob.glob(path))
+    return [path]
+
+
+def read_frames(path: str) -> Iterator[dict]:
+    for p in segment_paths(path):
+        try:
+            with gzip.open(p, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        yield codec.loads(line)
+        except (EOFError, ValueError, zlib.error, gzip.BadGzipFile):
+            # хвост сегмента, оборванный при аварийной остановке
+            continue
@@ -0,0 +1,262 @@
+import abc
+import importlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from common import codec
+from common.metrics import REGISTRY
+from common.ttl_store import TtlStore
+
+# Хранилища ответов для повторных guid команд /cws. Ключи разложены по пространствам
+# имен (create_market, delete_limit, order_symbol, ...), значения — JSON-совместимые.
+# Горячий путь — всегда память процесса; долговечные бэкенды добавляют запись за ней.
+
+STORE_FLUSH = REGISTRY.histogram(
+    "idempotency_flush_seconds",
+    "Time to write one batch of idempotency records",
+)
+STORE_PENDING = REGISTRY.gauge(
+    "idempotency_pending_writes",
+    "Idempotency records waiting for the batched writer",
+)
+STORE_READ_THROUGH = REGISTRY.counter(
+    "idempotency_read_through_total",
+    "Front cache misses looked up in the durable idempotency store",
+    ("result",),
+)
+STORE_WRITE_ERRORS = REGISTRY.counter(
+    "idempotency_write_errors_total",
+    "Failed idempotency batch writes: retried, kept for the next batch (busy) or dropped",
+    ("outcome",),
+)
+
+# попытки записи одной пачки и пауза между ними (удваивается)
+WRITE_ATTEMPTS = 4
+WRITE_RETRY_SEC = 0.05
+# сколько записей держим до следующей пачки, пока база занята другим писателем
+MAX_CARRY = 100_000
+
+
+class IdempotencyBackend(abc.ABC):
+    # Интерфейс бэкенда. Сетевое хранилище (Redis и т.п.) реализует эти методы и
+    # подключается через IDEMPOTENCY_BACKEND=модуль:фабрика; get вызывается в event
+    # loop на каждую команду с checkDuplicates, поэтому сетевой реализации стоит
+    # держать перед собой MemoryBackend так же, как SqliteBackend.
+    @abc.abstractmethod
+    def get(self, ns: str, key: str) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def put(self, ns: str, key: str, value: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    def pop(self, ns: str, key: str) -> None:
+        ...
+
+    def expire(self, budget: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(IdempotencyBackend):
+    def __init__(self, ttl_sec: float, max_entries: int):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = int(max_entries)
+        self._stores: dict[str, TtlStore] = {}
+
+    def _store(self, ns: str) -> TtlStore:
+        store = self._stores.get(ns)
+        if store is None:
+            store = TtlStore(f"cws_{ns}", self.ttl_sec, self.max_entries)
+            self._stores[ns] = store
+        return store
+
+    def get(self, ns: str, key: str) -> Any:
+        return self._store(ns).get(key)
+
+    def put(self, ns: str, key: str, value: Any) -> None:
+        self._store(ns).put(key, value)
+
+    def pop(self, ns: str, key: str) -> None:
+        self._store(ns).pop(key)
+
+    def expire(self, budget: int) -> None:
+        for store in list(self._stores.values()):
+            store.expire(budget)
+
+
+class SqliteBackend(IdempotencyBackend):
+    # SQLite в режиме WAL, общий для воркеров на одной машине и переживающий рестарт.
+    # Запись — пачками из отдельного потока раз в flush_ms; чтение — сначала память,
+    # при промахе точечный SELECT по первичному ключу (в WAL читатели не ждут писателя).
+    def __init__(self, path: str, ttl_sec: float, max_entries: int, flush_ms: float = 20.0):
+        self.path = path
+        self.ttl_sec = float(ttl_sec)
+        self.flush_sec = max(0.001, float(flush_ms) / 1000.0)
+        self.front = MemoryBackend(ttl_sec, max_entries)
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._reader = self._connect()
+        self._reader.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS idempotency (
+                ns TEXT NOT NULL,
+                key TEXT NOT NULL,
+                ts REAL NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (ns, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idempotency_ts ON idempotency (ts);
+            """
+        )
+        self._q: queue.Queue = queue.Queue()
+        self._pending = STORE_PENDING.labels()
+        self._thread = threading.Thread(target=self._run, name="idempotency-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, ns: str, key: str) -> Any:
+        value = self.front.get(ns, key)
+        if value is not None:
+            return value
+        try:
+            row = self._reader.execute(
+                "SELECT ts, value FROM idempotency WHERE ns = ? AND key = ?",
+                (ns, key),
+            ).fetchone()
+        except sqlite3.Error:
+            STORE_READ_THROUGH.labels("error").inc()
+            return None
+        if row is None or time.time() - row[0] > self.ttl_sec:
+            STORE_READ_THROUGH.labels("miss").inc()
+            return None
+        STORE_READ_THROUGH.labels("hit").inc()
+        value = codec.loads(row[1])
+        self.front.put(ns, key, value)
+        return value
+
+    def put(self, ns: str, key: str, value: Any) -> None:
+        self.front.put(ns, key, value)
+        self._q.put(("put", ns, key, time.time(), codec.dumps(value)))
+        self._pending.inc()
+
+    def pop(self, ns: str, key: str) -> None:
+        self.front.pop(ns, key)
+        self._q.put(("pop", ns, key, 0.0, None))
+        self._pending.inc()
+
+    def expire(self, budget: int) -> None:
+        self.front.expire(budget)
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join(timeout=10.0)
+        try:
+            self._reader.close()
+        except Exception:
+            pass
+
+    def _write(self, conn: sqlite3.Connection, batch: list[tuple]) -> None:
+        t0 = time.perf_counter()
+        conn.execute("BEGIN")
+        try:
+            for op, ns, key, ts, value in batch:
+                if op == "put":
+                    conn.execute(
+                        "INSERT OR REPLACE INTO idempotency (ns, key, ts, value) VALUES (?, ?, ?, ?)",
+                        (ns, key, ts, value),
+                    )
+                else:
+                    conn.execute("DELETE FROM idempotency WHERE ns = ? AND key = ?", (ns, key))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        STORE_FLUSH.labels().observe(time.perf_counter() - t0)
+
+    @staticmethod
+    def _busy(e: sqlite3.Error) -> bool:
+        return getattr(e, "sqlite_errorcode", None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+    def _flush(self, conn: sqlite3.Connection, batch: list[tuple]) -> bool:
+        # False — пачку стоит повторить со следующей: база занята другим воркером
+        delay = WRITE_RETRY_SEC
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                self._write(conn, batch)
+                return True
+            except sqlite3.Error as e:
+                busy = self._busy(e)
+            if attempt + 1 < WRITE_ATTEMPTS:
+                STORE_WRITE_ERRORS.labels("retry").inc()
+                time.sleep(delay)
+                delay *= 2.0
+        if busy and len(batch) <= MAX_CARRY:
+            STORE_WRITE_ERRORS.labels("kept").inc()
+            return False
+        STORE_WRITE_ERRORS.labels("dropped").inc()
+        return True
+
+    def _run(self) -> None:
+        conn = self._connect()
+        last_purge = 0.0
+        stop = False
+        carry: list[tuple] = []
+        while not stop:
+            batch, carry = carry, []
+            try:
+                item = self._q.get(timeout=1.0)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                stop = True
+            elif item:
+                batch.append(item)
+                # окно накопления пачки
+                time.sleep(self.flush_sec)
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    continue
+                batch.append(item)
+            if batch:
+                if self._flush(conn, batch):
+                    self._pending.dec(len(batch))
+                elif stop:
+                    STORE_WRITE_ERRORS.labels("dropped").inc()
+                    self._pending.dec(len(batch))
+                else:
+                    carry = batch
+            now = time.time()
+            if now - last_purge >= 60.0:
+                last_purge = now
+                try:
+                    conn.execute("DELETE FROM idempotency WHERE ts < ?", (now - self.ttl_sec,))
+                except sqlite3.Error:
+                    pass
+        conn.close()
+
+
+def load_backend(spec: str, ttl_sec: float, max_entries: int) -> IdempotencyBackend:
+    # "package.module:factory" -> factory(ttl_sec=..., max_entries=...)
+    mod_name, _, attr = spec.partition(":")
+    if not mod_name or not attr:
+        raise RuntimeError(f"Некорректный бэкенд идемпотентности: {spec}")
+    factory = getattr(importlib.import_module(mod_name), attr)
+    return factory(ttl_sec=ttl_sec, max_entries=max_entries)
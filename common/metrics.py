@@ -0,0 +1,247 @@
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, Sequence
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+# Лог-линейные границы в духе HDR: sub_buckets интервалов на каждую октаву.
+def log_linear_bounds(lowest: float, highest: float, sub_buckets: int = 2) -> tuple[float, ...]:
+    out: list[float] = []
+    b = lowest
+    step = 2.0 ** (1.0 / sub_buckets)
+    while b < highest:
+        out.append(float(f"{b:.6g}"))
+        b *= step
+    out.append(float(f"{highest:.6g}"))
+    return tuple(out)
+
+
+LATENCY_BOUNDS_SEC = log_linear_bounds(1e-5, 60.0)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, v: float) -> None:
+        self.value = float(v)
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self.value -= n
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.count += 1
+        self.sum += v
+        if v > self.max:
+            self.max = v
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank and c:
+                if i >= len(self.bounds):
+                    return self.max
+                return min(self.bounds[i], self.max)
+        return self.max
+
+
+class _Metric:
+    kind = ""
+    child_cls: Callable = _CounterChild
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return self.child_cls()
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def children(self) -> list[tuple[tuple[str, ...], object]]:
+        return list(self._children.items())
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self.children():
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(child.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+    child_cls = _CounterChild
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    child_cls = _GaugeChild
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        bounds: tuple[float, ...] = LATENCY_BOUNDS_SEC,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(bounds)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self.children():
+            acc = 0
+            for bound, c in zip(self.bounds, child.counts):
+                acc += c
+                le = f'le="{_fmt_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {acc}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, inf)} {child.count}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(child.sum)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+
+class CallbackGauge:
+    kind = "gauge"
+
+    # fn() -> {(label values...): value}
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str],
+        fn: Callable[[], dict[tuple[str, ...], float]],
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        try:
+            values = self.fn() or {}
+        except Exception:
+            values = {}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, v in values.items():
+            if v is None:
+                continue
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        m = self._metrics.get(name)
+        if m is None:
+            m = cls(name, *args, **kwargs)
+            self._metrics[name] = m
+        return m
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        bounds: tuple[float, ...] = LATENCY_BOUNDS_SEC,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, bounds=bounds)
+
+    def callback_gauge(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str],
+        fn: Callable[[], dict[tuple[str, ...], float]],
+    ) -> CallbackGauge:
+        m = CallbackGauge(name, help_text, labelnames, fn)
+        self._metrics[name] = m
+        return m
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for m in list(self._metrics.values()):
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+from typing import Any
+
+from common import codec
+
+# Версионированный снимок состояния в одном файле компактного JSON:
+# {"v": версия формата, "ts": время записи, "data": ...}. Запись атомарная
+# (временный файл в том же каталоге + os.replace), поэтому читатель видит либо
+# старый, либо новый снимок целиком; чужая версия или битый файл — как отсутствие.
+
+
+def write(path: str, version: int, data: Any) -> None:
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    body = codec.dumps_bytes({"v": int(version), "ts": time.time(), "data": data})
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read(path: str, version: int) -> tuple[float, Any] | None:
+    try:
+        with open(path, "rb") as f:
+            obj = codec.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(obj, dict) or obj.get("v") != int(version):
+        return None
+    try:
+        ts = float(obj.get("ts") or 0.0)
+    except (TypeError, ValueError):
+        return None
+    return ts, obj.get("data")
@@ -0,0 +1,104 @@
+import random
+import time
+from typing import Any, Optional
+
+from common import codec
+from common.metrics import REGISTRY
+
+# Трассировка тика от биржевого ts до отправки клиенту.
+# Этапы: exchange (ts OKX -> прием фрейма), parse, enqueue (раздача подписчикам),
+# send (передача в сокет клиента), total (ts OKX -> отправка).
+STAGES = ("exchange", "parse", "enqueue", "send", "total")
+
+TICK_LATENCY = REGISTRY.histogram(
+    "md_tick_latency_seconds",
+    "Market data latency from OKX ts to client socket by stage",
+    ("channel", "stage"),
+)
+
+_enabled = False
+_sample_rate = 0.0
+_log_path: Optional[str] = None
+_log_file = None
+
+
+def configure(enabled: bool, sample_rate: float = 0.0, log_path: Optional[str] = None) -> None:
+    global _enabled, _sample_rate, _log_path, _log_file
+    _enabled = bool(enabled)
+    _sample_rate = max(0.0, min(1.0, float(sample_rate or 0.0)))
+    if _log_file is not None:
+        try:
+            _log_file.close()
+        except Exception:
+            pass
+        _log_file = None
+    _log_path = log_path if (_enabled and _sample_rate > 0 and log_path) else None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def stamp(exch_ts_ms: Any, recv_s: float, parse_s: float) -> dict:
+    try:
+        exch = int(exch_ts_ms or 0) / 1000.0
+    except (TypeError, ValueError):
+        exch = 0.0
+    return {"exch": exch, "recv": recv_s, "parse": parse_s}
+
+
+def _write_sample(channel: str, trace: dict, enqueue_s: float, send_s: float) -> None:
+    global _log_file
+    if _log_path is None or random.random() >= _sample_rate:
+        return
+    try:
+        if _log_file is None:
+            _log_file = open(_log_path, "a", encoding="utf-8", buffering=1)
+        _log_file.write(
+            codec.dumps(
+                {
+                    "channel": channel,
+                    "exch": trace.get("exch"),
+                    "recv": trace.get("recv"),
+                    "parse": trace.get("parse"),
+                    "enqueue": enqueue_s,
+                    "send": send_s,
+                }
+            )
+            + "\n"
+        )
+    except Exception:
+        pass
+
+
+def finish(channel: str, trace: Optional[dict], enqueue_s: float, send_s: Optional[float] = None) -> None:
+    if not trace:
+        return
+    if send_s is None:
+        send_s = time.time()
+    exch = trace.get("exch") or 0.0
+    recv = trace["recv"]
+    parse = trace["parse"]
+    # часы OKX и наши могут расходиться, отрицательные интервалы обрезаем
+    if exch > 0:
+        TICK_LATENCY.labels(channel, "exchange").observe(max(0.0, recv - exch))
+        TICK_LATENCY.labels(channel, "total").observe(max(0.0, send_s - exch))
+    TICK_LATENCY.labels(channel, "parse").observe(max(0.0, parse - recv))
+    TICK_LATENCY.labels(channel, "enqueue").observe(max(0.0, enqueue_s - parse))
+    TICK_LATENCY.labels(channel, "send").observe(max(0.0, send_s - enqueue_s))
+    _write_sample(channel, trace, enqueue_s, send_s)
+
+
+def report() -> dict[str, dict[str, dict[str, float]]]:
+    out: dict[str, dict[str, dict[str, float]]] = {}
+    for (channel, stage), h in TICK_LATENCY.children():
+        if not h.count:
+            continue
+        out.setdefault(channel, {})[stage] = {
+            "count": h.count,
+            "p50_ms": h.quantile(0.5) * 1000.0,
+            "p90_ms": h.quantile(0.9) * 1000.0,
+            "p99_ms": h.quantile(0.99) * 1000.0,
+            "max_ms": h.max * 1000.0,
+        }
+    return out
@@ -0,0 +1,214 @@
+import abc
+import contextlib
+import importlib
+import queue
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+from common import codec
+from common.metrics import REGISTRY
+
+# Трассы жизненного цикла заявки по clOrdId: набор спанов (начало/конец) и событий.
+# Трасса выгружается, когда закрыты все ожидаемые этапы (ack клиенту и первый
+# пуш канала orders) или по истечении TTL.
+# order_span_seconds — длительность отдельных спанов; order_e2e_seconds — время от
+# приема заявки до этапа (ack клиенту, первый пуш orders).
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "order_span_seconds",
+    "Order lifecycle span duration",
+    ("span",),
+)
+E2E_SECONDS = REGISTRY.histogram(
+    "order_e2e_seconds",
+    "Time from order receipt to a lifecycle stage",
+    ("stage",),
+)
+TRACES_DROPPED = REGISTRY.counter(
+    "order_trace_dropped_total",
+    "Order traces dropped because the trace file writer fell behind",
+)
+
+
+class SpanExporter(abc.ABC):
+    @abc.abstractmethod
+    def export(self, trace: dict) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    # запись в файл — в отдельном потоке, как у FrameRecorder: event loop не ждет диск
+    def __init__(self, path: str, max_pending: int = 10_000):
+        self.path = path
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread = threading.Thread(target=self._run, name="order-trace-writer", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: dict) -> None:
+        try:
+            self._q.put_nowait(codec.dumps(trace) + "\n")
+        except queue.Full:
+            TRACES_DROPPED.labels().inc()
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join(timeout=10.0)
+
+    def _run(self) -> None:
+        fh = None
+        try:
+            while True:
+                line = self._q.get()
+                if line is None:
+                    return
+                try:
+                    if fh is None:
+                        fh = open(self.path, "a", encoding="utf-8")
+                    fh.write(line)
+                    if self._q.empty():
+                        fh.flush()
+                except OSError:
+                    TRACES_DROPPED.labels().inc()
+        finally:
+            if fh is not None:
+                fh.close()
+
+
+_enabled = False
+_exporter: Optional[SpanExporter] = None
+_ttl_sec = 30.0
+_traces: dict[str, dict] = {}
+
+
+def load_exporter(spec: str) -> SpanExporter:
+    # "package.module:factory" -> factory()
+    mod_name, _, attr = spec.partition(":")
+    if not mod_name or not attr:
+        raise RuntimeError(f"Некорректный экспортер трасс: {spec}")
+    factory = getattr(importlib.import_module(mod_name), attr)
+    return factory()
+
+
+def configure(enabled: bool, exporter: Optional[SpanExporter] = None, ttl_sec: float = 30.0) -> None:
+    global _enabled, _exporter, _ttl_sec
+    if _exporter is not None and _exporter is not exporter:
+        try:
+            _exporter.close()
+        except Exception:
+            pass
+    _enabled = bool(enabled) and exporter is not None
+    _exporter = exporter
+    _ttl_sec = float(ttl_sec)
+    _traces.clear()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _export(trace_id: str, trace: dict, status: str) -> None:
+    trace["status"] = status
+    trace["trace_id"] = trace_id
+    trace.pop("pending", None)
+    trace.pop("started", None)
+    try:
+        _exporter.export(trace)
+    except Exception:
+        pass
+
+
+def _sweep(now: float) -> None:
+    # трассы в dict идут в порядке создания: истекшие всегда в начале
+    while _traces:
+        trace_id = next(iter(_traces))
+        trace = _traces[trace_id]
+        if now - trace["started"] < _ttl_sec:
+            return
+        del _traces[trace_id]
+        _export(trace_id, trace, "timeout")
+
+
+def start(
+    trace_id: Optional[str],
+    name: str,
+    started_at: Optional[float] = None,
+    expect: Iterable[str] = (),
+    **attrs: Any,
+) -> None:
+    if not _enabled or not trace_id:
+        return
+    now = time.time()
+    _sweep(now)
+    _traces[trace_id] = {
+        "name": name,
+        "ts": started_at or now,
+        "started": now,
+        "attrs": attrs,
+        "spans": [],
+        "events": [],
+        "pending": set(expect),
+    }
+
+
+def add_span(trace_id: Optional[str], name: str, start_ts: float, end_ts: float, **attrs: Any) -> None:
+    if not _enabled or not trace_id:
+        return
+    trace = _traces.get(trace_id)
+    if trace is None:
+        return
+    dur = max(0.0, end_ts - start_ts)
+    SPAN_SECONDS.labels(name).observe(dur)
+    span = {"name": name, "start": start_ts, "duration_ms": dur * 1000.0}
+    if attrs:
+        span["attrs"] = attrs
+    trace["spans"].append(span)
+
+
+@contextlib.contextmanager
+def span(trace_id: Optional[str], name: str, **attrs: Any) -> Iterator[None]:
+    if not _enabled or not trace_id or trace_id not in _traces:
+        yield
+        return
+    t0 = time.time()
+    try:
+        yield
+    except BaseException as e:
+        add_span(trace_id, name, t0, time.time(), error=type(e).__name__, **attrs)
+        raise
+    add_span(trace_id, name, t0, time.time(), **attrs)
+
+
+def resolve(trace_id: Optional[str], stage: str, **attrs: Any) -> None:
+    # отмечает ожидаемый этап; когда ожидать больше нечего — выгружаем трассу
+    if not _enabled or not trace_id:
+        return
+    trace = _traces.get(trace_id)
+    if trace is None:
+        return
+    pending = trace["pending"]
+    if stage not in pending:
+        return
+    now = time.time()
+    event = {"name": stage, "ts": now, "since_start_ms": (now - trace["ts"]) * 1000.0}
+    if attrs:
+        event["attrs"] = attrs
+    trace["events"].append(event)
+    E2E_SECONDS.labels(stage).observe(max(0.0, now - trace["ts"]))
+    pending.discard(stage)
+    if not pending:
+        del _traces[trace_id]
+        _export(trace_id, trace, "ok")
+
+
+def fail(trace_id: Optional[str], error: str) -> None:
+    if not _enabled or not trace_id:
+        return
+    trace = _traces.pop(trace_id, None)
+    if trace is None:
+        return
+    trace["error"] = error
+    _export(trace_id, trace, "error")
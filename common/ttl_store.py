@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from common.metrics import REGISTRY
+
+# Ограниченное хранилище с единым TTL. Записи лежат в OrderedDict в порядке последней
+# записи, поэтому самые старые (и первые к истечению) всегда в начале: истечение —
+# это снятие нескольких элементов с головы при каждой операции, без полных обходов.
+# При переполнении вытесняется самая давно записанная запись.
+
+STORE_SIZE = REGISTRY.gauge(
+    "ttl_store_entries",
+    "Entries held in a bounded TTL store",
+    ("store",),
+)
+STORE_EVICTIONS = REGISTRY.counter(
+    "ttl_store_evictions_total",
+    "Entries removed from a bounded TTL store",
+    ("store", "reason"),
+)
+
+
+class TtlStore:
+    def __init__(self, name: str, ttl_sec: float, max_entries: int, expire_batch: int = 8):
+        self.name = name
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self.expire_batch = max(1, int(expire_batch))
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._size = STORE_SIZE.labels(name)
+        self._expired = STORE_EVICTIONS.labels(name, "expired")
+        self._evicted = STORE_EVICTIONS.labels(name, "capacity")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def expire(self, budget: int | None = None, now: float | None = None) -> int:
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.ttl_sec
+        n = 0
+        limit = self.expire_batch if budget is None else budget
+        data = self._data
+        while data and n < limit:
+            key, (ts, _) = next(iter(data.items()))
+            if ts >= cutoff:
+                break
+            del data[key]
+            n += 1
+        if n:
+            self._expired.inc(n)
+            self._size.set(len(data))
+        return n
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        ts, value = item
+        if time.monotonic() - ts > self.ttl_sec:
+            del self._data[key]
+            self._expired.inc()
+            self._size.set(len(self._data))
+            return None
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.monotonic()
+        data = self._data
+        data[key] = (now, value)
+        data.move_to_end(key)
+        self.expire(now=now)
+        overflow = len(data) - self.max_entries
+        if overflow > 0:
+            for _ in range(overflow):
+                data.popitem(last=False)
+            self._evicted.inc(overflow)
+        self._size.set(len(data))
+
+    def pop(self, key: str) -> Any:
+        item = self._data.pop(key, None)
+        if item is None:
+            return None
+        self._size.set(len(self._data))
+        return item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._size.set(0)
@@ -0,0 +1,4 @@
+from ingest.client import IngestClient
+from ingest.server import IngestServer
+
+__all__ = ["IngestClient", "IngestServer"]
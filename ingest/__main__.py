@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from common.metrics import REGISTRY
+from .server import IngestServer
+
+
+def _metrics_app() -> FastAPI:
+    app = FastAPI(title="Astras ingest")
+
+    @app.get("/metrics")
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+async def _run(args) -> None:
+    from api import core
+
+    adapter = core.make_upstream_adapter()
+    try:
+        await adapter.warmup()
+    except Exception:
+        # процессу приема нужны только публичные каналы; без ключей приватный WS не поднимется
+        pass
+    server = IngestServer(adapter, args.socket, book_depth=args.book_depth)
+    await server.start()
+    tasks = [asyncio.create_task(server.serve_forever())]
+    if args.metrics_port:
+        cfg = uvicorn.Config(_metrics_app(), host=args.metrics_host, port=args.metrics_port, log_level="warning")
+        tasks.append(asyncio.create_task(uvicorn.Server(cfg).serve()))
+    print(f"ingest: {args.socket}", flush=True)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Процесс приема market data OKX для воркеров шлюза")
+    p.add_argument("--socket", default=os.getenv("INGEST_SOCKET") or "/tmp/astras-ingest.sock")
+    p.add_argument("--book-depth", type=int, default=int(os.getenv("INGEST_BOOK_DEPTH", "0")),
+                   help="сколько уровней стакана отдавать воркерам (0 — все)")
+    p.add_argument("--metrics-host", default="127.0.0.1")
+    p.add_argument("--metrics-port", type=int, default=0, help="порт /metrics процесса приема (0 — выключено)")
+    args = p.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any
+
+from .protocol import pack, read_frame, sub_key
+
+_CLOSED = {"ev": "closed"}
+
+
+class IngestClient:
+    # одно Unix-соединение на процесс воркера, подписки мультиплексируются по ключу
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._subs: dict[str, set[asyncio.Queue]] = {}
+        # ключи, на которые процесс приема уже ответил "subscribed": "sub" уходит
+        # только для первой локальной очереди, поздним очередям ack отдаем сами
+        self._acked: set[str] = set()
+        # отказы по символам ключа: поздняя очередь получает их перед локальным ack
+        self._symbol_errors: dict[str, list[dict]] = {}
+
+    async def _ensure(self) -> asyncio.StreamWriter:
+        if self._writer is not None:
+            return self._writer
+        async with self._lock:
+            if self._writer is None:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                self._writer = writer
+                self._reader_task = asyncio.create_task(self._read_loop(reader, writer))
+            return self._writer
+
+    async def subscribe(self, kind: str, args: dict[str, Any]) -> tuple[str, asyncio.Queue]:
+        key = sub_key(kind, args)
+        writer = await self._ensure()
+        q: asyncio.Queue = asyncio.Queue()
+        queues = self._subs.get(key)
+        if queues is None:
+            queues = set()
+            self._subs[key] = queues
+        first = not queues
+        queues.add(q)
+        if key in self._acked:
+            for msg in self._symbol_errors.get(key, ()):
+                q.put_nowait(msg)
+            q.put_nowait({"key": key, "ev": "subscribed"})
+        elif first:
+            writer.write(pack({"op": "sub", "key": key, "kind": kind, "args": args}))
+            await writer.drain()
+        return key, q
+
+    async def unsubscribe(self, key: str, q: asyncio.Queue) -> None:
+        queues = self._subs.get(key)
+        if queues is None:
+            return
+        queues.discard(q)
+        if queues:
+            return
+        del self._subs[key]
+        self._acked.discard(key)
+        self._symbol_errors.pop(key, None)
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            writer.write(pack({"op": "unsub", "key": key}))
+            await writer.drain()
+        except Exception:
+            pass
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                msg = await read_frame(reader)
+                key = msg.get("key")
+                queues = self._subs.get(key)
+                if not queues:
+                    continue
+                ev = msg.get("ev")
+                if ev == "subscribed":
+                    self._acked.add(key)
+                elif ev == "error":
+                    self._acked.discard(key)
+                elif ev == "symbol_error":
+                    self._symbol_errors.setdefault(key, []).append(msg)
+                for q in queues:
+                    q.put_nowait(msg)
+        except (asyncio.IncompleteReadError, ConnectionError, RuntimeError, ValueError):
+            pass
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            subs = self._subs
+            self._subs = {}
+            self._acked = set()
+            self._symbol_errors = {}
+            for queues in subs.values():
+                for q in queues:
+                    q.put_nowait(_CLOSED)
+            try:
+                writer.close()
+            except Exception:
+                pass
+
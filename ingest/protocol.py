@@ -0,0 +1,36 @@
+import asyncio
+import struct
+from typing import Any
+
+from common import codec
+
+# Кадр: 4 байта длины (big-endian) + JSON. Воркер -> процесс приема:
+#   {"op": "sub", "key": K, "kind": "book"|"quotes"|"bars", "args": {...}}
+#   {"op": "unsub", "key": K}
+# Процесс приема -> воркер:
+#   {"key": K, "ev": "subscribed"|"error"|"data"|"gap"|"symbol_error", "d": ...}
+# symbol_error — OKX отклонил один символ списка котировок (d.instId), поток идет дальше.
+# K — канонический ключ подписки, одинаковый во всех воркерах, поэтому кадр данных
+# кодируется один раз и уходит всем подписанным воркерам без изменений.
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+
+KINDS = ("book", "quotes", "bars")
+
+
+def sub_key(kind: str, args: dict[str, Any]) -> str:
+    return codec.dumps([kind, sorted((k, v) for k, v in args.items() if v is not None)])
+
+
+def pack(obj: Any) -> bytes:
+    body = codec.dumps_bytes(obj)
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    header = await reader.readexactly(_HEADER.size)
+    (n,) = _HEADER.unpack(header)
+    if n > MAX_FRAME:
+        raise RuntimeError(f"Слишком большой кадр ingest: {n} байт")
+    return codec.loads(await reader.readexactly(n))
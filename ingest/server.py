@@ -0,0 +1,242 @@
+import asyncio
+import os
+from typing import Any
+
+from common.metrics import REGISTRY
+from .protocol import KINDS, pack, read_frame
+
+# Процесс приема: держит подключения к OKX и состояние (стаканы), по одной
+# upstream-подписке на ключ независимо от числа воркеров, и раздает нормализованные
+# обновления воркерам шлюза через Unix-сокет.
+
+INGEST_PUBLISHED = REGISTRY.counter(
+    "ingest_published_total",
+    "Updates published to gateway workers",
+    ("kind",),
+)
+INGEST_BYTES = REGISTRY.counter(
+    "ingest_published_bytes_total",
+    "Bytes written to gateway workers",
+)
+INGEST_UPSTREAMS = REGISTRY.gauge(
+    "ingest_upstream_subscriptions",
+    "Deduplicated upstream subscriptions held by the ingestion process",
+)
+INGEST_WORKERS = REGISTRY.gauge(
+    "ingest_connected_workers",
+    "Gateway workers connected to the ingestion process",
+)
+INGEST_WORKERS_DROPPED = REGISTRY.counter(
+    "ingest_dropped_workers_total",
+    "Worker connections closed because their socket buffer overflowed",
+)
+
+
+class _Worker:
+    def __init__(self, writer: asyncio.StreamWriter, max_buffer: int):
+        self.writer = writer
+        self.max_buffer = max_buffer
+        self.keys: set[str] = set()
+        self.closed = False
+
+    def send(self, frame: bytes) -> None:
+        if self.closed:
+            return
+        self.writer.write(frame)
+        INGEST_BYTES.labels().inc(len(frame))
+        # медленный воркер не должен копить память процесса приема: рвем соединение,
+        # воркер переподключится и переподпишется
+        if self.writer.transport.get_write_buffer_size() > self.max_buffer:
+            INGEST_WORKERS_DROPPED.labels().inc()
+            self.closed = True
+            self.writer.transport.abort()
+
+
+class _Upstream:
+    def __init__(self, key: str, kind: str):
+        self.key = key
+        self.kind = kind
+        self.workers: set[_Worker] = set()
+        self.stop = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.subscribed = False
+        # последний кадр по символу: у котировок по списку символов их несколько
+        self.last: dict[str | None, bytes] = {}
+        # отказы OKX по отдельным символам списка — повторяются поздним воркерам
+        self.failed: list[bytes] = []
+
+
+class IngestServer:
+    def __init__(self, adapter, path: str, max_worker_buffer: int = 32 * 1024 * 1024, book_depth: int = 0):
+        self.adapter = adapter
+        self.path = path
+        self.max_worker_buffer = max_worker_buffer
+        self.book_depth = max(0, int(book_depth))
+        self._upstreams: dict[str, _Upstream] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        for up in list(self._upstreams.values()):
+            up.stop.set()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        w = _Worker(writer, self.max_worker_buffer)
+        INGEST_WORKERS.labels().inc()
+        try:
+            while not w.closed:
+                msg = await read_frame(reader)
+                op = msg.get("op")
+                key = msg.get("key")
+                if not isinstance(key, str):
+                    continue
+                if op == "sub" and msg.get("kind") in KINDS:
+                    self._join(w, key, msg["kind"], msg.get("args") or {})
+                elif op == "unsub":
+                    self._leave(w, key)
+        except (asyncio.IncompleteReadError, ConnectionError, RuntimeError, ValueError):
+            pass
+        finally:
+            INGEST_WORKERS.labels().dec()
+            w.closed = True
+            for key in list(w.keys):
+                self._leave(w, key)
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def _join(self, w: _Worker, key: str, kind: str, args: dict[str, Any]) -> None:
+        up = self._upstreams.get(key)
+        if up is None:
+            up = _Upstream(key, kind)
+            self._upstreams[key] = up
+            INGEST_UPSTREAMS.labels().set(len(self._upstreams))
+            up.task = asyncio.create_task(self._run_upstream(up, args))
+        up.workers.add(w)
+        w.keys.add(key)
+        for frame in up.failed:
+            w.send(frame)
+        if up.subscribed:
+            # поток уже идет: воркер сразу получает подтверждение и последнее состояние
+            w.send(pack({"key": key, "ev": "subscribed"}))
+            for frame in up.last.values():
+                w.send(frame)
+
+    def _leave(self, w: _Worker, key: str) -> None:
+        w.keys.discard(key)
+        up = self._upstreams.get(key)
+        if up is None:
+            return
+        up.workers.discard(w)
+        if not up.workers:
+            self._drop(up)
+
+    def _drop(self, up: _Upstream) -> None:
+        up.stop.set()
+        if self._upstreams.get(up.key) is up:
+            del self._upstreams[up.key]
+            INGEST_UPSTREAMS.labels().set(len(self._upstreams))
+        for w in up.workers:
+            w.keys.discard(up.key)
+        up.workers.clear()
+
+    def _publish(self, up: _Upstream, frame: bytes) -> None:
+        for w in list(up.workers):
+            w.send(frame)
+
+    def _start(self, up: _Upstream, args: dict[str, Any], on_data, on_subscribed, on_error, on_gap, on_symbol_error):
+        a = self.adapter
+        if up.kind == "book":
+            return a.subscribe_order_book(
+                symbol=args["symbol"],
+                depth=0,
+                on_data=on_data,
+                stop_event=up.stop,
+                on_subscribed=on_subscribed,
+                on_error=on_error,
+                on_gap=on_gap,
+            )
+        if up.kind == "quotes" and "symbols" in args:
+            return a.subscribe_quotes_multi(
+                symbols=args["symbols"],
+                on_data=on_data,
+                stop_event=up.stop,
+                on_subscribed=on_subscribed,
+                on_error=on_error,
+                on_gap=on_gap,
+                on_symbol_error=on_symbol_error,
+            )
+        if up.kind == "quotes":
+            return a.subscribe_quotes(
+                symbol=args["symbol"],
+                on_data=on_data,
+                stop_event=up.stop,
+                on_subscribed=on_subscribed,
+                on_error=on_error,
+                on_gap=on_gap,
+            )
+        return a.subscribe_bars(
+            symbol=args["symbol"],
+            tf=args["tf"],
+            from_ts=0,
+            skip_history=True,
+            split_adjust=True,
+            on_data=on_data,
+            stop_event=up.stop,
+            on_subscribed=on_subscribed,
+            on_error=on_error,
+            inst_type=args.get("inst_type"),
+            on_gap=on_gap,
+        )
+
+    async def _run_upstream(self, up: _Upstream, args: dict[str, Any]) -> None:
+        kind_metric = INGEST_PUBLISHED.labels(up.kind)
+        depth = self.book_depth if up.kind == "book" else 0
+
+        def on_subscribed(_ev: dict) -> None:
+            up.subscribed = True
+            self._publish(up, pack({"key": up.key, "ev": "subscribed"}))
+
+        def on_error(ev: dict) -> None:
+            self._publish(up, pack({"key": up.key, "ev": "error", "d": ev}))
+            self._drop(up)
+
+        def on_gap(ev: dict) -> None:
+            # апстрим переподключился: воркеры перезапрашивают снимок у своих клиентов
+            self._publish(up, pack({"key": up.key, "ev": "gap", "d": ev}))
+
+        def on_symbol_error(inst_id: str, ev: dict) -> None:
+            frame = pack({"key": up.key, "ev": "symbol_error", "d": {**ev, "instId": inst_id}})
+            up.failed.append(frame)
+            self._publish(up, frame)
+
+        def on_data(item: dict) -> None:
+            if depth:
+                item["bids"] = item.get("bids", [])[:depth]
+                item["asks"] = item.get("asks", [])[:depth]
+            frame = pack({"key": up.key, "ev": "data", "d": item})
+            up.last[item.get("symbol")] = frame
+            kind_metric.inc()
+            self._publish(up, frame)
+
+        try:
+            await self._start(up, args, on_data, on_subscribed, on_error, on_gap, on_symbol_error)
+        except Exception as e:
+            on_error({"event": "error", "code": None, "msg": str(e) or type(e).__name__})
+        finally:
+            if self._upstreams.get(up.key) is up and not up.stop.is_set():
+                self._drop(up)
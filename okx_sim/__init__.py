@@ -0,0 +1,3 @@
+from .app import SimConfig, Simulator, create_app
+
+__all__ = ["SimConfig", "Simulator", "create_app"]
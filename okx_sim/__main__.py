@@ -0,0 +1,33 @@
+import argparse
+import os
+
+import uvicorn
+
+from .app import SimConfig, create_app
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Локальный симулятор OKX (REST + WS public/business/private)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8900)
+    p.add_argument("--rate", type=float, default=float(os.getenv("SIM_RATE_HZ", "10")), help="тиков рынка в секунду")
+    p.add_argument("--depth", type=int, default=50, help="глубина стакана")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--api-key", default=os.getenv("SIM_API_KEY", "sim-key"))
+    p.add_argument("--api-secret", default=os.getenv("SIM_API_SECRET", "sim-secret"))
+    p.add_argument("--api-passphrase", default=os.getenv("SIM_API_PASSPHRASE", "sim-pass"))
+    args = p.parse_args()
+
+    cfg = SimConfig(
+        api_key=args.api_key,
+        api_secret=args.api_secret,
+        api_passphrase=args.api_passphrase,
+        rate_hz=args.rate,
+        depth=args.depth,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(cfg), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from common import codec
+from .engine import Engine
+from .market import Market
+
+
+@dataclass
+class SimConfig:
+    api_key: str = "sim-key"
+    api_secret: str = "sim-secret"
+    api_passphrase: str = "sim-pass"
+    rate_hz: float = 10.0
+    depth: int = 50
+    seed: int = 1
+    # допуск по времени подписи login/REST, сек
+    ts_skew_sec: float = 30.0
+
+
+def _sign(secret: str, message: str) -> str:
+    mac = hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256)
+    return base64.b64encode(mac.digest()).decode("ascii")
+
+
+def _ok(data: list) -> JSONResponse:
+    return JSONResponse({"code": "0", "msg": "", "data": data})
+
+
+def _err(code: str, msg: str, status: int = 200) -> JSONResponse:
+    return JSONResponse({"code": code, "msg": msg, "data": []}, status_code=status)
+
+
+class _Conn:
+    def __init__(self, ws: WebSocket, kind: str):
+        self.ws = ws
+        self.kind = kind
+        self.authed = False
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=10_000)
+        self.args: list[dict] = []
+
+    def send_text(self, text: str) -> None:
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            # медленный клиент: как и OKX, не копим бесконечно — пропускаем
+            pass
+
+    def send(self, obj: dict) -> None:
+        self.send_text(codec.dumps(obj))
+
+    async def writer(self) -> None:
+        while True:
+            text = await self.queue.get()
+            await self.ws.send_text(text)
+
+
+class Simulator:
+    def __init__(self, cfg: SimConfig):
+        self.cfg = cfg
+        self.market = Market(seed=cfg.seed, depth=cfg.depth)
+        self.engine = Engine(self.market)
+        self.engine.listeners.append(self._on_engine_event)
+        # (channel, instId) -> подписанные соединения
+        self.subs: dict[tuple[str, str], set[_Conn]] = {}
+        self.private: set[_Conn] = set()
+        self.ticks = 0
+        self._task: asyncio.Task | None = None
+
+    # рынок
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        period = 1.0 / max(0.1, self.cfg.rate_hz)
+        next_at = time.perf_counter()
+        while True:
+            for inst_id in self.market.symbols:
+                self._tick(inst_id)
+            self.ticks += 1
+            next_at += period
+            delay = next_at - time.perf_counter()
+            if delay < 0:
+                next_at = time.perf_counter()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _tick(self, inst_id: str) -> None:
+        st = self.market.symbols[inst_id]
+        bids, asks = st.step()
+        self.engine.on_tick(inst_id)
+
+        book_subs = self.subs.get(("books", inst_id))
+        if book_subs and (bids or asks):
+            text = codec.dumps(
+                {
+                    "arg": {"channel": "books", "instId": inst_id},
+                    "action": "update",
+                    "data": [{"asks": asks, "bids": bids, "ts": str(st.ts), "checksum": 0, "seqId": self.ticks}],
+                }
+            )
+            for c in book_subs:
+                c.send_text(text)
+
+        ticker_subs = self.subs.get(("tickers", inst_id))
+        if ticker_subs:
+            text = codec.dumps({"arg": {"channel": "tickers", "instId": inst_id}, "data": [st.ticker()]})
+            for c in ticker_subs:
+                c.send_text(text)
+
+        for (channel, sub_inst), conns in self.subs.items():
+            if sub_inst != inst_id or not channel.startswith("candle") or not conns:
+                continue
+            text = codec.dumps(
+                {"arg": {"channel": channel, "instId": inst_id}, "data": [st.candle(channel[len("candle"):])]}
+            )
+            for c in conns:
+                c.send_text(text)
+
+    # подписки
+
+    def _snapshot_for(self, conn: _Conn, arg: dict) -> None:
+        channel = arg.get("channel") or ""
+        inst_id = arg.get("instId") or ""
+        st = self.market.symbols.get(inst_id)
+        if channel == "books" and st is not None:
+            bids, asks = st.book_levels()
+            conn.send(
+                {
+                    "arg": arg,
+                    "action": "snapshot",
+                    "data": [{"asks": asks, "bids": bids, "ts": str(st.ts), "checksum": 0, "seqId": self.ticks}],
+                }
+            )
+        elif channel == "tickers" and st is not None:
+            conn.send({"arg": arg, "data": [st.ticker()]})
+        elif channel == "account":
+            conn.send({"arg": arg, "data": [self.engine.balance_payload()]})
+        elif channel == "positions":
+            conn.send({"arg": arg, "data": self.engine.positions_payload(self._inst_type_filter(arg))})
+
+    def _inst_type_filter(self, arg: dict) -> str | None:
+        it = str(arg.get("instType") or "").upper()
+        return None if it in ("", "ANY") else it
+
+    def subscribe(self, conn: _Conn, arg: dict) -> dict | None:
+        channel = str(arg.get("channel") or "")
+        public = {"books", "tickers"}
+        private = {"orders", "fills", "account", "positions"}
+        if conn.kind == "public" and channel not in public:
+            return {"event": "error", "code": "60018", "msg": f"Wrong URL or channel:{channel} doesn't exist."}
+        if conn.kind == "business" and not channel.startswith("candle"):
+            return {"event": "error", "code": "60018", "msg": f"Wrong URL or channel:{channel} doesn't exist."}
+        if conn.kind == "private":
+            if channel not in private:
+                return {"event": "error", "code": "60018", "msg": f"Wrong URL or channel:{channel} doesn't exist."}
+            if not conn.authed:
+                return {"event": "error", "code": "60011", "msg": "Please log in"}
+            conn.args.append(arg)
+        else:
+            inst_id = str(arg.get("instId") or "")
+            if inst_id not in self.market.instruments:
+                return {"event": "error", "code": "60018", "msg": f"Wrong URL or channel:{channel},instId:{inst_id} doesn't exist."}
+            self.subs.setdefault((channel, inst_id), set()).add(conn)
+        conn.send({"event": "subscribe", "arg": arg, "connId": hex(id(conn))[-8:]})
+        self._snapshot_for(conn, arg)
+        return None
+
+    def unsubscribe(self, conn: _Conn, arg: dict) -> None:
+        key = (str(arg.get("channel") or ""), str(arg.get("instId") or ""))
+        conns = self.subs.get(key)
+        if conns is not None:
+            conns.discard(conn)
+        conn.args = [a for a in conn.args if a != arg]
+        conn.send({"event": "unsubscribe", "arg": arg, "connId": hex(id(conn))[-8:]})
+
+    def drop(self, conn: _Conn) -> None:
+        for conns in self.subs.values():
+            conns.discard(conn)
+        self.private.discard(conn)
+
+    # приватная часть
+
+    def verify_login(self, args: dict) -> bool:
+        ts = str(args.get("timestamp") or "")
+        try:
+            skew = abs(time.time() - float(ts))
+        except ValueError:
+            return False
+        if skew > self.cfg.ts_skew_sec:
+            return False
+        expected = _sign(self.cfg.api_secret, ts + "GET" + "/users/self/verify")
+        return (
+            args.get("apiKey") == self.cfg.api_key
+            and args.get("passphrase") == self.cfg.api_passphrase
+            and hmac.compare_digest(str(args.get("sign") or ""), expected)
+        )
+
+    def _on_engine_event(self, kind: str, payload: dict) -> None:
+        for conn in list(self.private):
+            for arg in conn.args:
+                channel = arg.get("channel")
+                if kind == "orders" and channel == "orders":
+                    it = self._inst_type_filter(arg)
+                    if it and it != payload.get("instType") and not (it == "MARGIN" and payload.get("instType") == "SPOT"):
+                        continue
+                    conn.send({"arg": arg, "data": [payload]})
+                    break
+                if kind == "fills" and channel == "fills":
+                    conn.send({"arg": arg, "data": [payload]})
+                elif kind == "account" and channel == "account":
+                    conn.send({"arg": arg, "data": [self.engine.balance_payload()]})
+                elif kind == "positions" and channel == "positions":
+                    conn.send({"arg": arg, "data": self.engine.positions_payload(self._inst_type_filter(arg))})
+
+    def trade_op(self, op: str, msg: dict) -> dict:
+        args = msg.get("args") or []
+        results = []
+        for a in args:
+            results.append(self.engine.place(a) if op == "order" else self.engine.cancel(a))
+        failed = [r for r in results if r.get("sCode") != "0"]
+        code = "0" if not failed else ("1" if len(failed) == len(results) else "2")
+        now = str(int(time.time() * 1_000_000))
+        return {
+            "id": msg.get("id"),
+            "op": op,
+            "code": code,
+            "msg": "" if code == "0" else "Operation failed.",
+            "data": results,
+            "inTime": now,
+            "outTime": now,
+        }
+
+    def verify_rest(self, request: Request, body: bytes) -> bool:
+        h = request.headers
+        ts = h.get("OK-ACCESS-TIMESTAMP") or ""
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        expected = _sign(self.cfg.api_secret, ts + request.method.upper() + path + body.decode("utf-8"))
+        return (
+            h.get("OK-ACCESS-KEY") == self.cfg.api_key
+            and h.get("OK-ACCESS-PASSPHRASE") == self.cfg.api_passphrase
+            and hmac.compare_digest(h.get("OK-ACCESS-SIGN") or "", expected)
+        )
+
+
+def create_app(cfg: SimConfig | None = None) -> FastAPI:
+    sim = Simulator(cfg or SimConfig())
+    app = FastAPI(title="OKX simulator")
+    app.state.sim = sim
+
+    @app.on_event("startup")
+    async def _start():
+        sim.start()
+
+    @app.on_event("shutdown")
+    async def _stop():
+        await sim.stop()
+
+    # REST: public / market
+
+    @app.get("/api/v5/public/time")
+    async def public_time():
+        return _ok([{"ts": str(int(time.time() * 1000))}])
+
+    @app.get("/api/v5/public/instruments")
+    async def public_instruments(instType: str = "SPOT", instId: str | None = None):
+        items = [i.okx() for i in sim.market.by_type(instType) if not instId or i.inst_id == instId]
+        return _ok(items)
+
+    @app.get("/api/v5/market/tickers")
+    async def market_tickers(instType: str = "SPOT"):
+        return _ok([sim.market.symbols[i.inst_id].ticker() for i in sim.market.by_type(instType)])
+
+    @app.get("/api/v5/market/ticker")
+    async def market_ticker(instId: str):
+        st = sim.market.symbols.get(instId)
+        if st is None:
+            return _err("51001", "Instrument ID does not exist")
+        return _ok([st.ticker()])
+
+    @app.get("/api/v5/market/books")
+    async def market_books(instId: str, sz: int = 1):
+        st = sim.market.symbols.get(instId)
+        if st is None:
+            return _err("51001", "Instrument ID does not exist")
+        bids, asks = st.book_levels(max(1, min(int(sz), 400)))
+        return _ok([{"asks": asks, "bids": bids, "ts": str(st.ts)}])
+
+    @app.get("/api/v5/market/candles")
+    @app.get("/api/v5/market/history-candles")
+    async def market_candles(instId: str, bar: str = "1m", after: int | None = None, limit: int = 100):
+        st = sim.market.symbols.get(instId)
+        if st is None:
+            return _err("51001", "Instrument ID does not exist")
+        return _ok(st.history_candles(bar, after, int(limit)))
+
+    # REST: private
+
+    async def _private(request: Request):
+        body = await request.body()
+        if not sim.verify_rest(request, body):
+            return None, _err("50113", "Invalid Sign", status=401)
+        return body, None
+
+    @app.get("/api/v5/account/balance")
+    async def account_balance(request: Request):
+        _, err = await _private(request)
+        return err or _ok([sim.engine.balance_payload()])
+
+    @app.get("/api/v5/account/positions")
+    async def account_positions(request: Request, instType: str | None = None):
+        _, err = await _private(request)
+        return err or _ok(sim.engine.positions_payload((instType or "").upper() or None))
+
+    @app.get("/api/v5/account/max-size")
+    async def account_max_size(request: Request, instId: str):
+        _, err = await _private(request)
+        if err:
+            return err
+        st = sim.market.symbols.get(instId)
+        if st is None:
+            return _err("51001", "Instrument ID does not exist")
+        inst = st.inst
+        quote = sim.engine.balances.get(inst.quote, 0.0)
+        base = sim.engine.balances.get(inst.base, 0.0)
+        return _ok([{"instId": instId, "ccy": inst.quote, "maxBuy": f"{quote / st.best_ask():.8f}", "maxSell": f"{base:.8f}"}])
+
+    @app.get("/api/v5/account/max-loan")
+    async def account_max_loan(request: Request, instId: str, mgnMode: str = "cross", mgnCcy: str = "USDT"):
+        _, err = await _private(request)
+        return err or _ok([{"instId": instId, "mgnMode": mgnMode, "mgnCcy": mgnCcy, "maxLoan": "0", "ccy": mgnCcy, "side": "buy"}])
+
+    @app.get("/api/v5/account/leverage-info")
+    async def account_leverage(request: Request, instId: str, mgnMode: str = "cross"):
+        _, err = await _private(request)
+        return err or _ok([{"instId": instId, "mgnMode": mgnMode, "posSide": "net", "lever": "3"}])
+
+    @app.get("/api/v5/trade/orders-pending")
+    async def trade_orders_pending(request: Request, instType: str | None = None, instId: str | None = None):
+        _, err = await _private(request)
+        if err:
+            return err
+        return _ok(
+            [
+                o for o in reversed(sim.engine.open_orders())
+                if (not instType or o["instType"] == instType.upper()) and (not instId or o["instId"] == instId)
+            ]
+        )
+
+    @app.get("/api/v5/trade/orders-history")
+    async def trade_orders_history(request: Request, instType: str | None = None, limit: int = 100):
+        _, err = await _private(request)
+        if err:
+            return err
+        items = [o for o in reversed(sim.engine.closed_orders()) if not instType or o["instType"] == instType.upper()]
+        return _ok(items[: max(1, min(int(limit), 100))])
+
+    @app.get("/api/v5/trade/fills-history")
+    @app.get("/api/v5/trade/fills")
+    async def trade_fills(request: Request, instType: str | None = None, limit: int = 100):
+        _, err = await _private(request)
+        if err:
+            return err
+        items = [f for f in reversed(sim.engine.fills) if not instType or f["instType"] == instType.upper()]
+        return _ok(items[: max(1, min(int(limit), 100))])
+
+    @app.post("/api/v5/trade/order")
+    async def trade_order(request: Request):
+        body, err = await _private(request)
+        if err:
+            return err
+        res = sim.trade_op("order", {"args": [codec.loads(body or b"{}")]})
+        return JSONResponse({"code": res["code"], "msg": res["msg"], "data": res["data"]})
+
+    @app.post("/api/v5/trade/cancel-order")
+    async def trade_cancel(request: Request):
+        body, err = await _private(request)
+        if err:
+            return err
+        res = sim.trade_op("cancel-order", {"args": [codec.loads(body or b"{}")]})
+        return JSONResponse({"code": res["code"], "msg": res["msg"], "data": res["data"]})
+
+    # WS
+
+    async def _serve(ws: WebSocket, kind: str):
+        await ws.accept()
+        conn = _Conn(ws, kind)
+        writer = asyncio.create_task(conn.writer())
+        try:
+            while True:
+                raw = await ws.receive_text()
+                if raw == "ping":
+                    conn.send_text("pong")
+                    continue
+                try:
+                    msg = codec.loads(raw)
+                except Exception:
+                    conn.send({"event": "error", "code": "60012", "msg": f"Invalid request: {raw}"})
+                    continue
+                op = msg.get("op")
+                if op == "login":
+                    args = (msg.get("args") or [{}])[0]
+                    if kind == "private" and sim.verify_login(args):
+                        conn.authed = True
+                        sim.private.add(conn)
+                        conn.send({"event": "login", "code": "0", "msg": "", "connId": hex(id(conn))[-8:]})
+                    else:
+                        conn.send({"event": "error", "code": "60009", "msg": "Login failed."})
+                elif op == "subscribe":
+                    for arg in msg.get("args") or []:
+                        err = sim.subscribe(conn, arg)
+                        if err is not None:
+                            conn.send(err)
+                elif op == "unsubscribe":
+                    for arg in msg.get("args") or []:
+                        sim.unsubscribe(conn, arg)
+                elif op in ("order", "cancel-order") and kind == "private":
+                    if not conn.authed:
+                        conn.send({"id": msg.get("id"), "op": op, "code": "60011", "msg": "Please log in", "data": []})
+                    else:
+                        conn.send(sim.trade_op(op, msg))
+                else:
+                    conn.send({"event": "error", "code": "60012", "msg": f"Invalid request: {raw}"})
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            sim.drop(conn)
+            writer.cancel()
+
+    @app.websocket("/ws/v5/public")
+    async def ws_public(ws: WebSocket):
+        await _serve(ws, "public")
+
+    @app.websocket("/ws/v5/business")
+    async def ws_business(ws: WebSocket):
+        await _serve(ws, "business")
+
+    @app.websocket("/ws/v5/private")
+    async def ws_private(ws: WebSocket):
+        await _serve(ws, "private")
+
+    return app
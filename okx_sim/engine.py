@@ -0,0 +1,252 @@
+import itertools
+import time
+from typing import Callable
+
+from .market import Market, fmt
+
+# Простой движок исполнения: рыночные и пересекающие лимитные заявки исполняются
+# целиком по лучшей цене стакана симулятора, остальные лимитные ждут, пока рынок
+# до них дойдет. Баланс ведется по валютам без маржи и залогов.
+
+FEE_RATE = 0.001
+
+
+class Engine:
+    def __init__(self, market: Market, balances: dict[str, float] | None = None):
+        self.market = market
+        self.orders: dict[str, dict] = {}
+        self.by_cl: dict[str, str] = {}
+        self.fills: list[dict] = []
+        self.balances: dict[str, float] = dict(balances or {"USDT": 100_000.0, "BTC": 1.0, "ETH": 10.0})
+        self.positions: dict[str, float] = {}
+        self._ord_seq = itertools.count(700_000_000_000_000_000)
+        self._trade_seq = itertools.count(1)
+        # on_event(kind, payload): kind — "orders" | "fills" | "account" | "positions"
+        self.listeners: list[Callable[[str, dict], None]] = []
+
+    def _emit(self, kind: str, payload: dict) -> None:
+        for fn in list(self.listeners):
+            try:
+                fn(kind, payload)
+            except Exception:
+                pass
+
+    def place(self, args: dict) -> dict:
+        inst_id = str(args.get("instId") or "")
+        inst = self.market.instruments.get(inst_id)
+        if inst is None:
+            return {"sCode": "51001", "sMsg": "Instrument ID does not exist"}
+        ord_type = str(args.get("ordType") or "limit")
+        side = str(args.get("side") or "")
+        if side not in ("buy", "sell"):
+            return {"sCode": "51000", "sMsg": "Parameter side error"}
+        try:
+            sz = float(args.get("sz") or 0)
+        except ValueError:
+            sz = 0.0
+        if sz <= 0:
+            return {"sCode": "51000", "sMsg": "Parameter sz error"}
+        px = 0.0
+        if ord_type != "market":
+            try:
+                px = float(args.get("px") or 0)
+            except ValueError:
+                px = 0.0
+            if px <= 0:
+                return {"sCode": "51000", "sMsg": "Parameter px error"}
+
+        cl = str(args.get("clOrdId") or "")
+        if cl and cl in self.by_cl:
+            return {"sCode": "51016", "sMsg": "Duplicated clOrdId"}
+
+        now = int(time.time() * 1000)
+        ord_id = str(next(self._ord_seq))
+        o = {
+            "instType": inst.inst_type,
+            "instId": inst_id,
+            "ordId": ord_id,
+            "clOrdId": cl,
+            "tag": "",
+            "px": "" if ord_type == "market" else fmt(px, inst.tick),
+            "sz": str(args.get("sz")),
+            "ordType": ord_type,
+            "side": side,
+            "posSide": str(args.get("posSide") or "net"),
+            "tdMode": str(args.get("tdMode") or "cash"),
+            "tgtCcy": str(args.get("tgtCcy") or ""),
+            "ccy": str(args.get("ccy") or ""),
+            "state": "live",
+            "accFillSz": "0",
+            "fillSz": "0",
+            "fillPx": "",
+            "avgPx": "",
+            "tradeId": "",
+            "fee": "0",
+            "feeCcy": inst.quote,
+            "cTime": str(now),
+            "uTime": str(now),
+        }
+        self.orders[ord_id] = o
+        if cl:
+            self.by_cl[cl] = ord_id
+
+        st = self.market.symbols[inst_id]
+        cross = st.best_ask() if side == "buy" else st.best_bid()
+        crosses = ord_type == "market" or (px >= cross if side == "buy" else px <= cross)
+
+        if ord_type == "post_only" and crosses:
+            o["state"] = "canceled"
+            self._emit("orders", dict(o))
+            return {"ordId": ord_id, "clOrdId": cl, "sCode": "0", "sMsg": "Order placed"}
+
+        self._emit("orders", dict(o))
+        if crosses:
+            self._fill(o, cross)
+        elif ord_type in ("ioc", "fok"):
+            o["state"] = "canceled"
+            o["uTime"] = str(int(time.time() * 1000))
+            self._emit("orders", dict(o))
+        return {"ordId": ord_id, "clOrdId": cl, "sCode": "0", "sMsg": "Order placed"}
+
+    def cancel(self, args: dict) -> dict:
+        ord_id = str(args.get("ordId") or "") or self.by_cl.get(str(args.get("clOrdId") or ""), "")
+        o = self.orders.get(ord_id)
+        if o is None:
+            return {"sCode": "51400", "sMsg": "Order cancellation failed as the order does not exist"}
+        if o["state"] not in ("live", "partially_filled"):
+            return {"sCode": "51401", "sMsg": "Order has been completed or canceled"}
+        o["state"] = "canceled"
+        o["uTime"] = str(int(time.time() * 1000))
+        self._emit("orders", dict(o))
+        return {"ordId": ord_id, "clOrdId": o["clOrdId"], "sCode": "0", "sMsg": ""}
+
+    def _fill(self, o: dict, px: float) -> None:
+        inst = self.market.instruments[o["instId"]]
+        sz = float(o["sz"])
+        if o["ordType"] == "market" and o["side"] == "buy" and o["tgtCcy"] == "quote_ccy":
+            sz = sz / px
+        notional = sz * px
+        fee = notional * FEE_RATE
+        now = int(time.time() * 1000)
+        trade_id = str(next(self._trade_seq))
+
+        if inst.inst_type == "SPOT":
+            sign = 1 if o["side"] == "buy" else -1
+            self.balances[inst.base] = self.balances.get(inst.base, 0.0) + sign * sz
+            self.balances[inst.quote] = self.balances.get(inst.quote, 0.0) - sign * notional - fee
+        else:
+            sign = 1 if o["side"] == "buy" else -1
+            self.positions[inst.inst_id] = self.positions.get(inst.inst_id, 0.0) + sign * sz
+            self.balances[inst.quote] = self.balances.get(inst.quote, 0.0) - fee
+
+        o.update(
+            {
+                "state": "filled",
+                "accFillSz": o["sz"],
+                "fillSz": fmt(sz, inst.lot),
+                "fillPx": fmt(px, inst.tick),
+                "avgPx": fmt(px, inst.tick),
+                "tradeId": trade_id,
+                "fillTime": str(now),
+                "fee": f"{-fee:.8f}",
+                "uTime": str(now),
+            }
+        )
+        fill = {
+            "instType": inst.inst_type,
+            "instId": inst.inst_id,
+            "tradeId": trade_id,
+            "ordId": o["ordId"],
+            "clOrdId": o["clOrdId"],
+            "billId": trade_id,
+            "side": o["side"],
+            "posSide": o["posSide"],
+            "fillPx": fmt(px, inst.tick),
+            "fillSz": fmt(sz, inst.lot),
+            "fee": f"{-fee:.8f}",
+            "feeCcy": inst.quote,
+            "execType": "T",
+            "fillTime": str(now),
+            "ts": str(now),
+        }
+        self.fills.append(fill)
+        self._emit("orders", dict(o))
+        self._emit("fills", fill)
+        self._emit("account", {})
+        if inst.inst_type != "SPOT":
+            self._emit("positions", {"instId": inst.inst_id})
+
+    def on_tick(self, inst_id: str) -> None:
+        st = self.market.symbols[inst_id]
+        ba = st.best_ask()
+        bb = st.best_bid()
+        for o in list(self.orders.values()):
+            if o["instId"] != inst_id or o["state"] != "live" or o["ordType"] == "market":
+                continue
+            px = float(o["px"])
+            if (o["side"] == "buy" and ba <= px) or (o["side"] == "sell" and bb >= px):
+                self._fill(o, px)
+
+    def open_orders(self) -> list[dict]:
+        return [o for o in self.orders.values() if o["state"] in ("live", "partially_filled")]
+
+    def closed_orders(self) -> list[dict]:
+        return [o for o in self.orders.values() if o["state"] in ("filled", "canceled")]
+
+    def balance_payload(self) -> dict:
+        details = []
+        total = 0.0
+        for ccy, bal in self.balances.items():
+            px = 1.0
+            inst = self.market.symbols.get(f"{ccy}-USDT")
+            if inst is not None:
+                px = inst.mid
+            usd = bal * px
+            total += usd
+            details.append(
+                {
+                    "ccy": ccy,
+                    "cashBal": f"{bal:.8f}",
+                    "availBal": f"{bal:.8f}",
+                    "availEq": f"{bal:.8f}",
+                    "eq": f"{bal:.8f}",
+                    "eqUsd": f"{usd:.2f}",
+                    "frozenBal": "0",
+                    "imr": "0",
+                    "mmr": "0",
+                    "upl": "0",
+                }
+            )
+        return {
+            "totalEq": f"{total:.2f}",
+            "adjEq": f"{total:.2f}",
+            "availEq": f"{total:.2f}",
+            "imr": "0",
+            "mmr": "0",
+            "uTime": str(int(time.time() * 1000)),
+            "details": details,
+        }
+
+    def positions_payload(self, inst_type: str | None = None) -> list[dict]:
+        out = []
+        for inst_id, pos in self.positions.items():
+            inst = self.market.instruments[inst_id]
+            if inst_type and inst.inst_type != inst_type:
+                continue
+            st = self.market.symbols[inst_id]
+            out.append(
+                {
+                    "instType": inst.inst_type,
+                    "instId": inst_id,
+                    "mgnMode": "cross",
+                    "posSide": "net",
+                    "pos": fmt(pos, inst.lot),
+                    "avgPx": fmt(st.mid, inst.tick),
+                    "markPx": fmt(st.mid, inst.tick),
+                    "last": fmt(st.last, inst.tick),
+                    "upl": "0",
+                    "ccy": inst.quote,
+                    "uTime": str(int(time.time() * 1000)),
+                }
+            )
+        return out
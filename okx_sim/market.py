@@ -0,0 +1,244 @@
+import random
+import time
+
+# Модель рынка симулятора: случайное блуждание цены и стакан вокруг нее.
+# Все генерируется из seed, поэтому прогоны нагрузки воспроизводимы.
+
+BAR_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1H": 3_600_000,
+    "2H": 7_200_000,
+    "4H": 14_400_000,
+    "6H": 21_600_000,
+    "12H": 43_200_000,
+    "1D": 86_400_000,
+    "1W": 604_800_000,
+}
+
+
+def fmt(v: float, step: float) -> str:
+    digits = max(0, len(f"{step:.10f}".rstrip("0").split(".")[1]))
+    return f"{v:.{digits}f}"
+
+
+class Instrument:
+    def __init__(self, inst_id: str, inst_type: str, price: float, tick: float, lot: float, code: int):
+        self.inst_id = inst_id
+        self.inst_type = inst_type
+        self.tick = tick
+        self.lot = lot
+        self.code = code
+        parts = inst_id.split("-")
+        self.base = parts[0]
+        self.quote = parts[1] if len(parts) > 1 else "USDT"
+        self.start_price = price
+
+    def okx(self) -> dict:
+        d = {
+            "instType": self.inst_type,
+            "instId": self.inst_id,
+            "instIdCode": self.code,
+            "uly": "",
+            "baseCcy": self.base if self.inst_type == "SPOT" else "",
+            "quoteCcy": self.quote if self.inst_type == "SPOT" else "",
+            "settleCcy": self.quote if self.inst_type != "SPOT" else "",
+            "ctVal": "0.01" if self.inst_type != "SPOT" else "",
+            "ctValCcy": self.base if self.inst_type != "SPOT" else "",
+            "tickSz": fmt(self.tick, self.tick),
+            "lotSz": fmt(self.lot, self.lot),
+            "minSz": fmt(self.lot, self.lot),
+            "state": "live",
+            "expTime": "",
+            "listTime": "1600000000000",
+        }
+        if self.inst_type != "SPOT":
+            d["uly"] = f"{self.base}-{self.quote}"
+        return d
+
+
+DEFAULT_INSTRUMENTS = [
+    ("BTC-USDT", "SPOT", 65000.0, 0.1, 0.00001),
+    ("ETH-USDT", "SPOT", 3500.0, 0.01, 0.0001),
+    ("SOL-USDT", "SPOT", 150.0, 0.01, 0.001),
+    ("BTC-USDT-SWAP", "SWAP", 65000.0, 0.1, 1.0),
+    ("ETH-USDT-SWAP", "SWAP", 3500.0, 0.01, 1.0),
+]
+
+
+class SymbolState:
+    def __init__(self, inst: Instrument, rnd: random.Random, depth: int):
+        self.inst = inst
+        self.rnd = rnd
+        self.depth = depth
+        self.mid = inst.start_price
+        self.open24h = inst.start_price
+        self.high24h = inst.start_price
+        self.low24h = inst.start_price
+        self.vol24h = 0.0
+        self.last = inst.start_price
+        self.last_sz = 0.0
+        self.ts = int(time.time() * 1000)
+        self.bids: dict[float, float] = {}
+        self.asks: dict[float, float] = {}
+        self.candles: dict[str, list] = {}
+        self._rebuild_book()
+
+    def _level_sz(self) -> float:
+        return round(self.rnd.uniform(0.01, 5.0), 4)
+
+    def _rebuild_book(self) -> None:
+        t = self.inst.tick
+        mid_ticks = round(self.mid / t)
+        self.bids = {round((mid_ticks - i) * t, 10): self._level_sz() for i in range(1, self.depth + 1)}
+        self.asks = {round((mid_ticks + i) * t, 10): self._level_sz() for i in range(1, self.depth + 1)}
+
+    def best_bid(self) -> float:
+        return max(self.bids) if self.bids else self.mid
+
+    def best_ask(self) -> float:
+        return min(self.asks) if self.asks else self.mid
+
+    def step(self) -> tuple[list, list]:
+        # сдвиг цены и дельта стакана: удаляем уровни, оказавшиеся по другую сторону mid,
+        # добавляем новые у края и меняем объем нескольких уровней
+        t = self.inst.tick
+        self.ts = int(time.time() * 1000)
+        drift = self.rnd.choice((-2, -1, -1, 0, 0, 0, 1, 1, 2))
+        self.mid = max(t, self.mid + drift * t)
+        mid_ticks = round(self.mid / t)
+        bid_delta: list = []
+        ask_delta: list = []
+
+        for p in [p for p in self.bids if p >= self.mid]:
+            del self.bids[p]
+            bid_delta.append([fmt(p, t), "0", "0", "0"])
+        for p in [p for p in self.asks if p <= self.mid]:
+            del self.asks[p]
+            ask_delta.append([fmt(p, t), "0", "0", "0"])
+
+        for i in range(1, self.depth + 1):
+            bp = round((mid_ticks - i) * t, 10)
+            ap = round((mid_ticks + i) * t, 10)
+            if bp not in self.bids:
+                self.bids[bp] = self._level_sz()
+                bid_delta.append([fmt(bp, t), str(self.bids[bp]), "0", "1"])
+            if ap not in self.asks:
+                self.asks[ap] = self._level_sz()
+                ask_delta.append([fmt(ap, t), str(self.asks[ap]), "0", "1"])
+
+        for _ in range(self.rnd.randint(1, 4)):
+            side, delta = (self.bids, bid_delta) if self.rnd.random() < 0.5 else (self.asks, ask_delta)
+            if not side:
+                continue
+            p = self.rnd.choice(list(side))
+            side[p] = self._level_sz()
+            delta.append([fmt(p, t), str(side[p]), "0", "1"])
+
+        # глубину держим постоянной
+        for book, rev, delta in ((self.bids, True, bid_delta), (self.asks, False, ask_delta)):
+            if len(book) > self.depth:
+                for p in sorted(book, reverse=not rev)[: len(book) - self.depth]:
+                    del book[p]
+                    delta.append([fmt(p, t), "0", "0", "0"])
+
+        self.last = self.best_ask() if drift > 0 else self.best_bid()
+        self.last_sz = round(self.rnd.uniform(0.001, 1.0), 4)
+        self.vol24h += self.last_sz
+        self.high24h = max(self.high24h, self.last)
+        self.low24h = min(self.low24h, self.last)
+        for bar in list(self.candles):
+            self._update_candle(bar)
+        return bid_delta, ask_delta
+
+    def book_levels(self, depth: int | None = None) -> tuple[list, list]:
+        t = self.inst.tick
+        bids = sorted(self.bids.items(), reverse=True)
+        asks = sorted(self.asks.items())
+        if depth:
+            bids = bids[:depth]
+            asks = asks[:depth]
+        return (
+            [[fmt(p, t), str(v), "0", "1"] for p, v in bids],
+            [[fmt(p, t), str(v), "0", "1"] for p, v in asks],
+        )
+
+    def ticker(self) -> dict:
+        t = self.inst.tick
+        bb = self.best_bid()
+        ba = self.best_ask()
+        return {
+            "instType": self.inst.inst_type,
+            "instId": self.inst.inst_id,
+            "last": fmt(self.last, t),
+            "lastSz": str(self.last_sz),
+            "askPx": fmt(ba, t),
+            "askSz": str(self.asks.get(ba, 0.0)),
+            "bidPx": fmt(bb, t),
+            "bidSz": str(self.bids.get(bb, 0.0)),
+            "open24h": fmt(self.open24h, t),
+            "high24h": fmt(self.high24h, t),
+            "low24h": fmt(self.low24h, t),
+            "volCcy24h": f"{self.vol24h * self.last:.2f}",
+            "vol24h": f"{self.vol24h:.4f}",
+            "sodUtc0": fmt(self.open24h, t),
+            "sodUtc8": fmt(self.open24h, t),
+            "ts": str(self.ts),
+        }
+
+    def _update_candle(self, bar: str) -> None:
+        ms = BAR_MS.get(bar, 60_000)
+        start = self.ts - self.ts % ms
+        c = self.candles.get(bar)
+        if c is None or c[0] != start:
+            c = [start, self.last, self.last, self.last, self.last, 0.0]
+            self.candles[bar] = c
+        c[2] = max(c[2], self.last)
+        c[3] = min(c[3], self.last)
+        c[4] = self.last
+        c[5] += self.last_sz
+
+    def candle(self, bar: str) -> list[str]:
+        if bar not in self.candles:
+            self._update_candle(bar)
+        c = self.candles[bar]
+        t = self.inst.tick
+        return [str(c[0]), fmt(c[1], t), fmt(c[2], t), fmt(c[3], t), fmt(c[4], t), f"{c[5]:.4f}",
+                f"{c[5] * c[4]:.2f}", f"{c[5] * c[4]:.2f}", "0"]
+
+    def history_candles(self, bar: str, after: int | None, limit: int) -> list[list[str]]:
+        # история строится детерминированно от ts бара назад, без хранения
+        ms = BAR_MS.get(bar, 60_000)
+        now = self.ts - self.ts % ms
+        end = now if after is None else (int(after) - int(after) % ms) - ms
+        out = []
+        t = self.inst.tick
+        for i in range(max(1, min(limit, 300))):
+            ts = end - i * ms
+            r = random.Random(f"{self.inst.inst_id}:{bar}:{ts}")
+            o = self.inst.start_price * (1 + r.uniform(-0.02, 0.02))
+            c = o * (1 + r.uniform(-0.005, 0.005))
+            h = max(o, c) * (1 + r.uniform(0, 0.003))
+            lo = min(o, c) * (1 - r.uniform(0, 0.003))
+            v = r.uniform(1, 100)
+            out.append([str(ts), fmt(o, t), fmt(h, t), fmt(lo, t), fmt(c, t), f"{v:.4f}",
+                        f"{v * c:.2f}", f"{v * c:.2f}", "1"])
+        return out
+
+
+class Market:
+    def __init__(self, instruments=None, seed: int = 1, depth: int = 50):
+        rnd = random.Random(seed)
+        self.instruments: dict[str, Instrument] = {}
+        self.symbols: dict[str, SymbolState] = {}
+        for i, (inst_id, inst_type, px, tick, lot) in enumerate(instruments or DEFAULT_INSTRUMENTS):
+            inst = Instrument(inst_id, inst_type, px, tick, lot, 10_000 + i)
+            self.instruments[inst_id] = inst
+            self.symbols[inst_id] = SymbolState(inst, random.Random(rnd.random()), depth)
+
+    def by_type(self, inst_type: str) -> list[Instrument]:
+        it = str(inst_type or "").upper()
+        return [i for i in self.instruments.values() if not it or i.inst_type == it]
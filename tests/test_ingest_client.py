@@ -0,0 +1,62 @@
+import asyncio
+import os
+import tempfile
+
+from ingest.client import IngestClient
+from ingest.protocol import pack, read_frame
+
+
+async def _fake_ingest(path: str, ops: list, ack: asyncio.Event):
+    # процесс приема: отвечает "subscribed" на каждый "sub", когда разрешен ack
+    async def handle(reader, writer):
+        try:
+            while True:
+                msg = await read_frame(reader)
+                ops.append(msg["op"])
+                if msg["op"] == "sub":
+                    await ack.wait()
+                    writer.write(pack({"key": msg["key"], "ev": "subscribed"}))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    return await asyncio.start_unix_server(handle, path=path)
+
+
+async def _next_ev(q: asyncio.Queue) -> str:
+    return (await asyncio.wait_for(q.get(), 1.0)).get("ev")
+
+
+def test_two_local_subscribers_on_one_key_both_get_subscribed():
+    async def main():
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "ingest.sock")
+            ops: list = []
+            ack = asyncio.Event()
+            server = await _fake_ingest(path, ops, ack)
+            client = IngestClient(path)
+            args = {"symbol": "BTC-USDT", "tf": "60"}
+
+            # второй подписчик приходит до ack: получает его вместе с первым
+            key, q1 = await client.subscribe("bars", args)
+            _, q2 = await client.subscribe("bars", args)
+            ack.set()
+            assert await _next_ev(q1) == "subscribed"
+            assert await _next_ev(q2) == "subscribed"
+
+            # третий — после ack: процесс приема повторно не спрашиваем
+            _, q3 = await client.subscribe("bars", args)
+            assert await _next_ev(q3) == "subscribed"
+            assert ops == ["sub"]
+
+            # быстрая переподписка: последняя очередь ушла, новая подписка — новый "sub"
+            for q in (q1, q2, q3):
+                await client.unsubscribe(key, q)
+            _, q4 = await client.subscribe("bars", args)
+            assert await _next_ev(q4) == "subscribed"
+            assert ops == ["sub", "unsub", "sub"]
+
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(main())